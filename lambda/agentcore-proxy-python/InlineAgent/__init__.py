@@ -11,6 +11,8 @@ from .agent import InlineAgent, CollaboratorAgent, require_confirmation
 from .knowledge_base import knowledgebase_plugin
 from .constants import USER_INPUT_ACTION_GROUP_NAME, TraceColor, Level
 from .utils import AgentAppConfig
+from .deadline import Deadline
+from .aws import *
 from .observability import *
 from .tools import *
 from .types import *
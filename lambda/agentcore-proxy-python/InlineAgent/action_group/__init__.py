@@ -1,3 +1,14 @@
 from .action_group import ActionGroup, ActionGroups, ActionGroupBuilder
+from .docstring import ParsedDocstring, parse_docstring
+from .schema_cache import SchemaCache, SchemaCacheConfig, schema_cache
 
-__all__ = ["ActionGroup", "ActionGroups", "ActionGroupBuilder"]
+__all__ = [
+    "ActionGroup",
+    "ActionGroups",
+    "ActionGroupBuilder",
+    "ParsedDocstring",
+    "parse_docstring",
+    "SchemaCache",
+    "SchemaCacheConfig",
+    "schema_cache",
+]
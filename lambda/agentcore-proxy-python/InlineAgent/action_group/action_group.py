@@ -2,7 +2,6 @@ import json
 from functools import cached_property
 import re
 from typing import (
-    Annotated,
     List,
     Dict,
     Any,
@@ -10,14 +9,16 @@ from typing import (
     Literal,
     Optional,
     Self,
-    Tuple,
     Union,
 )
 from inspect import Parameter, signature
 import boto3
 from pydantic import BaseModel, computed_field, model_validator, validate_call, Field
 
-from InlineAgent.tools import MCPServer
+from InlineAgent.action_group.docstring import parse_docstring, schema_type
+from InlineAgent.action_group.schema_cache import schema_cache
+from InlineAgent.aws import identity_resolver
+from InlineAgent.tools import MCPServer, ToolMetadata, tool
 from InlineAgent.types import APISchema, Executor, FunctionDefination
 
 
@@ -37,6 +38,13 @@ class ActionGroup(BaseModel):
     argument_key: str = "Parameters:"
     return_key: str = "Returns:"
     test: bool = False
+    # Names of this group's tools (or MCP tools) whose results may be served from
+    # the tool cache, with their ttl in seconds (None: `TOOL_CACHE_TTL`).
+    cacheable_tools: Dict[str, Optional[float]] = Field(default_factory=dict)
+    # Cache entries of this group are only shared within the scope. Required when
+    # MCP tools are cacheable: their results depend on the caller's credentials,
+    # so use e.g. the caller's identity.
+    cache_scope: Optional[str] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -67,7 +75,7 @@ class ActionGroup(BaseModel):
         print(
             f"Using `{self.profile}` [profile](https://docs.aws.amazon.com/cli/v1/userguide/cli-configure-files.html)."
         )
-        return boto3.Session(profile_name=self.profile)
+        return identity_resolver.session(profile_name=self.profile)
 
     @computed_field
     @cached_property
@@ -77,9 +85,10 @@ class ActionGroup(BaseModel):
         try:
             if self.test:
                 return "Mock-Account", "Mock-Region"
-            sts_client = self.session.client("sts")
-            identity = sts_client.get_caller_identity()
-            return identity["Account"], self.session.region_name
+            return (
+                identity_resolver.account_id(session=self.session),
+                identity_resolver.region(session=self.session),
+            )
         except Exception as e:
             return "Mock-Account", "Mock-Region"
 
@@ -235,14 +244,31 @@ class ActionGroup(BaseModel):
                 raise ValueError(
                     "mcp_clients is not supported when builtin_tools is present..."
                 )
+
+        if self.cacheable_tools:
+            names = {func.__name__ for func in self.tools}
+            mcp_names = set()
+            for client in self.mcp_clients or []:
+                mcp_names.update(client.callable_tools)
+            unknown = sorted(set(self.cacheable_tools) - names - mcp_names)
+            if unknown:
+                raise ValueError(
+                    f"cacheable_tools names unknown tools: {', '.join(unknown)}..."
+                )
+            if self.cache_scope is None and mcp_names & set(self.cacheable_tools):
+                raise ValueError(
+                    "cache_scope is required when MCP tools are in cacheable_tools..."
+                )
         return self
 
 
 class ActionGroups(BaseModel):
     action_groups: List[ActionGroup]
 
+    # Both are computed on first access and kept; build a new ActionGroups to
+    # change the groups.
     @computed_field
-    @property
+    @cached_property
     def tool_map(self) -> Dict[str, Callable]:
         tool_map = dict()
 
@@ -250,18 +276,29 @@ class ActionGroups(BaseModel):
             if action_group.executor == Executor.RETURN_CONTROL:
 
                 if action_group.tools:
-                    for tool in action_group.tools:
-                        tool_map[tool.__name__] = tool
+                    for func in action_group.tools:
+                        tool_map[func.__name__] = func
 
                 if action_group.mcp_clients:
 
                     for current_client in action_group.mcp_clients:
                         tool_map.update(current_client.callable_tools)
 
+                # The map wraps the tools, leaving the user's functions as they
+                # are; tools decorated with their own cache settings keep them.
+                for name, ttl in action_group.cacheable_tools.items():
+                    if not ToolMetadata.of(tool_map[name]).cacheable:
+                        tool_map[name] = tool(
+                            tool_map[name],
+                            cacheable=True,
+                            cache_ttl=ttl,
+                            cache_scope=action_group.cache_scope,
+                        )
+
         return tool_map
 
     @computed_field
-    @property
+    @cached_property
     def actionGroups(self) -> List:
         actionGroups = list()
 
@@ -342,153 +379,29 @@ class ActionGroupBuilder:
         return len(line) - len(line.lstrip())
 
     @staticmethod
-    def get_new_param(line: str) -> Tuple[str, List]:
-        line = ActionGroupBuilder.clean_string(line.strip())
-        param_parts = line.split(":", 1)
-        current_param, current_desc = str(), list()
-        if len(param_parts) == 2 and param_parts[1]:
-
-            pattern = r"\((.*?)\)"
-            match = re.search(pattern, param_parts[0].strip())
-            current_param_type = str()
-            if match:
-                current_param_type = match.group(
-                    1
-                )  # group(1) gets just the content inside parentheses
-
-            current_param = param_parts[0].strip().split("(")[0].strip()
-            current_desc = [current_param_type + " " + param_parts[1].strip()]
-        else:
-            raise ValueError("Invalid docstring format")
-        return current_param, current_desc
-
-    @staticmethod
-    @validate_call
     def clean_string(line: str) -> str:
-        clean_line = str()
-        prev_char: str = None
-        for character in line:
-
-            if character == " ":
-                prev_char = " "
-            else:
-                if prev_char == " ":
-                    clean_line += " " + character
-                else:
-                    clean_line += character
-                prev_char = character
-        return clean_line
+        """Collapse runs of spaces and drop trailing ones."""
+        return re.sub(" +", " ", line).rstrip(" ")
 
     @staticmethod
-    @validate_call
     def parse_docstring(
-        docstring: Annotated[str, Field(min_length=1)],
+        docstring: str,
         argument_key="Parameters:",
         return_key="Returns:",
     ) -> tuple[str, Dict[str, str]]:
-        """Parse a docstring to extract function description and parameter descriptions."""
-        if not docstring:
-            raise ValueError("Docstring is empty or None")
-
-        docstring = docstring.strip()
-        parameter_level = None
-
-        # Split docstring into description and args sections
-        description, parameter_return_section = (None, None)
-        description_parameter_return_section = docstring.split(argument_key, 1)
-        # print(description_parameter_return_section)
-        # Get function description
-        if description_parameter_return_section:
-            description = description_parameter_return_section[0].strip()
-            description = description.replace("\n", " ").replace("\r", "").strip()
-            description = ActionGroupBuilder.clean_string(line=description)
-            # Parse parameter descriptions if they exist
-            param_descriptions = {}
-            if (
-                len(description_parameter_return_section) > 1
-                and description_parameter_return_section[1].strip()
-            ):
-                parameter_return_section = description_parameter_return_section[
-                    1
-                ].split(return_key, 1)
-
-                if len(parameter_return_section) > 1:
-                    param_section, return_section = parameter_return_section
-                    return_section = return_section.strip()
-                    return_section = (
-                        return_section.replace("\n", " ").replace("\r", "").strip()
-                    )
-                    return_section = ActionGroupBuilder.clean_string(
-                        line=return_section
-                    )
-
-                    description += (
-                        " This function returns " + return_section
-                        if return_section
-                        else ""
-                    )
-                else:
-                    param_section = parameter_return_section[0]
-                # Split parameters into lines and parse each
-                param_lines = param_section.split("\n")
-
-                current_param = None
-                current_desc = []
-                parameter_level, current_parameter_level = 0, 0
-                first_level = False
-                for line in param_lines:
-                    if not line or not line.strip():
-                        continue
-
-                    if not first_level:
-                        parameter_level = ActionGroupBuilder.get_indent_level(line=line)
-                        current_param, current_desc = ActionGroupBuilder.get_new_param(
-                            line=line
-                        )
-                        first_level = True
-
-                    else:
-                        current_parameter_level = ActionGroupBuilder.get_indent_level(
-                            line=line
-                        )
-                        if current_parameter_level == parameter_level:
-                            if current_param:
-                                param_descriptions[current_param] = " ".join(
-                                    current_desc
-                                ).strip()
-                                current_desc = []
-                            current_param, current_desc = (
-                                ActionGroupBuilder.get_new_param(line=line)
-                            )
-                        elif current_parameter_level > parameter_level:
-                            current_desc.append(
-                                line.replace("\n", "").replace("\r", "").strip()
-                            )
-                        else:
-                            raise ValueError("Invalid docstring format")
-                # Save the last parameter
-                if current_param:
-                    param_descriptions[current_param] = " ".join(current_desc).strip()
-        else:
-            raise ValueError("Invalid docstring format")
+        """Parse a docstring to extract function description and parameter descriptions.
 
-        return description, param_descriptions
+        Google, NumPy and reST styles are understood; see `docstring.parse_docstring`.
+        """
+        parsed = parse_docstring(
+            docstring=docstring, argument_key=argument_key, return_key=return_key
+        )
+        return parsed.description, parsed.parameters
 
     @staticmethod
-    @validate_call
-    def _map_python_type_to_schema_type(python_type: str) -> str:
-        """Map Python type names to JSON schema type names."""
-        type_mapping = {
-            "str": "string",
-            "int": "integer",
-            "float": "number",
-            "bool": "boolean",
-            "list": "array",
-        }
-
-        return type_mapping.get(
-            python_type, "string"
-        )  # default to string for unknown types
+    def _map_python_type_to_schema_type(python_type: Any) -> str:
+        """Map Python types or type names to JSON schema type names."""
+        return schema_type(python_type)[0]
 
     @staticmethod
     @validate_call
@@ -496,41 +409,63 @@ class ActionGroupBuilder:
         func: Callable, argument_key: str = "Parameters:", return_key: str = "Returns:"
     ) -> FunctionDefination:
 
+        schema = schema_cache.get(
+            func,
+            lambda: ActionGroupBuilder._compile_function_schema(
+                func=func, argument_key=argument_key, return_key=return_key
+            ),
+            argument_key,
+            return_key,
+        )
+        schema["requireConfirmation"] = (
+            "ENABLED"
+            if ToolMetadata.of(func).require_confirmation
+            else "DISABLED"
+        )
+        return schema
+
+    @staticmethod
+    def _compile_function_schema(
+        func: Callable, argument_key: str, return_key: str
+    ) -> Dict:
         if func.__doc__ is None:
             raise ValueError("Docstring is empty or None")
 
-        description, param_descriptions = ActionGroupBuilder.parse_docstring(
+        parsed = parse_docstring(
             docstring=func.__doc__, argument_key=argument_key, return_key=return_key
         )
+        try:
+            sig = signature(func, eval_str=True)
+        except (NameError, SyntaxError, TypeError):
+            # Postponed annotations naming types that are not importable here.
+            sig = signature(func)
+
         parameters = {}
-        sig = signature(func)
         for name, param in sig.parameters.items():
-            param_type_name = param.annotation
-            if isinstance(param_type_name, Callable):
-                param_type_name = param_type_name.__name__
-            python_type = (
-                param_type_name if param.annotation != Parameter.empty else "any"
-            )
-            schema_type = ActionGroupBuilder._map_python_type_to_schema_type(
-                python_type
+            # Annotations win over types declared in the docstring.
+            annotation = (
+                param.annotation
+                if param.annotation is not Parameter.empty
+                else parsed.parameter_types.get(name)
             )
+            param_type, allowed_values = schema_type(annotation)
+            description = parsed.parameters.get(name, "")
+            if allowed_values:
+                description = (
+                    description
+                    + " Allowed values: "
+                    + ", ".join(str(value) for value in allowed_values)
+                ).strip()
 
             param_info = {
-                "type": schema_type,
-                "description": param_descriptions.get(name, ""),
+                "type": param_type,
+                "description": description,
                 "required": param.default == Parameter.empty,
             }
             parameters.update({name: param_info})
 
-        requireConfirmation = (
-            "ENABLED"
-            if getattr(func, "__is_confirmation_required__", False)
-            else "DISABLED"
-        )
-
         return {
             "name": func.__name__,
-            "description": description,
+            "description": parsed.description,
             "parameters": parameters,
-            "requireConfirmation": requireConfirmation,
         }
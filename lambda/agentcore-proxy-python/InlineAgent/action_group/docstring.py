@@ -0,0 +1,270 @@
+import enum
+import re
+import types
+import typing
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+PARAMETER_HEADERS = {
+    "Args",
+    "Arguments",
+    "Parameters",
+    "Params",
+    "Keyword Args",
+    "Keyword Arguments",
+    "Other Parameters",
+}
+RETURN_HEADERS = {"Returns", "Return", "Yields"}
+OTHER_HEADERS = {
+    "Raises",
+    "Examples",
+    "Example",
+    "Note",
+    "Notes",
+    "See Also",
+    "Attributes",
+    "Warning",
+    "Warnings",
+    "Warns",
+    "References",
+    "Todo",
+}
+
+# `name (type): text`, `name: text` and, in NumPy sections, `name : type`.
+_ENTRY = re.compile(r"^\*{0,2}(\w+)\s*(?:\(([^)]*)\))?\s*:\s*(.*)$")
+# `:param type name: text`, `:type name: type`, `:returns: text`, ...
+_FIELD = re.compile(r"^:(\w+)(?:\s+([^:]*?))?\s*:\s*(.*)$")
+
+_SCHEMA_TYPES = {
+    "str": "string",
+    "int": "integer",
+    "float": "number",
+    "bool": "boolean",
+    "list": "array",
+    "List": "array",
+    "tuple": "array",
+    "Tuple": "array",
+    "set": "array",
+    "Set": "array",
+    "Sequence": "array",
+}
+
+
+@dataclass
+class ParsedDocstring:
+    description: str
+    # Parameter descriptions, prefixed with the declared type if any.
+    parameters: Dict[str, str] = field(default_factory=dict)
+    # Types declared in the docstring, e.g. `int` from `limit (int): ...`.
+    parameter_types: Dict[str, str] = field(default_factory=dict)
+    returns: str = ""
+
+
+def parse_docstring(
+    docstring: str,
+    argument_key: str = "Parameters:",
+    return_key: str = "Returns:",
+) -> ParsedDocstring:
+    """Tokenize a Google, NumPy or reST style docstring in one pass over its lines.
+
+    `argument_key` and `return_key` are extra section headers on top of the
+    standard ones. Sections other than parameters and returns (`Raises:`,
+    `Examples:`, ...) are skipped.
+    """
+    if not docstring or not docstring.strip():
+        raise ValueError("Docstring is empty or None")
+
+    extra_parameter_header = argument_key.rstrip(":")
+    extra_return_header = return_key.rstrip(":")
+
+    description: List[str] = list()
+    returns: List[str] = list()
+    texts: Dict[str, List[str]] = dict()
+    declared: Dict[str, str] = dict()
+
+    section = "description"
+    numpy_section = False
+    entry_indent: Optional[int] = None
+    current: Optional[List[str]] = None
+
+    lines = docstring.expandtabs().splitlines()
+    skip_next = False
+    for index, line in enumerate(lines):
+        if skip_next:
+            skip_next = False
+            continue
+
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        # Section headers: `Args:` (Google) or `Parameters` over a dashed line (NumPy).
+        header = None
+        if stripped.endswith(":") and not stripped.startswith(":"):
+            header = stripped[:-1].strip()
+            numpy_header = False
+        elif index + 1 < len(lines):
+            underline = lines[index + 1].strip()
+            if underline and underline.strip("-") == "" and len(underline) >= 3:
+                header = stripped
+                numpy_header = True
+                skip_next = True
+        if header is not None:
+            if header in PARAMETER_HEADERS or header == extra_parameter_header:
+                section = "parameters"
+            elif header in RETURN_HEADERS or header == extra_return_header:
+                section = "returns"
+            elif header in OTHER_HEADERS or numpy_header:
+                section = "other"
+            else:
+                header = None
+            if header is not None:
+                numpy_section = numpy_header
+                entry_indent = None
+                current = None
+                continue
+
+        # reST fields may appear anywhere.
+        if stripped.startswith(":"):
+            match = _FIELD.match(stripped)
+            if match:
+                kind, argument, text = match.groups()
+                if kind in ("param", "parameter", "arg", "argument", "key", "keyword"):
+                    *type_words, name = (argument or "").split() or [""]
+                    if type_words:
+                        declared[name] = " ".join(type_words)
+                    current = texts.setdefault(name, [])
+                    current.append(text)
+                    section = "fields"
+                elif kind == "type":
+                    declared[(argument or "").strip()] = text
+                    current = None
+                    section = "fields"
+                elif kind in ("returns", "return", "yields", "yield"):
+                    current = returns
+                    current.append(text)
+                    section = "fields"
+                else:
+                    current = None
+                    section = "fields"
+                continue
+
+        if section == "description":
+            description.append(stripped)
+        elif section == "returns":
+            returns.append(stripped)
+        elif section == "fields":
+            # Continuation of the last reST field.
+            if current is not None:
+                current.append(stripped)
+        elif section == "parameters":
+            indent = len(line) - len(line.lstrip())
+            if entry_indent is None:
+                entry_indent = indent
+            if indent > entry_indent and current is not None:
+                current.append(stripped)
+                continue
+            if indent != entry_indent:
+                raise ValueError("Invalid docstring format")
+
+            match = _ENTRY.match(stripped)
+            if numpy_section:
+                if match:
+                    name, _, declared_type = match.groups()
+                else:
+                    name, declared_type = stripped.lstrip("*"), ""
+                text = ""
+            elif match and match.group(3):
+                name, declared_type, text = match.groups()
+            else:
+                raise ValueError("Invalid docstring format")
+
+            if declared_type:
+                declared[name] = declared_type.strip()
+            current = texts.setdefault(name, [])
+            if text:
+                current.append(text)
+
+    parameters = dict()
+    for name, parts in texts.items():
+        text = " ".join(" ".join(parts).split())
+        declared_type = declared.get(name)
+        parameters[name] = f"{declared_type} {text}".strip() if declared_type else text
+
+    summary = " ".join(" ".join(description).split())
+    returns_text = " ".join(" ".join(returns).split())
+    if returns_text:
+        summary += " This function returns " + returns_text
+
+    return ParsedDocstring(
+        description=summary,
+        parameters=parameters,
+        parameter_types=declared,
+        returns=returns_text,
+    )
+
+
+def schema_type(annotation: Any) -> Tuple[str, List[Any]]:
+    """Map an annotation (or a type name such as `Optional[int]`) to a Bedrock
+    parameter type. Also returns the allowed values of `Literal` and `Enum` types."""
+    if annotation is None or annotation is type(None):
+        return "string", []
+    if isinstance(annotation, str):
+        return _schema_type_from_text(annotation)
+
+    origin = typing.get_origin(annotation)
+    arguments = typing.get_args(annotation)
+    if origin is typing.Annotated:
+        return schema_type(arguments[0])
+    if origin is typing.Union or origin is types.UnionType:
+        members = [argument for argument in arguments if argument is not type(None)]
+        mapped = [schema_type(member) for member in members]
+        if len({kind for kind, _ in mapped}) == 1:
+            return mapped[0][0], [value for _, values in mapped for value in values]
+        return "string", []
+    if origin is typing.Literal:
+        return _literal_type(arguments), list(arguments)
+    if origin is not None:
+        annotation = origin
+
+    if isinstance(annotation, type):
+        if issubclass(annotation, enum.Enum):
+            values = [member.value for member in annotation]
+            return _literal_type(values), values
+        for base in annotation.__mro__:
+            if base.__name__ in _SCHEMA_TYPES:
+                return _SCHEMA_TYPES[base.__name__], []
+        return "string", []
+
+    return _SCHEMA_TYPES.get(getattr(annotation, "__name__", ""), "string"), []
+
+
+def _schema_type_from_text(text: str) -> Tuple[str, List[Any]]:
+    text = text.strip().replace("typing.", "")
+    for prefix in ("Optional[", "Annotated["):
+        if text.startswith(prefix) and text.endswith("]"):
+            return _schema_type_from_text(text[len(prefix) : -1].split(",")[0])
+    if text.startswith("Literal[") and text.endswith("]"):
+        values = [
+            value.strip().strip("'\"") for value in text[len("Literal[") : -1].split(",")
+        ]
+        return "string", values
+    # `int | None`, `int, optional` (NumPy)
+    head = re.split(r"[\[|,\s]", text, maxsplit=1)[0]
+    return _SCHEMA_TYPES.get(head, "string"), []
+
+
+def _literal_type(values) -> str:
+    if values and all(isinstance(value, bool) for value in values):
+        return "boolean"
+    if values and all(
+        isinstance(value, int) and not isinstance(value, bool) for value in values
+    ):
+        return "integer"
+    if values and all(
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+        for value in values
+    ):
+        return "number"
+    return "string"
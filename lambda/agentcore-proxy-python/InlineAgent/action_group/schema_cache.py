@@ -0,0 +1,151 @@
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import weakref
+from typing import Callable, Dict, Optional, Tuple
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+SCHEMA_CACHE_VERSION = 2
+
+
+class SchemaCacheConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    # Directory of compiled schemas; can be shipped read-only with the package.
+    SCHEMA_CACHE_DIR: Optional[str] = None
+
+
+class SchemaCache:
+    """Compiled function schemas, computed once per function and process.
+
+    Entries are keyed by the function object and checked against a hash of its
+    source-level inputs (bytecode, docstring, annotations and defaults), so an
+    edited tool is recompiled. With `directory`, compiled schemas are also stored
+    as JSON files named by that hash; a later cold start with the same code reads
+    them instead of parsing docstrings. A read-only directory is only read.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._compiled: "weakref.WeakKeyDictionary[Callable, Dict[Tuple, Tuple[str, Dict]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[SchemaCacheConfig] = None) -> "SchemaCache":
+        config = config or SchemaCacheConfig()
+        return cls(directory=config.SCHEMA_CACHE_DIR)
+
+    @staticmethod
+    def source_hash(func: Callable, *options: str) -> Optional[str]:
+        target = inspect.unwrap(func)
+        code = getattr(target, "__code__", None)
+        if code is None:
+            return None
+        parts = [
+            SCHEMA_CACHE_VERSION,
+            getattr(target, "__module__", None),
+            getattr(target, "__qualname__", None),
+            code.co_code.hex(),
+            code.co_varnames[: code.co_argcount + code.co_kwonlyargcount],
+            func.__doc__,
+            repr(getattr(target, "__annotations__", None)),
+            repr(getattr(target, "__defaults__", None)),
+            repr(getattr(target, "__kwdefaults__", None)),
+            options,
+        ]
+        return hashlib.sha256(
+            json.dumps(parts, default=repr).encode("utf-8")
+        ).hexdigest()
+
+    def get(
+        self,
+        func: Callable,
+        compile_schema: Callable[[], Dict],
+        *options: str,
+    ) -> Dict:
+        """Return the schema of `func`, calling `compile_schema` only when it is not cached.
+
+        `options` are the compile arguments that change the result.
+        """
+        digest = SchemaCache.source_hash(func, *options)
+        try:
+            entries = self._compiled.get(func)
+        except TypeError:
+            # Not weak-referenceable, e.g. a builtin.
+            entries = None
+        if entries is not None and options in entries:
+            cached_digest, schema = entries[options]
+            if cached_digest == digest:
+                self.hits += 1
+                return SchemaCache._copy(schema)
+
+        schema = self._load(digest)
+        if schema is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            schema = compile_schema()
+            self._store(digest, schema)
+
+        with self._lock:
+            try:
+                self._compiled.setdefault(func, dict())[options] = (digest, schema)
+            except TypeError:
+                pass
+        return SchemaCache._copy(schema)
+
+    @staticmethod
+    def _copy(value):
+        # Schemas are plain JSON; much cheaper than copy.deepcopy.
+        if isinstance(value, dict):
+            return {key: SchemaCache._copy(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [SchemaCache._copy(item) for item in value]
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._compiled = weakref.WeakKeyDictionary()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _load(self, digest: Optional[str]) -> Optional[Dict]:
+        if self.directory is None or digest is None:
+            return None
+        try:
+            with open(self._path(digest), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _store(self, digest: Optional[str], schema: Dict):
+        if self.directory is None or digest is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Written to a temporary file first so readers never see half a file.
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(schema, f)
+            os.replace(temp_path, self._path(digest))
+        except OSError:
+            pass
+
+
+schema_cache = SchemaCache.from_config()
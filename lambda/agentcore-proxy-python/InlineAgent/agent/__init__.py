@@ -11,15 +11,108 @@ Amazon Bedrock.
 from .inline_agent import (
     InlineAgent,
 )
-from .confirmation import require_confirmation
-from .process_roc import ProcessROC
+from .bundle import AgentBundleConfig, AgentBundler
+from .confirmation import (
+    CallbackConfirmationProvider,
+    ConfirmationConfig,
+    ConfirmationProvider,
+    ConfirmationRule,
+    ConsoleConfirmationProvider,
+    PolicyConfirmationProvider,
+    WebhookConfirmationProvider,
+    require_confirmation,
+)
+from .process_roc import ProcessROC, ProcessROCConfig
 from .collaborator_agent_instance import (
     CollaboratorAgent,
 )
+from .events import (
+    AgentEvent,
+    TextDelta,
+    TraceStep,
+    ToolCall,
+    ToolResult,
+    FileOutput,
+    Usage,
+    InvocationComplete,
+)
+from .output import OutputSink, NullSink, ConsoleSink, FileSink, CallbackSink
+from .transport import Transport, ThreadTransport, AioBotocoreTransport
+from .tool_execution import (
+    ExecutionMode,
+    ToolExecutionConfig,
+    ToolExecutor,
+    ToolTimeoutError,
+    execution_mode,
+    tool_executor,
+)
+from .result_processing import (
+    ResultProcessor,
+    ToolResultConfig,
+    estimate_tokens,
+    result_processor,
+)
+from .loop_guard import LoopGuard, LoopGuardConfig, ToolCallLedger
+from .tool_selection import ToolIndex, ToolSelection, ToolSelectionConfig, ToolSelector
+from .retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    InvocationError,
+    RetryConfig,
+    RetryPolicy,
+)
 
 __all__ = [
     "InlineAgent",
     "require_confirmation",
     "ProcessROC",
+    "ProcessROCConfig",
     "CollaboratorAgent",
+    "Transport",
+    "ThreadTransport",
+    "AioBotocoreTransport",
+    "AgentEvent",
+    "TextDelta",
+    "TraceStep",
+    "ToolCall",
+    "ToolResult",
+    "FileOutput",
+    "Usage",
+    "InvocationComplete",
+    "OutputSink",
+    "NullSink",
+    "ConsoleSink",
+    "FileSink",
+    "CallbackSink",
+    "ExecutionMode",
+    "ToolExecutionConfig",
+    "ToolExecutor",
+    "ToolTimeoutError",
+    "execution_mode",
+    "tool_executor",
+    "ResultProcessor",
+    "ToolResultConfig",
+    "estimate_tokens",
+    "result_processor",
+    "LoopGuard",
+    "LoopGuardConfig",
+    "ToolCallLedger",
+    "ToolIndex",
+    "ToolSelection",
+    "ToolSelectionConfig",
+    "ToolSelector",
+    "RetryPolicy",
+    "RetryConfig",
+    "CircuitBreaker",
+    "InvocationError",
+    "CircuitOpenError",
+    "ConfirmationProvider",
+    "ConfirmationConfig",
+    "ConfirmationRule",
+    "ConsoleConfirmationProvider",
+    "CallbackConfirmationProvider",
+    "WebhookConfirmationProvider",
+    "PolicyConfirmationProvider",
+    "AgentBundler",
+    "AgentBundleConfig",
 ]
@@ -0,0 +1,324 @@
+"""Build-time agent bundles.
+
+    python -m InlineAgent.build_bundle lambda_function_new:build_agent -o agent_bundle.json
+
+imports the factory (sync or async, returning an `InlineAgent`), resolves the
+agent once and writes the bundle. Passing the loaded bundle back as
+`InlineAgent(..., bundle=...)` skips `list_knowledge_bases`, `list_agents` and
+docstring parsing at cold start; `MCPServer.create(..., tools=...)` skips
+`list_tools`. Those listings are never compared with the live servers, so how
+fresh they are depends only on `AGENT_BUNDLE_MAX_AGE`. Checking the bundle's
+account needs the account id, which costs no STS call once
+`identity_resolver.observe_lambda_context(context)` has run.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from termcolor import colored
+
+from InlineAgent.action_group import ActionGroup, ActionGroups
+from InlineAgent.action_group.schema_cache import SchemaCache
+from InlineAgent.agent.collaborator_agent_instance import CollaboratorAgent
+from InlineAgent.constants import TraceColor
+from InlineAgent.knowledge_base import KnowledgeBasePlugin
+from InlineAgent.types.bundle import BUNDLE_FORMAT_VERSION, AgentBundle
+
+
+class AgentBundleConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    AGENT_BUNDLE_PATH: Optional[str] = None
+    # Bundles older than this many seconds are ignored; this also bounds how stale
+    # the bundled MCP tool listings can get.
+    AGENT_BUNDLE_MAX_AGE: Optional[float] = 86400
+
+
+class AgentBundler:
+    """Builds, stores and validates `AgentBundle`s.
+
+    A bundle is used only when it is readable, of the current format, younger
+    than `max_age`, built for the current region (when `AWS_REGION` is set) and
+    account and from the same agent definition; otherwise the agent resolves
+    everything live as before.
+    """
+
+    @staticmethod
+    def fingerprint(
+        agent,
+        knowledge_bases: Optional[List] = None,
+        action_groups: Optional[Any] = None,
+    ) -> str:
+        """Hash of what the bundle's contents were resolved from. Cheap: no network
+        calls and no docstring parsing. `knowledge_bases` and `action_groups`
+        default to the agent's, which `InlineAgent` resolves in place."""
+        if knowledge_bases is None:
+            knowledge_bases = agent.knowledge_bases
+        if action_groups is None:
+            action_groups = agent.action_groups
+        definition = {
+            "foundation_model": agent.foundation_model,
+            "agent_name": agent.agent_name,
+            "instruction": agent.instruction,
+            "agent_collaboration": agent.agent_collaboration,
+            "user_input": agent.user_input,
+            "knowledge_bases": [
+                (
+                    knowledge_base.model_dump(
+                        include={"name", "description", "additional_props"}
+                    )
+                    if isinstance(knowledge_base, KnowledgeBasePlugin)
+                    else knowledge_base
+                )
+                for knowledge_base in knowledge_bases or []
+            ],
+            "action_groups": [
+                AgentBundler._action_group_definition(action_group)
+                for action_group in (
+                    action_groups.action_groups
+                    if isinstance(action_groups, ActionGroups)
+                    else action_groups or []
+                )
+            ],
+            "collaborators": [
+                (
+                    [
+                        collaborator.agent_name,
+                        collaborator.agent_alias_id,
+                        collaborator.routing_instruction,
+                        collaborator.relay_conversationHistory,
+                    ]
+                    if isinstance(collaborator, CollaboratorAgent)
+                    else getattr(collaborator, "definition_fingerprint", None)
+                )
+                for collaborator in agent.collaborators or []
+            ],
+        }
+        return hashlib.sha256(
+            json.dumps(definition, sort_keys=True, default=repr).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def bundle_fingerprint(definition_fingerprint: str, account_id: Optional[str]) -> str:
+        """`fingerprint` extended with the account the bundle was resolved in."""
+        return hashlib.sha256(
+            json.dumps([definition_fingerprint, account_id]).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def mcp_tool_listings(agent) -> Dict[str, List[Dict]]:
+        """Tool listings of the agent's MCP clients by server id."""
+        clients = agent.mcp_clients
+        if not clients and isinstance(agent.action_groups, (ActionGroups, list)):
+            clients = [
+                client
+                for action_group in (
+                    agent.action_groups.action_groups
+                    if isinstance(agent.action_groups, ActionGroups)
+                    else agent.action_groups
+                )
+                if isinstance(action_group, ActionGroup)
+                for client in action_group.mcp_clients or []
+            ]
+        return {
+            client.server_id: [
+                tool.model_dump(mode="json", by_alias=True, exclude_none=True)
+                for tool in client.tools
+            ]
+            for client in clients
+        }
+
+    @staticmethod
+    def _account_id(agent) -> Optional[str]:
+        try:
+            return agent.account_id
+        except Exception:
+            return None
+
+    @staticmethod
+    def _action_group_definition(action_group) -> Any:
+        if not isinstance(action_group, ActionGroup):
+            return action_group
+        return {
+            "name": action_group.name,
+            "description": action_group.description,
+            "lambda_name": action_group.lambda_name,
+            "tools": [
+                [
+                    tool.__name__,
+                    SchemaCache.source_hash(
+                        tool, action_group.argument_key, action_group.return_key
+                    ),
+                ]
+                for tool in action_group.tools
+            ],
+            "function_schema": [
+                function_schema.model_dump()
+                for function_schema in action_group.function_schema
+            ],
+            "api_schema": (
+                action_group.api_schema.model_dump() if action_group.api_schema else None
+            ),
+            "mcp_clients": [
+                getattr(client, "server_id", None)
+                for client in action_group.mcp_clients or []
+            ],
+            "builtin_tools": action_group.builtin_tools,
+        }
+
+    @staticmethod
+    def build(agent) -> AgentBundle:
+        """Resolve everything the agent needs; `agent` is a live `InlineAgent`."""
+        try:
+            region = agent.region
+        except Exception:
+            region = None
+        account_id = AgentBundler._account_id(agent)
+
+        return AgentBundle(
+            agent_name=agent.agent_name,
+            fingerprint=AgentBundler.bundle_fingerprint(
+                agent.definition_fingerprint, account_id
+            ),
+            region=region,
+            account_id=account_id,
+            knowledge_bases=agent.knowledge_bases or [],
+            action_groups=agent.action_groups or [],
+            collaborators={
+                collaborator.agent_name: collaborator.to_dict()
+                for collaborator in agent.collaborators or []
+                if isinstance(collaborator, CollaboratorAgent)
+            },
+            mcp_tools=AgentBundler.mcp_tool_listings(agent),
+        )
+
+    @staticmethod
+    def save(bundle: AgentBundle, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(bundle.model_dump_json(indent=2))
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def load(
+        path: Optional[str] = None, max_age: Optional[float] = None
+    ) -> Optional[AgentBundle]:
+        """Load a bundle, or return None when it is missing, unreadable or stale.
+
+        `path` and `max_age` default to `AGENT_BUNDLE_PATH` and `AGENT_BUNDLE_MAX_AGE`.
+        """
+        config = AgentBundleConfig()
+        path = path or config.AGENT_BUNDLE_PATH
+        max_age = max_age if max_age is not None else config.AGENT_BUNDLE_MAX_AGE
+        if not path:
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                bundle = AgentBundle.model_validate_json(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValidationError) as e:
+            AgentBundler._skip(f"cannot read {path}: {e}")
+            return None
+
+        if bundle.format_version != BUNDLE_FORMAT_VERSION:
+            AgentBundler._skip(f"format {bundle.format_version} is not supported")
+            return None
+        if max_age is not None and time.time() - bundle.created_at > max_age:
+            AgentBundler._skip(f"built {time.time() - bundle.created_at:.0f}s ago")
+            return None
+        return bundle
+
+    @staticmethod
+    def check(bundle: AgentBundle, agent) -> Optional[AgentBundle]:
+        """Return the bundle if it was built for this agent definition, region and
+        account. `agent` is the `InlineAgent` being built."""
+        region = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION")
+        if region and bundle.region and region != bundle.region:
+            AgentBundler._skip(f"built for {bundle.region}, running in {region}")
+            return None
+        account_id = AgentBundler._account_id(agent)
+        if bundle.account_id != account_id:
+            AgentBundler._skip(
+                f"built for account {bundle.account_id}, running in {account_id}"
+            )
+            return None
+        fingerprint = AgentBundler.bundle_fingerprint(
+            agent.definition_fingerprint, account_id
+        )
+        if bundle.fingerprint != fingerprint:
+            AgentBundler._skip(f"agent {bundle.agent_name} has changed since it was built")
+            return None
+        return bundle
+
+    @staticmethod
+    def mcp_tools(
+        bundle: Optional[AgentBundle], server_id: str
+    ) -> Optional[List[Dict]]:
+        if bundle is None:
+            return None
+        return bundle.mcp_tools.get(server_id)
+
+    @staticmethod
+    def _skip(reason: str):
+        print(
+            colored(
+                f"Agent bundle not used, resolving live ({reason})",
+                TraceColor.invocation_input,
+            )
+        )
+
+
+async def _build_from_factory(factory_path: str, output: str):
+    module_name, _, attribute = factory_path.partition(":")
+    factory = getattr(importlib.import_module(module_name), attribute or "build_agent")
+    agent = factory()
+    if inspect.isawaitable(agent):
+        agent = await agent
+
+    try:
+        bundle = AgentBundler.build(agent)
+        AgentBundler.save(bundle, output)
+        print(
+            colored(
+                f"Wrote {output}: {len(bundle.action_groups)} action groups, "
+                f"{len(bundle.knowledge_bases)} knowledge bases, "
+                f"{sum(len(tools) for tools in bundle.mcp_tools.values())} MCP tools",
+                TraceColor.invocation_output,
+            )
+        )
+    finally:
+        for client in agent.mcp_clients:
+            await client.cleanup()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m InlineAgent.build_bundle",
+        description="Resolve an InlineAgent ahead of time into a JSON bundle.",
+    )
+    parser.add_argument("factory", help="module:function returning an InlineAgent")
+    parser.add_argument("-o", "--output", default="agent_bundle.json")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    asyncio.run(_build_from_factory(args.factory, args.output))
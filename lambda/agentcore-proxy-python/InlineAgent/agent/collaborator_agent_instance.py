@@ -12,10 +12,12 @@ from rich.console import Console
 from rich.markdown import Markdown
 
 
+from InlineAgent.aws import client_pool, identity_resolver
 from InlineAgent.constants import (
     TraceColor,
 )
 from InlineAgent.agent.process_roc import ProcessROC
+from InlineAgent.agent.request_template import RequestTemplate
 from InlineAgent.observability import Trace
 
 
@@ -27,20 +29,23 @@ class CollaboratorAgent:
     relay_conversationHistory: Literal["TO_COLLABORATOR", "DISABLED"] = "DISABLED"
     profile: str = "default"
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if self.__dict__.get("_initialized"):
+            RequestTemplate.invalidate(self)
+
     @property
     def session(self) -> boto3.Session:
         """Lazy loading of AWS session"""
-        return boto3.Session(profile_name=self.profile)
+        return identity_resolver.session(profile_name=self.profile)
 
     @property
     def account_id(self) -> str:
-        sts_client = self.session.client("sts")
-        identity = sts_client.get_caller_identity()
-        return identity["Account"]
+        return identity_resolver.account_id(session=self.session)
 
     @property
     def region(self) -> str:
-        return self.session.region_name
+        return identity_resolver.region(session=self.session)
 
     def __post_init__(self):
 
@@ -55,6 +60,8 @@ class CollaboratorAgent:
         if self.agent_alias_id == "TSTALIASID":
             raise ValueError("agent_alias_id cannot be 'TSTALIASID'")
 
+        self.__dict__["_initialized"] = True
+
     def to_dict(self):
 
         agent_arn = CollaboratorAgent.get_agent_arn_by_name(
@@ -77,7 +84,7 @@ class CollaboratorAgent:
     @staticmethod
     def get_agent_id_by_name(agent_name: str, session: boto3.Session):
         # Create Bedrock Agent client
-        bedrock_agent = session.client("bedrock-agent")
+        bedrock_agent = client_pool.client("bedrock-agent", session=session)
 
         # List all agents and find the one matching the name
         paginator = bedrock_agent.get_paginator("list_agents")
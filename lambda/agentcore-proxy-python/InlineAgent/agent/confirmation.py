@@ -1,21 +1,32 @@
-from functools import wraps
-from typing import Callable
+import asyncio
+import fnmatch
+import inspect
+import logging
+import sys
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Literal, Optional, Sequence, Union
+
+import requests
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from InlineAgent.tools.decorators import tool
+from InlineAgent.types import ConfirmationRequest
+
+
+logger = logging.getLogger(__name__)
 
 
 def require_confirmation(message: str = None):
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            confirmation_message = (
-                message
-                or f"Do you want to proceed with {func.__name__.replace('_', ' ').title()}?"
-            )
-            return func(*args, **kwargs)
+    """Ask the user before the tool runs.
 
-        wrapper.__is_confirmation_required__ = True
-        return wrapper
+    Shorthand for `tool(require_confirmation=True, confirmation_message=message)`:
+    returns its wrapper, which keeps coroutine functions coroutine functions.
+    """
 
-    # decorator.__is_confirmation_required__ = True
+    def decorator(func: Callable) -> Callable:
+        return tool(func, require_confirmation=True, confirmation_message=message)
 
     # Handle both @require_confirmation and @require_confirmation()
     if callable(message):
@@ -23,3 +34,211 @@ def require_confirmation(message: str = None):
         message = None
         return decorator(func)
     return decorator
+
+
+class ConfirmationConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    # console, webhook, approve or deny. Unset: console on a terminal, else deny.
+    CONFIRMATION_PROVIDER: Optional[str] = None
+    CONFIRMATION_WEBHOOK_URL: Optional[str] = None
+    CONFIRMATION_TIMEOUT: float = Field(default=60.0)
+    # Comma separated function patterns (fnmatch) approved without asking.
+    CONFIRMATION_AUTO_APPROVE: Optional[str] = None
+
+
+class ConfirmationProvider(ABC):
+    """Decides on all pending confirmations of a returnControl event at once.
+
+    `confirm` returns one decision per request, in request order; True confirms
+    the invocation, False denies it.
+    """
+
+    @abstractmethod
+    async def confirm(self, requests: List[ConfirmationRequest]) -> List[bool]:
+        pass
+
+    @staticmethod
+    def from_config(config: Optional[ConfirmationConfig] = None) -> "ConfirmationProvider":
+        config = config or ConfirmationConfig()
+        kind = config.CONFIRMATION_PROVIDER
+        if kind is None:
+            kind = "console" if sys.stdin is not None and sys.stdin.isatty() else "deny"
+
+        if kind == "console":
+            provider = ConsoleConfirmationProvider()
+        elif kind == "webhook":
+            if not config.CONFIRMATION_WEBHOOK_URL:
+                raise ValueError("CONFIRMATION_WEBHOOK_URL is required for the webhook provider")
+            provider = WebhookConfirmationProvider(
+                url=config.CONFIRMATION_WEBHOOK_URL, timeout=config.CONFIRMATION_TIMEOUT
+            )
+        elif kind in ("approve", "deny"):
+            provider = PolicyConfirmationProvider(default=kind)
+        else:
+            raise ValueError(f"Unknown confirmation provider: {kind}")
+
+        if config.CONFIRMATION_AUTO_APPROVE:
+            patterns = [
+                pattern.strip()
+                for pattern in config.CONFIRMATION_AUTO_APPROVE.split(",")
+                if pattern.strip()
+            ]
+            provider = PolicyConfirmationProvider.auto_approve(patterns, fallback=provider)
+        return provider
+
+
+class ConsoleConfirmationProvider(ConfirmationProvider):
+    """Asks on the terminal. The prompts run in a thread so the event loop, and
+    tools that need no confirmation, keep going meanwhile."""
+
+    async def confirm(self, requests: List[ConfirmationRequest]) -> List[bool]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._ask, requests
+        )
+
+    @staticmethod
+    def _ask(requests: List[ConfirmationRequest]) -> List[bool]:
+        decisions = list()
+        for request in requests:
+            while True:
+                response = input(f"{request.message} (y/n): ").lower()
+                if response in ["y", "yes"]:
+                    decisions.append(True)
+                    break
+                elif response in ["n", "no"]:
+                    decisions.append(False)
+                    break
+                else:
+                    print("Please enter 'y' for yes or 'n' for no.")
+        return decisions
+
+
+class CallbackConfirmationProvider(ConfirmationProvider):
+    """Hands the whole batch to `callback`, which may be sync or async."""
+
+    def __init__(
+        self,
+        callback: Callable[
+            [List[ConfirmationRequest]], Union[List[bool], Awaitable[List[bool]]]
+        ],
+    ):
+        self.callback = callback
+
+    async def confirm(self, requests: List[ConfirmationRequest]) -> List[bool]:
+        decisions = self.callback(requests)
+        if inspect.isawaitable(decisions):
+            decisions = await decisions
+        return list(decisions)
+
+
+class WebhookConfirmationProvider(ConfirmationProvider):
+    """POSTs `{"requests": [...]}` to `url` and expects `{"decisions": [bool, ...]}`
+    back. Any failure, including a timeout, denies the whole batch."""
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 60.0,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.headers = headers or dict()
+
+    async def confirm(self, requests: List[ConfirmationRequest]) -> List[bool]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._post, requests
+        )
+
+    def _post(self, batch: List[ConfirmationRequest]) -> List[bool]:
+        try:
+            response = requests.post(
+                self.url,
+                json={"requests": [request.model_dump() for request in batch]},
+                headers=self.headers,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            decisions = response.json()["decisions"]
+            if len(decisions) != len(batch):
+                raise ValueError(
+                    f"expected {len(batch)} decisions, got {len(decisions)}"
+                )
+            return [decision is True for decision in decisions]
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            # Runs in a worker thread, away from the invocation's output sink.
+            logger.warning(
+                "Confirmation webhook failed, denying %d invocation(s): %s",
+                len(batch),
+                e,
+            )
+            return [False] * len(batch)
+
+
+@dataclass
+class ConfirmationRule:
+    """Decides requests whose function (and action group) match the patterns.
+
+    `when`, if given, is called with the request parameters and must return True
+    for the rule to apply.
+    """
+
+    decision: Literal["approve", "deny"]
+    function: str = "*"
+    action_group: str = "*"
+    when: Optional[Callable[[Dict], bool]] = None
+
+    def matches(self, request: ConfirmationRequest) -> bool:
+        return (
+            fnmatch.fnmatchcase(request.function, self.function)
+            and fnmatch.fnmatchcase(request.action_group, self.action_group)
+            and (self.when is None or bool(self.when(request.parameters)))
+        )
+
+
+class PolicyConfirmationProvider(ConfirmationProvider):
+    """Applies the first matching rule. Requests no rule matches go to `fallback`
+    in a single call, or get the `default` decision without one."""
+
+    def __init__(
+        self,
+        rules: Sequence[ConfirmationRule] = (),
+        fallback: Optional[ConfirmationProvider] = None,
+        default: Literal["approve", "deny"] = "deny",
+    ):
+        self.rules = list(rules)
+        self.fallback = fallback
+        self.default = default
+
+    @classmethod
+    def auto_approve(
+        cls,
+        functions: Sequence[str],
+        fallback: Optional[ConfirmationProvider] = None,
+    ) -> "PolicyConfirmationProvider":
+        return cls(
+            rules=[ConfirmationRule("approve", function=function) for function in functions],
+            fallback=fallback,
+        )
+
+    async def confirm(self, requests: List[ConfirmationRequest]) -> List[bool]:
+        decisions: List[Optional[bool]] = list()
+        for request in requests:
+            rule = next((rule for rule in self.rules if rule.matches(request)), None)
+            decisions.append(None if rule is None else rule.decision == "approve")
+
+        undecided = [index for index, decision in enumerate(decisions) if decision is None]
+        if undecided and self.fallback is not None:
+            answers = await self.fallback.confirm([requests[index] for index in undecided])
+            for index, answer in zip(undecided, answers):
+                decisions[index] = answer
+        return [
+            self.default == "approve" if decision is None else decision
+            for decision in decisions
+        ]
@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from InlineAgent.types import InvocationResult
+
+
+@dataclass
+class AgentEvent:
+    session_id: str
+
+
+@dataclass
+class TextDelta(AgentEvent):
+    """A decoded `chunk` of the final answer."""
+
+    text: str
+    citations: Optional[List[Dict]] = None
+
+
+@dataclass
+class TraceStep(AgentEvent):
+    """A raw `trace` event as sent by Bedrock."""
+
+    trace: Dict
+    caller_chain: List[Dict] = field(default_factory=list)
+
+
+@dataclass
+class ToolCall(AgentEvent):
+    """One `invocationInput` of a `returnControl` event, before the tool runs."""
+
+    invocation_id: str
+    action_group: str
+    function: str
+    parameters: List[Dict]
+    invocation_type: str
+
+
+@dataclass
+class ToolResult(AgentEvent):
+    """The `functionResult` sent back to Bedrock for a tool call."""
+
+    invocation_id: str
+    action_group: str
+    function: str
+    function_result: Dict
+
+
+@dataclass
+class FileOutput(AgentEvent):
+    """A file produced by code interpreter."""
+
+    name: str
+    type: str
+    bytes: bytes
+
+
+@dataclass
+class Usage(AgentEvent):
+    """Token usage reported by one trace step."""
+
+    input_tokens: int
+    output_tokens: int
+    llm_calls: int
+
+
+@dataclass
+class InvocationComplete(AgentEvent):
+    """Last event of a stream, carrying the totals of the whole invocation."""
+
+    result: InvocationResult
+
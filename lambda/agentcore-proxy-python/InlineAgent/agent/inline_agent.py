@@ -1,35 +1,64 @@
 from dataclasses import dataclass, field
-from datetime import datetime, UTC
 
-import json
+import asyncio
+import inspect
 import uuid
-import copy
-import os
 import boto3
-from typing import Callable, Dict, List, Literal, Optional, Tuple, Union
-from pydantic import Field
-from termcolor import colored
-from rich.console import Console
-from rich.markdown import Markdown
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Union,
+)
 
 
 from InlineAgent.action_group import ActionGroups
+from InlineAgent.aws import client_pool, identity_resolver
 from InlineAgent.action_group.action_group import ActionGroup
 from InlineAgent.agent.collaborator_agent_instance import CollaboratorAgent
+from InlineAgent.deadline import Deadline
 from InlineAgent.constants import (
     USER_INPUT_ACTION_GROUP_NAME,
     TraceColor,
 )
+from InlineAgent.agent.events import (
+    AgentEvent,
+    FileOutput,
+    InvocationComplete,
+    TextDelta,
+    ToolCall,
+    ToolResult,
+    TraceStep,
+    Usage,
+)
+from InlineAgent.agent.output import ConsoleSink, NullSink, OutputSink
+from InlineAgent.agent.bundle import AgentBundler
+from InlineAgent.agent.confirmation import ConfirmationProvider
+from InlineAgent.agent.loop_guard import LoopGuard
 from InlineAgent.agent.process_roc import ProcessROC
+from InlineAgent.agent.request_template import RequestTemplate
+from InlineAgent.agent.retry import InvocationError, RetryPolicy
+from InlineAgent.agent.tool_selection import ToolSelector
+from InlineAgent.agent.transport import ThreadTransport, Transport
 from InlineAgent.observability import Trace
+from InlineAgent.observability.metrics import (
+    InvocationMetricsCollector,
+    MetricsBackend,
+)
+from InlineAgent.storage import FileWriter, default_file_writer
 from InlineAgent.knowledge_base import KnowledgeBasePlugin
 from InlineAgent.tools.mcp import MCPServer
+from InlineAgent.utils import AgentAppConfig
 from InlineAgent.types import (
+    AgentBundle,
     InlineCollaboratorAgentConfig,
     InlineCollaboratorConfigurations,
+    InvocationResult,
 )
 
-import requests
 
 @dataclass
 class InlineAgent:
@@ -51,64 +80,77 @@ class InlineAgent:
     profile: str = field(default="default")
     user_input: bool = False
     tool_map: Dict[str, Callable] = None
+    transport: Optional[Transport] = None
+    output_sink: Optional[OutputSink] = None
+    file_writer: Optional[FileWriter] = None
+    metrics_backend: Optional[MetricsBackend] = None
+    retry_policy: Optional[RetryPolicy] = None
+    loop_guard: Optional[LoopGuard] = None
+    confirmation_provider: Optional[ConfirmationProvider] = None
+    tool_selector: Optional[ToolSelector] = None
+    bundle: Optional[AgentBundle] = None
+    mcp_clients: List[MCPServer] = field(default_factory=list, init=False, repr=False)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # Fields set while the agent is constructed have no template to invalidate.
+        if self.__dict__.get("_initialized") and name not in (
+            "tool_map",
+            "transport",
+            "output_sink",
+            "file_writer",
+            "metrics_backend",
+            "retry_policy",
+            "loop_guard",
+            "confirmation_provider",
+            "tool_selector",
+            "mcp_clients",
+            "profile",
+        ):
+            if name == "collaborators":
+                self._embed_collaborators()
+            if name in self.__dict__["_definition"]:
+                self.__dict__["_definition"][name] = value
+            self.__dict__.pop("_definition_fingerprint", None)
+            RequestTemplate.invalidate(self)
 
     @property
     def session(self) -> boto3.Session:
         """Lazy loading of AWS session"""
-        try:
-            return boto3.Session(profile_name=self.profile)
-        except:
-            region = self._get_region_from_ec2_metadata()
-            return boto3.Session(region_name=region)
+        return identity_resolver.session(profile_name=self.profile)
 
     @property
     def account_id(self) -> str:
-        sts_client = self.session.client("sts")
-        identity = sts_client.get_caller_identity()
-        return identity["Account"]
+        return identity_resolver.account_id(session=self.session)
 
     @property
     def region(self) -> str:
-        return self.session.region_name
+        return identity_resolver.region(session=self.session)
 
-    def _get_region_from_ec2_metadata(self) -> Optional[str]:
-        """
-        Retrieve the current region from EC2 Instance Metadata Service (IMDSv2).
-        
-        Returns:
-            Optional[str]: AWS region name or None if unavailable
-        """
-        try:
-            # Step 1: Get session token for IMDSv2
-            token_response = requests.put(
-                "http://169.254.169.254/latest/api/token",
-                headers={"X-aws-ec2-metadata-token-ttl-seconds": "21600"},
-                timeout=2
-            )
-            
-            if token_response.status_code != 200:
-                return None
-            
-            token = token_response.text
-            
-            # Step 2: Use token to get region
-            region_response = requests.get(
-                "http://169.254.169.254/latest/meta-data/placement/region",
-                headers={"X-aws-ec2-metadata-token": token},
-                timeout=2
+    @property
+    def definition_fingerprint(self) -> str:
+        """See `AgentBundler.fingerprint`; computed on first use, which is only when
+        a bundle is checked or built."""
+        if "_definition_fingerprint" not in self.__dict__:
+            self.__dict__["_definition_fingerprint"] = AgentBundler.fingerprint(
+                self, **self.__dict__["_definition"]
             )
-            
-            if region_response.status_code == 200:
-                return region_response.text
-            
-            return None
-            
-        except requests.RequestException as e:
-            return None
-        
+        return self.__dict__["_definition_fingerprint"]
+
     def __post_init__(self):
 
-        if self.knowledge_bases:
+        # Resolved below in place; kept for `definition_fingerprint`.
+        self.__dict__["_definition"] = {
+            "knowledge_bases": self.knowledge_bases,
+            "action_groups": self.action_groups,
+        }
+        # A bundle built from this very definition replaces live resolution.
+        if self.bundle is not None:
+            self.bundle = AgentBundler.check(self.bundle, self)
+
+        if self.bundle is not None:
+            self.knowledge_bases = list(self.bundle.knowledge_bases)
+        elif self.knowledge_bases:
             knowledge_bases_list = list()
             for knowledge_base in self.knowledge_bases:
                 if not isinstance(knowledge_base, KnowledgeBasePlugin):
@@ -127,10 +169,19 @@ class InlineAgent:
                 self.action_groups = ActionGroups(action_groups=self.action_groups)
 
             self.tool_map = self.action_groups.tool_map
-
-            self.action_groups = self.action_groups.actionGroups
-
-        if self.user_input:
+            self.mcp_clients = [
+                client
+                for action_group in self.action_groups.action_groups
+                for client in action_group.mcp_clients or []
+            ]
+
+            if self.bundle is None:
+                self.action_groups = self.action_groups.actionGroups
+
+        if self.bundle is not None:
+            # Already includes the user input action group.
+            self.action_groups = list(self.bundle.action_groups)
+        elif self.user_input:
             if self.action_groups:
                 self.action_groups.append(
                     {
@@ -179,7 +230,24 @@ class InlineAgent:
         if not self.collaborator_configuration.instruction:
             self.collaborator_configuration.instruction = self.instruction
 
+        self._embed_collaborators()
+        self.__dict__["_initialized"] = True
+
     def get_invoke_params(self) -> Dict:
+        return dict(RequestTemplate.get(self, self._build_invoke_params))
+
+    def invalidate_invoke_params(self):
+        """Drop the compiled request template after mutating a field in place, e.g.
+        `agent.action_groups.append(...)` or `agent.collaborators.append(...)`.
+        Assigning a field does this automatically."""
+        self._embed_collaborators()
+        RequestTemplate.invalidate(self)
+
+    def _embed_collaborators(self):
+        for collaborator in self.collaborators or []:
+            RequestTemplate.embed(parent=self, child=collaborator)
+
+    def _build_invoke_params(self) -> Dict:
         invokeParams = dict()
         match self.agent_collaboration:
             case "DISABLED":
@@ -200,7 +268,15 @@ class InlineAgent:
                 for collaborator in self.collaborators:
 
                     if isinstance(collaborator, CollaboratorAgent):
-                        collaborator_configurations.append(collaborator.to_dict())
+                        if (
+                            self.bundle is not None
+                            and collaborator.agent_name in self.bundle.collaborators
+                        ):
+                            collaborator_configurations.append(
+                                self.bundle.collaborators[collaborator.agent_name]
+                            )
+                        else:
+                            collaborator_configurations.append(collaborator.to_dict())
                     elif isinstance(collaborator, InlineAgent):
                         collaborator_configurations.append(
                             {
@@ -257,182 +333,537 @@ class InlineAgent:
         bedrock_model_configurations: Dict = {
             "performanceConfig": {"latency": "standard"}
         },
+        return_metrics: bool = False,
+        deadline: Optional[Deadline] = None,
     ):
-        if session_state is None:
-            session_state = {}
-
-        print(f"SessionId: {session_id}")
+        """Invoke the agent and return its answer.
 
-        agent_answer = ""
-        
-        bedrock_agent_runtime = self.session.client(
-            "bedrock-agent-runtime"
+        With `return_metrics=True` an `(answer, InvocationMetrics)` tuple is returned.
+        A `deadline` (e.g. `Deadline.from_lambda_context(context)`) bounds retries
+        and cancels tools that would overrun it.
+        """
+        result = await self._invoke(
+            input_text=input_text,
+            enable_trace=enable_trace,
+            session_id=session_id,
+            end_session=end_session,
+            session_state=session_state,
+            add_citation=add_citation,
+            process_response=process_response,
+            truncate_response=truncate_response,
+            streaming_configurations=streaming_configurations,
+            bedrock_model_configurations=bedrock_model_configurations,
+            deadline=deadline,
         )
+        if isinstance(result, InvocationResult):
+            if return_metrics:
+                return result.answer, result.metrics
+            return result.answer
+        return result
+
+    async def invoke_many(
+        self,
+        prompts: List[Union[str, Dict]],
+        max_concurrency: int = 8,
+        **invoke_kwargs,
+    ) -> List[InvocationResult]:
+        """Invoke the agent for many prompts concurrently.
+
+        Args:
+            prompts: Either input strings or dicts with `input_text` and optionally
+                `session_id` and `session_state`. A new session id is generated when
+                none is given.
+            max_concurrency: Maximum number of invocations in flight at once.
+            invoke_kwargs: Keyword arguments forwarded to every `invoke()` call.
+                `return_metrics` is ignored; every result carries its metrics.
+
+        Returns:
+            One `InvocationResult` per prompt, in input order. Failed invocations carry
+            the error instead of raising.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        if not invoke_kwargs.get("process_response", True):
+            raise ValueError("process_response=False is not supported by invoke_many")
+
+        invoke_kwargs.pop("return_metrics", None)
+        # Checked up front so a typo fails the call instead of every item.
+        accepted = set(inspect.signature(self._invoke).parameters) - {"transport"}
+        unknown = sorted(set(invoke_kwargs) - accepted)
+        if unknown:
+            raise TypeError(
+                f"invoke_many() got unexpected keyword arguments: {', '.join(unknown)}"
+            )
+        for prompt in prompts:
+            if isinstance(prompt, dict):
+                unknown = set(prompt) - {"input_text", "session_id", "session_state"}
+                if unknown or "input_text" not in prompt:
+                    raise ValueError(
+                        "invoke_many prompts take input_text and optionally "
+                        f"session_id and session_state, got {sorted(prompt)}"
+                    )
 
-        inlineSessionState = copy.deepcopy(session_state)
+        # One transport for the whole batch so every run shares a client and pool.
+        transport = self._get_transport()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(prompt: Union[str, Dict]) -> InvocationResult:
+            if isinstance(prompt, str):
+                prompt = {"input_text": prompt}
+            session_id = prompt.get("session_id") or str(uuid.uuid4())
+
+            async with semaphore:
+                try:
+                    return await self._invoke(
+                        **{
+                            **invoke_kwargs,
+                            **prompt,
+                            "session_id": session_id,
+                            "transport": transport,
+                        }
+                    )
+                except Exception as e:
+                    return InvocationResult(
+                        session_id=session_id,
+                        input_text=prompt["input_text"],
+                        error=str(e),
+                    )
 
-        total_input_tokens = 0
-        total_output_tokens = 0
-        total_llm_calls = 0
+        return await asyncio.gather(*(run(prompt) for prompt in prompts))
 
-        time_before_call = datetime.now(UTC)
-        cite = None
-        orch_step = 0
-        sub_step = 0
-
-        stream_final_response = streaming_configurations["streamFinalResponse"]
-        # print(self.get_invoke_params())
-        while not agent_answer:
-            if inlineSessionState:
-                response = bedrock_agent_runtime.invoke_inline_agent(
-                    sessionId=session_id,
-                    inputText=input_text,
-                    enableTrace=enable_trace,
-                    endSession=end_session,
-                    inlineSessionState=inlineSessionState,
-                    streamingConfigurations=streaming_configurations,
-                    bedrockModelConfigurations=bedrock_model_configurations,
-                    **self.get_invoke_params(),
+    async def _invoke(
+        self,
+        input_text: str,
+        enable_trace: bool = True,
+        session_id: str = None,
+        end_session: bool = False,
+        session_state: Dict = None,
+        add_citation: bool = False,
+        process_response: bool = True,
+        truncate_response: int = None,
+        streaming_configurations: Dict = {"streamFinalResponse": False},
+        bedrock_model_configurations: Dict = {
+            "performanceConfig": {"latency": "standard"}
+        },
+        transport: Transport = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Union[Dict, InvocationResult]:
+        if session_id is None:
+            session_id = str(uuid.uuid4())
+
+        output_sink = self._get_output_sink()
+        output_sink.write(f"SessionId: {session_id}\n")
+
+        if not process_response:
+            transport = transport or self._get_transport()
+            return await transport.invoke_inline_agent(
+                **self._get_request_params(
+                    input_text=input_text,
+                    session_id=session_id,
+                    enable_trace=enable_trace,
+                    end_session=end_session,
+                    session_state=session_state or {},
+                    streaming_configurations=streaming_configurations,
+                    bedrock_model_configurations=bedrock_model_configurations,
                 )
-            else:
-                response = bedrock_agent_runtime.invoke_inline_agent(
-                    sessionId=session_id,
-                    inputText=input_text,
-                    enableTrace=enable_trace,
-                    endSession=end_session,
-                    streamingConfigurations=streaming_configurations,
-                    bedrockModelConfigurations=bedrock_model_configurations,
-                    **self.get_invoke_params(),
+            )
+
+        cite = None
+        files_written = list()
+        file_writer = self.file_writer or default_file_writer()
+
+        async for event in self.stream(
+            input_text=input_text,
+            enable_trace=enable_trace,
+            session_id=session_id,
+            end_session=end_session,
+            session_state=session_state,
+            truncate_response=truncate_response,
+            streaming_configurations=streaming_configurations,
+            bedrock_model_configurations=bedrock_model_configurations,
+            transport=transport,
+            verbose=output_sink.verbose,
+            deadline=deadline,
+        ):
+            if isinstance(event, FileOutput):
+                if not files_written:
+                    output_sink.write("\n\nFiles saved in output directory\n")
+                files_written.append(
+                    await file_writer.asubmit(
+                        session_id=event.session_id, name=event.name, data=event.bytes
+                    )
                 )
 
-            if not process_response:
-                return response
+            # Get Final Answer
+            elif isinstance(event, TextDelta):
+                if add_citation and event.citations is not None and output_sink.verbose:
+                    _, cite = Trace.add_citation(
+                        citations=event.citations,
+                        cite=1 if not cite else cite,
+                    )
+                else:
+                    # Only the delta is written, so output stays linear in answer size.
+                    output_sink.write(event.text, TraceColor.final_output)
+
+            elif isinstance(event, InvocationComplete):
+                result = event.result
+
+        if files_written:
+            # Only this invocation's files: the writer may be shared.
+            await file_writer.aflush(files_written)
+
+        output_sink.write(
+            f"\nAgent made a total of {result.llm_calls} LLM calls, "
+            + f"using {result.total_tokens} tokens "
+            + f"(in: {result.input_tokens}, out: {result.output_tokens})"
+            + f", and took {result.duration_seconds:,.1f} total seconds\n",
+            TraceColor.stats,
+        )
+        output_sink.flush()
 
-            inlineSessionState = copy.deepcopy(session_state)
+        return result
 
-            event_stream = response["completion"]
+    async def stream(
+        self,
+        input_text: str,
+        enable_trace: bool = True,
+        session_id: str = None,
+        end_session: bool = False,
+        session_state: Dict = None,
+        truncate_response: int = None,
+        streaming_configurations: Dict = {"streamFinalResponse": False},
+        bedrock_model_configurations: Dict = {
+            "performanceConfig": {"latency": "standard"}
+        },
+        transport: Transport = None,
+        verbose: bool = True,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncIterator[AgentEvent]:
+        """Invoke the agent and yield typed events as soon as they are decoded.
+
+        Return of control is handled inline: a `ToolCall` is yielded for every
+        invocation input, the tools run, and a `ToolResult` is yielded for every
+        result before the agent is invoked again. The last event is always an
+        `InvocationComplete` with the totals of the invocation. With `verbose=False`
+        trace steps are only counted, not printed.
+        """
+        if session_state is None:
+            session_state = {}
+
+        if session_id is None:
+            session_id = str(uuid.uuid4())
+
+        transport = transport or self._get_transport()
+        output_sink = self._get_output_sink()
+
+        # The caller's dict is only read, never mutated, so it is not copied.
+        inlineSessionState = session_state
+
+        answer_chunks: List[str] = []
+        collector = InvocationMetricsCollector()
+        retry_policy = self._get_retry_policy()
+        # State sent with the current request; a failed request is resent with it,
+        # so a retry never re-runs tools whose results Bedrock has not seen yet.
+        request_state = inlineSessionState
+        stream_failures = 0
+        loop_guard = self._get_loop_guard()
+        limit_refused = False
+
+        # With a large catalog only the tools relevant to the input are sent; the
+        # model asks for more through `request_more_tools`.
+        tool_selection = self._get_tool_selector().select(
+            action_groups=RequestTemplate.get(self, self._build_invoke_params).get(
+                "actionGroups"
+            ),
+            query=input_text,
+            session_id=session_id,
+        )
+        tool_map = self.tool_map
+        if tool_selection is not None:
+            tool_map = tool_selection.tool_map(self.tool_map)
+
+        while not answer_chunks:
+            collector.on_request()
+            action_groups = None
+            if tool_selection is not None:
+                action_groups = tool_selection.action_groups()
+                collector.on_tool_selection(
+                    tools_offered=len(tool_selection.selected),
+                    tokens_saved=tool_selection.tokens_saved(action_groups),
+                )
+            response, event_stream = await retry_policy.open_stream(
+                transport=transport,
+                request_params=self._get_request_params(
+                    input_text=input_text,
+                    session_id=session_id,
+                    enable_trace=enable_trace,
+                    end_session=end_session,
+                    session_state=request_state,
+                    streaming_configurations=streaming_configurations,
+                    bedrock_model_configurations=bedrock_model_configurations,
+                    action_groups=action_groups,
+                ),
+                model=self.foundation_model,
+                deadline=deadline,
+            )
+
+            inlineSessionState = session_state
+            roc_completed = False
 
             try:
-                for event in event_stream:
-                    # print(json.dumps(event, indent=2, default=str))
+                async for event in event_stream:
+                    collector.on_event()
+
                     if "files" in event:
-                        files_event = event["files"]
-
-                        console = Console()
-                        print("\n\n")
-                        console.print(Markdown("**Files saved in output directory**"))
-
-                        files_list = files_event["files"]
-                        for idx, this_file in enumerate(files_list):
-                            file_bytes = this_file["bytes"]
-
-                            # save bytes to file, given the name of file and the bytes
-                            directory_path = os.path.join(os.getcwd(), "output")
-                            if not os.path.exists(directory_path):
-                                try:
-                                    os.makedirs(directory_path, exist_ok=True)
-                                except OSError as e:
-                                    print(f"Error creating directory output: {e}")
-                                    raise
-
-                            if not os.path.exists(
-                                os.path.join(directory_path, str(session_id))
-                            ):
-                                try:
-                                    os.makedirs(
-                                        os.path.join(directory_path, str(session_id)),
-                                        exist_ok=True,
-                                    )
-                                except OSError as e:
-                                    print(f"Error creating directory output: {e}")
-                                    raise
-
-                            file_name = os.path.join(
-                                directory_path, str(session_id), this_file["name"]
+                        for this_file in event["files"]["files"]:
+                            collector.on_file(size=len(this_file["bytes"]))
+                            yield FileOutput(
+                                session_id=session_id,
+                                name=this_file["name"],
+                                type=this_file.get("type", ""),
+                                bytes=this_file["bytes"],
                             )
-                            with open(file_name, "wb") as f:
-                                f.write(file_bytes)
 
                     if "returnControl" in event:
-                        inlineSessionState = await ProcessROC.process_roc(
-                            inlineSessionState=inlineSessionState,
-                            roc_event=event["returnControl"],
-                            tool_map=self.tool_map,
-                        )
+                        roc_event = event["returnControl"]
+                        for invocationInput in roc_event["invocationInputs"]:
+                            if "functionInvocationInput" in invocationInput:
+                                functionInvocationInput = invocationInput[
+                                    "functionInvocationInput"
+                                ]
+                                yield ToolCall(
+                                    session_id=session_id,
+                                    invocation_id=roc_event["invocationId"],
+                                    action_group=functionInvocationInput["actionGroup"],
+                                    function=functionInvocationInput["function"],
+                                    parameters=functionInvocationInput.get(
+                                        "parameters", []
+                                    ),
+                                    invocation_type=functionInvocationInput[
+                                        "actionInvocationType"
+                                    ],
+                                )
+
+                        roc_started = collector.elapsed()
+                        if loop_guard.limit_reached(
+                            roc_rounds=collector.metrics.roc_rounds,
+                            llm_calls=collector.metrics.llm_calls,
+                        ):
+                            if limit_refused:
+                                # The model kept calling tools after being told to stop.
+                                output_sink.write(
+                                    "Step limit reached, ending the invocation\n",
+                                    TraceColor.error,
+                                )
+                                answer_chunks.append(loop_guard.fallback_answer)
+                                yield TextDelta(
+                                    session_id=session_id,
+                                    text=loop_guard.fallback_answer,
+                                )
+                                # The returnControl stays unanswered; release the
+                                # stream instead of leaving it open.
+                                await RetryPolicy.close_stream(response, event_stream)
+                                break
+                            limit_refused = True
+                            roc_state = ProcessROC.refuse_roc(
+                                roc_event=roc_event, message=loop_guard.limit_message
+                            )
+                        else:
+                            roc_state = await ProcessROC.process_roc(
+                                inlineSessionState=inlineSessionState,
+                                roc_event=roc_event,
+                                tool_map=tool_map,
+                                metrics_backend=self.metrics_backend,
+                                deadline=deadline,
+                                ledger=loop_guard.ledger(session_id),
+                                confirmation_provider=self.confirmation_provider,
+                                session_id=session_id,
+                                output_sink=output_sink,
+                            )
+                        inlineSessionState = roc_state
+                        collector.on_roc(seconds=collector.elapsed() - roc_started)
+                        roc_completed = True
+
+                        for invocationResult in inlineSessionState[
+                            "returnControlInvocationResults"
+                        ]:
+                            functionResult = invocationResult["functionResult"]
+                            yield ToolResult(
+                                session_id=session_id,
+                                invocation_id=roc_event["invocationId"],
+                                action_group=functionResult["actionGroup"],
+                                function=functionResult["function"],
+                                function_result=functionResult,
+                            )
 
                     # Process trace
                     if "trace" in event and "trace" in event["trace"] and enable_trace:
-
-                        # print(json.dumps(event["trace"], indent=2))
-                        input_tokens, output_tokens, llm_calls = Trace.parse_trace(
+                        collector.on_trace(trace=event["trace"]["trace"])
+                        yield TraceStep(
+                            session_id=session_id,
                             trace=event["trace"]["trace"],
-                            truncateResponse=truncate_response,
-                            agentName=self.agent_name,
+                            caller_chain=event["trace"].get("callerChain", []),
                         )
-                        total_input_tokens += int(input_tokens)
-                        total_output_tokens += int(output_tokens)
-                        total_llm_calls += int(llm_calls)
 
-                    # Get Final Answer
+                        if verbose:
+                            input_tokens, output_tokens, llm_calls = Trace.parse_trace(
+                                trace=event["trace"]["trace"],
+                                truncateResponse=truncate_response,
+                                agentName=self.agent_name,
+                            )
+                        else:
+                            input_tokens, output_tokens, llm_calls = Trace.count_usage(
+                                trace=event["trace"]["trace"]
+                            )
+                        collector.on_usage(
+                            input_tokens=int(input_tokens),
+                            output_tokens=int(output_tokens),
+                            llm_calls=int(llm_calls),
+                        )
+
+                        if llm_calls:
+                            yield Usage(
+                                session_id=session_id,
+                                input_tokens=int(input_tokens),
+                                output_tokens=int(output_tokens),
+                                llm_calls=int(llm_calls),
+                            )
+
                     if "chunk" in event:
-                        if add_citation:
-                            if "attribution" in event["chunk"]:
-                                agent_answer, cite = Trace.add_citation(
-                                    citations=event["chunk"]["attribution"][
-                                        "citations"
-                                    ],
-                                    cite=1 if not cite else cite,
-                                )
-                            else:
-                                data = event["chunk"]["bytes"]
-                                agent_answer += data.decode("utf8")
-                                print(
-                                    colored(
-                                        data.decode("utf8"), TraceColor.final_output
-                                    ),
-                                    end="",
-                                )
-                        elif not add_citation:
-                            data = event["chunk"]["bytes"]
-                            if stream_final_response:
-                                agent_answer += data.decode("utf8")
-                                print(
-                                    colored(
-                                        data.decode("utf8"), TraceColor.final_output
-                                    ),
-                                    end="",
-                                )
-                            else:
-                                agent_answer += data.decode("utf8")
-                                print(
-                                    colored(agent_answer, TraceColor.final_output),
-                                    end="",
-                                )
+                        citations = None
+                        if "attribution" in event["chunk"]:
+                            citations = event["chunk"]["attribution"]["citations"]
+
+                        if "bytes" in event["chunk"]:
+                            collector.on_chunk(size=len(event["chunk"]["bytes"]))
+                            text = event["chunk"]["bytes"].decode("utf8")
+                        else:
+                            text = "".join(
+                                citation["generatedResponsePart"]["textResponsePart"][
+                                    "text"
+                                ]
+                                for citation in citations or []
+                            )
+
+                        if text:
+                            answer_chunks.append(text)
+                        yield TextDelta(
+                            session_id=session_id, text=text, citations=citations
+                        )
 
             except Exception as e:
-                print(
-                    colored("Caught exception while invoking Agent", TraceColor.error)
-                )
-                print(colored(f"input text: {input_text}", TraceColor.error))
-                print(
-                    colored(
-                        f"request ID: {response['ResponseMetadata']['RequestId']}, retries: {response['ResponseMetadata']['RetryAttempts']}\n",
-                        TraceColor.error,
+                # Text already handed to the caller cannot be taken back, so only
+                # failures before the first chunk are retried.
+                delay = retry_policy.backoff(stream_failures, e)
+                if RetryPolicy.is_retryable(e):
+                    retry_policy.breaker(self.foundation_model).record_failure()
+                if (
+                    not answer_chunks
+                    and retry_policy.should_retry(e, stream_failures)
+                    and (deadline is None or delay < deadline.remaining())
+                ):
+                    output_sink.write(
+                        f"Retrying after error in event stream: {e}\n", TraceColor.error
                     )
+                    await asyncio.sleep(delay)
+                    stream_failures += 1
+                    if roc_completed:
+                        request_state = inlineSessionState
+                    continue
+
+                metadata = response.get("ResponseMetadata", {})
+                output_sink.write(
+                    "Caught exception while invoking Agent\n"
+                    f"input text: {input_text}\n"
+                    f"request ID: {metadata.get('RequestId')}, retries: {metadata.get('RetryAttempts')}\n\n"
+                    f"Error: {e}\n",
+                    TraceColor.error,
                 )
-                print(colored(f"Error: {e}", TraceColor.error))
-                raise Exception("Unexpected exception: ", e)
-
-        duration = datetime.now(UTC) - time_before_call
-
-        print(
-            colored(
-                f"\nAgent made a total of {total_llm_calls} LLM calls, "
-                + f"using {total_input_tokens+total_output_tokens} tokens "
-                + f"(in: {total_input_tokens}, out: {total_output_tokens})"
-                + f", and took {duration.total_seconds():,.1f} total seconds",
-                TraceColor.stats,
+                raise InvocationError(
+                    f"Error while streaming agent response: {e}",
+                    request_id=metadata.get("RequestId"),
+                    attempts=stream_failures + 1,
+                    retryable=RetryPolicy.is_retryable(e),
+                ) from e
+
+            # Only a stream read to the end closes the circuit again.
+            retry_policy.breaker(self.foundation_model).record_success()
+            request_state = inlineSessionState
+
+        if end_session:
+            loop_guard.end_session(session_id)
+            self._get_tool_selector().end_session(session_id)
+
+        metrics = collector.finish()
+        if self.metrics_backend is not None:
+            InvocationMetricsCollector.export(
+                metrics=metrics, backend=self.metrics_backend, agent_name=self.agent_name
             )
+
+        yield InvocationComplete(
+            session_id=session_id,
+            result=InvocationResult(
+                session_id=session_id,
+                input_text=input_text,
+                answer="".join(answer_chunks),
+                input_tokens=metrics.input_tokens,
+                output_tokens=metrics.output_tokens,
+                llm_calls=metrics.llm_calls,
+                duration_seconds=metrics.duration_seconds,
+                metrics=metrics,
+            ),
         )
 
-        return agent_answer
+    def _get_loop_guard(self) -> LoopGuard:
+        if self.loop_guard is None:
+            self.loop_guard = LoopGuard.from_config()
+        return self.loop_guard
+
+    def _get_retry_policy(self) -> RetryPolicy:
+        if self.retry_policy is None:
+            self.retry_policy = RetryPolicy.from_config()
+        return self.retry_policy
+
+    def _get_tool_selector(self) -> ToolSelector:
+        if self.tool_selector is None:
+            self.tool_selector = ToolSelector.from_config()
+        return self.tool_selector
+
+    def _get_transport(self) -> Transport:
+        return self.transport or ThreadTransport(
+            client=client_pool.client("bedrock-agent-runtime", session=self.session)
+        )
+
+    def _get_request_params(
+        self,
+        input_text: str,
+        session_id: str,
+        enable_trace: bool,
+        end_session: bool,
+        session_state: Dict,
+        streaming_configurations: Dict,
+        bedrock_model_configurations: Dict,
+        action_groups: Optional[List[Dict]] = None,
+    ) -> Dict:
+        request_params = {
+            "sessionId": session_id,
+            "inputText": input_text,
+            "enableTrace": enable_trace,
+            "endSession": end_session,
+            "streamingConfigurations": streaming_configurations,
+            "bedrockModelConfigurations": bedrock_model_configurations,
+            **RequestTemplate.get(self, self._build_invoke_params),
+        }
+        if action_groups is not None:
+            request_params["actionGroups"] = action_groups
+        if session_state:
+            request_params["inlineSessionState"] = session_state
+        return request_params
+
+    def _get_output_sink(self) -> OutputSink:
+        if self.output_sink is None:
+            self.output_sink = (
+                NullSink() if AgentAppConfig().INLINE_AGENT_QUIET else ConsoleSink()
+            )
+        return self.output_sink
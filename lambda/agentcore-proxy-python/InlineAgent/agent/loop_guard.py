@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from InlineAgent.tools.cache import ToolCache
+
+
+class LoopGuardConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    ROC_MAX_ROUNDS: Optional[int] = Field(default=10)
+    ROC_MAX_LLM_CALLS: Optional[int] = None
+    ROC_DEDUPLICATE: bool = Field(default=True)
+    ROC_MAX_TRACKED_SESSIONS: int = Field(default=1024)
+
+
+class ToolCallLedger:
+    """Results of the tool calls made in one session, keyed by function and
+    canonicalized parameters."""
+
+    def __init__(self):
+        self.results: Dict[str, str] = dict()
+        self.calls = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def key(action_group: str, function: str, parameters: Dict) -> str:
+        return ToolCache.key(f"{action_group}/{function}", parameters)
+
+    def lookup(self, key: str) -> Optional[str]:
+        self.calls += 1
+        body = self.results.get(key)
+        if body is not None:
+            self.duplicates += 1
+        return body
+
+    def remember(self, key: str, body: str):
+        self.results[key] = body
+
+
+class LoopGuard:
+    """Stops runaway return-of-control loops.
+
+    Repeated tool calls with identical arguments in a session are answered from
+    the session's `ToolCallLedger` instead of running the tool again. Once an
+    invocation reaches `max_roc_rounds` ROC rounds or `max_llm_calls` LLM calls
+    (counted from traces), pending tool calls are refused and the model is asked to
+    answer with what it has; if it still asks for tools, `fallback_answer` ends
+    the invocation.
+    """
+
+    fallback_answer = (
+        "I could not finish this request within the allowed number of steps. "
+        "Please narrow the question or try again."
+    )
+    limit_message = (
+        "Tool call limit reached for this request. Do not call any more tools; "
+        "answer the user now with the information you already have."
+    )
+
+    def __init__(
+        self,
+        max_roc_rounds: Optional[int] = 10,
+        max_llm_calls: Optional[int] = None,
+        deduplicate: bool = True,
+        max_tracked_sessions: int = 1024,
+    ):
+        self.max_roc_rounds = max_roc_rounds
+        self.max_llm_calls = max_llm_calls
+        self.deduplicate = deduplicate
+        self.max_tracked_sessions = max_tracked_sessions
+        self._ledgers: OrderedDict[str, ToolCallLedger] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[LoopGuardConfig] = None) -> "LoopGuard":
+        config = config or LoopGuardConfig()
+        return cls(
+            max_roc_rounds=config.ROC_MAX_ROUNDS,
+            max_llm_calls=config.ROC_MAX_LLM_CALLS,
+            deduplicate=config.ROC_DEDUPLICATE,
+            max_tracked_sessions=config.ROC_MAX_TRACKED_SESSIONS,
+        )
+
+    def ledger(self, session_id: str) -> Optional[ToolCallLedger]:
+        if not self.deduplicate:
+            return None
+        with self._lock:
+            if session_id not in self._ledgers:
+                self._ledgers[session_id] = ToolCallLedger()
+            self._ledgers.move_to_end(session_id)
+            while len(self._ledgers) > self.max_tracked_sessions:
+                self._ledgers.popitem(last=False)
+            return self._ledgers[session_id]
+
+    def end_session(self, session_id: str):
+        with self._lock:
+            self._ledgers.pop(session_id, None)
+
+    def limit_reached(self, roc_rounds: int, llm_calls: int) -> bool:
+        return (self.max_roc_rounds is not None and roc_rounds >= self.max_roc_rounds) or (
+            self.max_llm_calls is not None and llm_calls >= self.max_llm_calls
+        )
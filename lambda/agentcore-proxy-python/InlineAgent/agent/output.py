@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from termcolor import colored
+
+
+class OutputSink(ABC):
+    """Destination for the text `InlineAgent.invoke` renders while it runs.
+
+    `verbose` sinks also get the per-step trace printout from `Trace.parse_trace`;
+    other sinks only receive the answer and the final stats line.
+    """
+
+    verbose: bool = False
+
+    @abstractmethod
+    def write(self, text: str, color: Optional[str] = None):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class NullSink(OutputSink):
+    """Discards everything. Used in quiet production mode."""
+
+    def write(self, text: str, color: Optional[str] = None):
+        pass
+
+
+class ConsoleSink(OutputSink):
+    def __init__(self, verbose: bool = True):
+        self.verbose = verbose
+
+    def write(self, text: str, color: Optional[str] = None):
+        print(colored(text, color) if color else text, end="")
+
+
+class FileSink(OutputSink):
+    """Appends plain text to a file through a buffered handle."""
+
+    def __init__(self, path: str, buffer_size: int = 64 * 1024):
+        self.path = path
+        self._file = open(path, "a", buffering=buffer_size, encoding="utf-8")
+
+    def write(self, text: str, color: Optional[str] = None):
+        self._file.write(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CallbackSink(OutputSink):
+    def __init__(self, callback: Callable[[str], None]):
+        self.callback = callback
+
+    def write(self, text: str, color: Optional[str] = None):
+        self.callback(text)
@@ -0,0 +1,210 @@
+import json
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _decode_string(value: str) -> str:
+    return value
+
+
+def _decode_integer(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        # Models sometimes send integers as "3.0".
+        number = float(value)
+        if not number.is_integer():
+            raise
+        return int(number)
+
+
+def _decode_number(value: str) -> float:
+    return float(value)
+
+
+_TRUE = frozenset(("true", "1", "yes", "y"))
+_FALSE = frozenset(("false", "0", "no", "n", ""))
+
+
+def _decode_boolean(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"{value!r} is not a boolean")
+
+
+def _decode_json(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return _LooseParser(value).parse()
+
+
+class _LooseParser:
+    """Parses the `[{key=value, other=value}]` notation Bedrock uses for arrays of
+    objects when the model does not produce JSON. Scalars stay strings."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def parse(self) -> Any:
+        value = self._value(stop=",]}")
+        self._skip_spaces()
+        if self.pos != len(self.text):
+            raise ValueError(f"Cannot decode {self.text!r}")
+        return value
+
+    def _skip_spaces(self):
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def _value(self, stop: str) -> Any:
+        self._skip_spaces()
+        if self.text.startswith("[", self.pos):
+            return self._sequence("]", self._value)
+        if self.text.startswith("{", self.pos):
+            return dict(self._sequence("}", self._member))
+        return self._scalar(stop)
+
+    def _sequence(self, close: str, item: Callable) -> List:
+        self.pos += 1
+        items = list()
+        self._skip_spaces()
+        if self.text.startswith(close, self.pos):
+            self.pos += 1
+            return items
+        while True:
+            items.append(item(stop=",]}"))
+            self._skip_spaces()
+            if self.text.startswith(",", self.pos):
+                self.pos += 1
+            elif self.text.startswith(close, self.pos):
+                self.pos += 1
+                return items
+            else:
+                raise ValueError(f"Cannot decode {self.text!r}")
+
+    def _member(self, stop: str) -> Tuple[str, Any]:
+        key = self._scalar(stop="=:,]}")
+        if self.pos >= len(self.text) or self.text[self.pos] not in "=:":
+            raise ValueError(f"Cannot decode {self.text!r}")
+        self.pos += 1
+        return key, self._value(stop=stop)
+
+    def _scalar(self, stop: str) -> str:
+        start = self.pos
+        while self.pos < len(self.text) and self.text[self.pos] not in stop:
+            self.pos += 1
+        return self.text[start : self.pos].strip()
+
+
+_DECODERS: Dict[str, Callable[[str], Any]] = {
+    "string": _decode_string,
+    "integer": _decode_integer,
+    "number": _decode_number,
+    "boolean": _decode_boolean,
+    "array": _decode_json,
+    "object": _decode_json,
+}
+
+
+class ParameterDecoder:
+    """Converts the string parameters of a `functionInvocationInput` into Python
+    values, using the types of the function schema the decoder was compiled from.
+
+    Parameters missing from the schema are decoded with the type Bedrock reports.
+    Decoders are compiled once per tool by `for_tool` and keep timing counters.
+    """
+
+    def __init__(self, types: Optional[Dict[str, str]] = None):
+        self.types = dict(types or {})
+        self._decoders = {
+            name: _DECODERS.get(schema_type, _decode_string)
+            for name, schema_type in self.types.items()
+        }
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def decode(self, parameters: List[Dict]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        decoded = dict()
+        for param in parameters:
+            decoder = self._decoders.get(param["name"])
+            if decoder is None:
+                decoder = _DECODERS.get(param.get("type"), _decode_string)
+            try:
+                decoded[param["name"]] = decoder(param["value"])
+            except ValueError as e:
+                raise ValueError(
+                    f"Cannot decode parameter {param['name']}={param['value']!r}: {e}"
+                ) from e
+        self.last_seconds = time.perf_counter() - start
+        self.calls += 1
+        self.total_seconds += self.last_seconds
+        return decoded
+
+    @classmethod
+    def from_function_schema(cls, function_schema: Dict) -> "ParameterDecoder":
+        return cls(
+            types={
+                name: parameter["type"]
+                for name, parameter in function_schema["parameters"].items()
+            }
+        )
+
+    @classmethod
+    def from_input_schema(cls, input_schema: Dict) -> "ParameterDecoder":
+        return cls(
+            types={
+                name: details.get("type", "string")
+                for name, details in input_schema.get("properties", {}).items()
+                if isinstance(details.get("type", "string"), str)
+            }
+        )
+
+    @classmethod
+    def for_tool(cls, tool: Optional[Callable]) -> "ParameterDecoder":
+        """Return the cached decoder of `tool`, compiling it on first use from the
+        MCP `inputSchema` or the docstring schema of a local tool."""
+        if tool is None or isinstance(tool, str):
+            return _default_decoder
+
+        try:
+            return _tool_decoders[tool]
+        except (KeyError, TypeError):
+            pass
+
+        input_schema = getattr(tool, "__input_schema__", None)
+        if input_schema is not None:
+            decoder = cls.from_input_schema(input_schema)
+        else:
+            # Imported here: action_group imports the agent package.
+            from InlineAgent.action_group import ActionGroupBuilder
+
+            try:
+                decoder = cls.from_function_schema(
+                    ActionGroupBuilder.create_function_schema(tool)
+                )
+            except Exception:
+                decoder = cls()
+
+        with _tool_decoders_lock:
+            try:
+                _tool_decoders[tool] = decoder
+            except TypeError:
+                # Not weak-referenceable; compiled again next time.
+                pass
+        return decoder
+
+
+_default_decoder = ParameterDecoder()
+_tool_decoders: "weakref.WeakKeyDictionary[Callable, ParameterDecoder]" = (
+    weakref.WeakKeyDictionary()
+)
+_tool_decoders_lock = threading.Lock()
@@ -1,18 +1,74 @@
-import copy
-import inspect
+import asyncio
+from contextlib import nullcontext
 import json
-from typing import Any, Callable, Dict, Union
-from termcolor import colored
+import time
+from typing import Callable, Dict, List, Optional
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from InlineAgent.agent.confirmation import ConfirmationProvider
+from InlineAgent.agent.loop_guard import ToolCallLedger
+from InlineAgent.agent.output import ConsoleSink, OutputSink
+from InlineAgent.agent.parameter_decoder import ParameterDecoder
+from InlineAgent.agent.result_processing import result_processor
+from InlineAgent.agent.tool_execution import ToolTimeoutError, tool_executor
 from InlineAgent.constants import TraceColor
+from InlineAgent.deadline import Deadline
+from InlineAgent.observability.metrics import MetricsBackend, tool_metrics
+from InlineAgent.tools.cache import tool_cache
+from InlineAgent.tools.decorators import ToolMetadata
+from InlineAgent.types import ConfirmationRequest
+
+
+class ProcessROCConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    ROC_MAX_CONCURRENCY: int = Field(default=8)
+    ROC_MAX_CONCURRENCY_PER_TOOL: int = Field(default=4)
 
 
 class ProcessROC:
     @staticmethod
     async def process_roc(
-        inlineSessionState: Dict, roc_event: Dict, tool_map: Dict[str, Callable]
+        inlineSessionState: Dict,
+        roc_event: Dict,
+        tool_map: Dict[str, Callable],
+        max_concurrency: Optional[int] = None,
+        max_concurrency_per_tool: Optional[int] = None,
+        metrics_backend: Optional[MetricsBackend] = None,
+        deadline: Optional[Deadline] = None,
+        ledger: Optional[ToolCallLedger] = None,
+        confirmation_provider: Optional[ConfirmationProvider] = None,
+        session_id: Optional[str] = None,
+        output_sink: Optional[OutputSink] = None,
     ):
-        # TODO: Tool to invoke is str and callable
+        """Run every invocation input of a returnControl event and return the
+        session state carrying their results.
+
+        Invocations run concurrently, at most `max_concurrency` at a time and
+        `max_concurrency_per_tool` per function (a tool can lower its own cap with
+        `@tool(max_concurrency=...)`; calls of a tool that is not `parallel_safe`
+        never overlap). Results keep the order of the inputs.
+        All invocations needing user confirmation are sent to the
+        `confirmation_provider` (default `ConfirmationProvider.from_config()`) in a
+        single batch while the other tools already run; confirmed tools then run
+        concurrently like the rest. Parameters are decoded
+        with the tool's compiled `ParameterDecoder`; an invocation whose parameters
+        cannot be decoded is answered with a FAILURE result without running. The
+        decode time of every call is recorded as `tool.decode_time` when a
+        `metrics_backend` is given.
+        With a `deadline`, tools are cancelled when it passes (or earlier, at their
+        own timeout) and answered with a FAILURE result. With a `ledger`, a call
+        already made in the session is answered with its earlier result. Progress
+        and errors go to `output_sink` (default: the console); tool outputs only
+        to verbose sinks.
+        """
+        output_sink = output_sink or ConsoleSink()
         if "returnControlInvocationResults" in inlineSessionState:
             raise ValueError(
                 "returnControlInvocationResults key is not supported in sessionState"
@@ -21,10 +77,37 @@ class ProcessROC:
         if "invocationId" in inlineSessionState:
             raise ValueError("invocationId key is not supported in sessionState")
 
-        inlineSessionState = copy.deepcopy(inlineSessionState)
-        inlineSessionState = {"returnControlInvocationResults": []}
-        inlineSessionState["invocationId"] = roc_event["invocationId"]
+        config = ProcessROCConfig()
+        global_limit = asyncio.Semaphore(max_concurrency or config.ROC_MAX_CONCURRENCY)
+        per_tool_default = max_concurrency_per_tool or config.ROC_MAX_CONCURRENCY_PER_TOOL
+        tool_limits: Dict[str, asyncio.Semaphore] = dict()
+        confirmation_requests: List[ConfirmationRequest] = list()
+        decisions: Optional[asyncio.Future] = None
+
+        def tool_limit(function_name: str) -> asyncio.Semaphore:
+            if function_name not in tool_limits:
+                metadata = ToolMetadata.of(tool_map.get(function_name))
+                limit = metadata.max_concurrency or per_tool_default
+                if not metadata.parallel_safe:
+                    limit = 1
+                tool_limits[function_name] = asyncio.Semaphore(
+                    min(limit, per_tool_default)
+                )
+            return tool_limits[function_name]
+
+        async def run(invocation, function_name: str, confirm: bool) -> Dict:
+            # Each invocation writes into its own state so results can be put back
+            # in input order once all of them are done.
+            state = {"returnControlInvocationResults": []}
+            if confirm:
+                # Waits for the user's decision without holding a slot.
+                await invocation(state)
+            else:
+                async with global_limit, tool_limit(function_name):
+                    await invocation(state)
+            return state["returnControlInvocationResults"][0]
 
+        invocations = list()
         for invocationInput in roc_event["invocationInputs"]:
 
             # This is a Tagged Union structure. Only one of the following top level keys will be set: apiInvocationInput, functionInvocationInput.
@@ -41,31 +124,45 @@ class ProcessROC:
             functionInvocationInput = invocationInput["functionInvocationInput"]
             actionGroup = functionInvocationInput["actionGroup"]
 
-            parameters = dict()
-            for param in functionInvocationInput["parameters"]:
-                if param["type"] == "array":
-                    result = None
-                    try:
-                        result = json.loads(param["value"])
-                    except Exception:
-                        json_str = (
-                            param["value"]
-                            .replace("=", ":")
-                            .replace("[{", '[{"')
-                            .replace("}]", '"}]')
-                        )
-                        json_str = json_str.replace(", ", '", "').replace(":", '":"')
-                        result = json.loads(json_str)
-                    finally:
-                        parameters[param["name"]] = result
-                elif param["type"] == "string":
-                    parameters[param["name"]] = param["value"]
-                elif param["type"] == "number":
-                    parameters[param["name"]] = int(param["value"])
-                elif param["type"] == "boolean":
-                    parameters[param["name"]] = bool(param["value"])
-                elif param["type"] == "integer":
-                    parameters[param["name"]] = int(param["value"])
+            decoder = ParameterDecoder.for_tool(
+                tool_map.get(functionInvocationInput["function"])
+            )
+            try:
+                parameters = decoder.decode(
+                    functionInvocationInput.get("parameters", [])
+                )
+            except ValueError as e:
+                # Only this invocation fails; the model can call again with
+                # valid parameters.
+                output_sink.write(f"{e}\n", TraceColor.error)
+
+                async def invocation(
+                    state, functionInvocationInput=functionInvocationInput, error=e
+                ):
+                    state["returnControlInvocationResults"].append(
+                        {
+                            "functionResult": ProcessROC.failure_result(
+                                functionInvocationInput=functionInvocationInput,
+                                body=json.dumps(
+                                    {
+                                        "error": "invalid_parameters",
+                                        "message": f"{functionInvocationInput['function']} was not called. {error}",
+                                    }
+                                ),
+                            )
+                        }
+                    )
+
+                invocations.append(
+                    (invocation, functionInvocationInput["function"], False)
+                )
+                continue
+            if metrics_backend is not None:
+                metrics_backend.record(
+                    "tool.decode_time",
+                    decoder.last_seconds,
+                    {"function": functionInvocationInput["function"]},
+                )
             if (
                 actionInvocationType == "RESULT"
                 or actionInvocationType == "USER_CONFIRMATION_AND_RESULT"
@@ -80,112 +177,267 @@ class ProcessROC:
                     )
 
                 if actionInvocationType == "USER_CONFIRMATION_AND_RESULT":
-                    await ProcessROC.process_user_confirmation(
-                        sessionState=inlineSessionState,
+                    confirmation_requests.append(
+                        ProcessROC.confirmation_request(
+                            roc_event=roc_event,
+                            functionInvocationInput=functionInvocationInput,
+                            parameters=parameters,
+                            tool_to_invoke=tool_to_invoke,
+                            include_result=True,
+                            session_id=session_id,
+                        )
+                    )
+
+                    async def invocation(
+                        state,
                         tool_to_invoke=tool_to_invoke,
                         functionInvocationInput=functionInvocationInput,
-                        include_result=True,
                         parameters=parameters,
-                    )
+                        position=len(confirmation_requests) - 1,
+                    ):
+                        if (await decisions)[position]:
+                            async with global_limit, tool_limit(
+                                functionInvocationInput["function"]
+                            ):
+                                functionResult = await ProcessROC.invoke_roc_function(
+                                    functionInvocationInput=functionInvocationInput,
+                                    tool_to_invoke=tool_to_invoke,
+                                    confirm="CONFIRM",
+                                    parameters=parameters,
+                                    deadline=deadline,
+                                    metrics_backend=metrics_backend,
+                                    output_sink=output_sink,
+                                )
+                        else:
+                            functionResult = ProcessROC.confirmation_result(
+                                functionInvocationInput=functionInvocationInput,
+                                confirmed=False,
+                                include_result=True,
+                            )
+                        state["returnControlInvocationResults"].append(
+                            {"functionResult": functionResult}
+                        )
+
+                    confirm = True
 
                 else:
-                    inlineSessionState["returnControlInvocationResults"].append(
-                        {
-                            "functionResult": await ProcessROC.invoke_roc_function(
+
+                    async def invocation(
+                        state,
+                        tool_to_invoke=tool_to_invoke,
+                        functionInvocationInput=functionInvocationInput,
+                        parameters=parameters,
+                    ):
+                        key = previous = None
+                        if ledger is not None:
+                            key = ToolCallLedger.key(
+                                functionInvocationInput["actionGroup"],
+                                functionInvocationInput["function"],
+                                parameters,
+                            )
+                            previous = ledger.lookup(key)
+
+                        if previous is not None:
+                            functionResult = ProcessROC.duplicate_result(
+                                functionInvocationInput=functionInvocationInput,
+                                previous_body=previous,
+                            )
+                        else:
+                            functionResult = await ProcessROC.invoke_roc_function(
                                 functionInvocationInput=functionInvocationInput,
                                 tool_to_invoke=tool_to_invoke,
                                 parameters=parameters,
                                 confirm=None,
+                                deadline=deadline,
+                                metrics_backend=metrics_backend,
+                                output_sink=output_sink,
                             )
-                        }
-                    )
+                            if ledger is not None and "responseState" not in functionResult:
+                                ledger.remember(
+                                    key, functionResult["responseBody"]["TEXT"]["body"]
+                                )
+
+                        state["returnControlInvocationResults"].append(
+                            {"functionResult": functionResult}
+                        )
+
+                    confirm = False
 
             elif actionInvocationType == "USER_CONFIRMATION":
-                tool_to_invoke = functionInvocationInput["function"]
-                await ProcessROC.process_user_confirmation(
-                    sessionState=inlineSessionState,
-                    tool_to_invoke=tool_to_invoke,
+
+                confirmation_requests.append(
+                    ProcessROC.confirmation_request(
+                        roc_event=roc_event,
+                        functionInvocationInput=functionInvocationInput,
+                        parameters=parameters,
+                        tool_to_invoke=tool_map.get(functionInvocationInput["function"]),
+                        include_result=False,
+                        session_id=session_id,
+                    )
+                )
+
+                async def invocation(
+                    state,
                     functionInvocationInput=functionInvocationInput,
-                    include_result=False,
-                    parameters=parameters,
+                    position=len(confirmation_requests) - 1,
+                ):
+                    state["returnControlInvocationResults"].append(
+                        {
+                            "functionResult": ProcessROC.confirmation_result(
+                                functionInvocationInput=functionInvocationInput,
+                                confirmed=(await decisions)[position],
+                                include_result=False,
+                            )
+                        }
+                    )
+
+                confirm = True
+
+            else:
+                continue
+
+            invocations.append((invocation, functionInvocationInput["function"], confirm))
+
+        if confirmation_requests:
+            decisions = asyncio.ensure_future(
+                ProcessROC.request_confirmations(
+                    provider=confirmation_provider or ConfirmationProvider.from_config(),
+                    requests=confirmation_requests,
+                    deadline=deadline,
+                    output_sink=output_sink,
                 )
+            )
 
-        inlineSessionState.update(inlineSessionState)
+        # The results state is built fresh; the incoming state is only read.
+        inlineSessionState = {
+            "returnControlInvocationResults": list(
+                await asyncio.gather(*(run(*invocation) for invocation in invocations))
+            ),
+            "invocationId": roc_event["invocationId"],
+        }
 
         return inlineSessionState
 
     @staticmethod
-    async def process_user_confirmation(
-        sessionState: Dict,
+    def duplicate_result(functionInvocationInput: Dict, previous_body: str) -> Dict:
+        return {
+            "actionGroup": functionInvocationInput["actionGroup"],
+            "agentId": functionInvocationInput["agentId"],
+            "function": functionInvocationInput["function"],
+            "responseBody": {
+                "TEXT": {
+                    "body": f"{previous_body}\n[Note: {functionInvocationInput['function']} was already called with these arguments in this session and this is its earlier result. Do not call it again with the same arguments.]"
+                }
+            },
+        }
+
+    @staticmethod
+    def refuse_roc(roc_event: Dict, message: str) -> Dict:
+        """Answer every invocation input with a FAILURE result without running it."""
+        results = list()
+        for invocationInput in roc_event["invocationInputs"]:
+            if "functionInvocationInput" not in invocationInput:
+                continue
+            results.append(
+                {
+                    "functionResult": ProcessROC.failure_result(
+                        functionInvocationInput=invocationInput[
+                            "functionInvocationInput"
+                        ],
+                        body=message,
+                    )
+                }
+            )
+
+        return {
+            "returnControlInvocationResults": results,
+            "invocationId": roc_event["invocationId"],
+        }
+
+    @staticmethod
+    def failure_result(functionInvocationInput: Dict, body: str) -> Dict:
+        """A FAILURE result for an invocation that is not run; invocations that
+        ask for confirmation are also denied."""
+        functionResult = {
+            "actionGroup": functionInvocationInput["actionGroup"],
+            "agentId": functionInvocationInput["agentId"],
+            "function": functionInvocationInput["function"],
+            "responseBody": {"TEXT": {"body": body}},
+            "responseState": "FAILURE",
+        }
+        if functionInvocationInput["actionInvocationType"] != "RESULT":
+            functionResult["confirmationState"] = "DENY"
+        return functionResult
+
+    @staticmethod
+    def confirmation_request(
+        roc_event: Dict,
         functionInvocationInput: Dict,
-        include_result: bool,
         parameters: Dict,
-        tool_to_invoke: Union[str, Callable] = None,
-    ):
-        while True:
-            if isinstance(tool_to_invoke, Callable):
-                tool_name = tool_to_invoke.__name__
-            else:
-                tool_name = tool_to_invoke
-            confirmation_message = f"Do you want to proceed with {tool_name} with parameters : {json.dumps(parameters)}?"
-            response = input(f"{confirmation_message} (y/n): ").lower()
-            if response in ["y", "yes"]:
-                if include_result:
-                    sessionState["returnControlInvocationResults"].append(
-                        {
-                            "functionResult": await ProcessROC.invoke_roc_function(
-                                functionInvocationInput=functionInvocationInput,
-                                tool_to_invoke=tool_to_invoke,
-                                confirm="CONFIRM",
-                                parameters=parameters,
-                            )
-                        }
-                    )
-                else:
-                    sessionState["returnControlInvocationResults"].append(
-                        {
-                            "functionResult": {
-                                "actionGroup": functionInvocationInput["actionGroup"],
-                                "agentId": functionInvocationInput["agentId"],
-                                "function": functionInvocationInput["function"],
-                                "confirmationState": "CONFIRM",
-                            }
-                        }
-                    )
-                break
-            elif response in ["n", "no"]:
-                if include_result:
-                    sessionState["returnControlInvocationResults"].append(
-                        {
-                            "functionResult": {
-                                "actionGroup": functionInvocationInput["actionGroup"],
-                                "agentId": functionInvocationInput["agentId"],
-                                "function": functionInvocationInput["function"],
-                                "responseBody": {
-                                    "TEXT": {
-                                        "body": "Access Denied to this function. Do not try again."
-                                    }
-                                },
-                                "confirmationState": "DENY",
-                                # "responseState": "FAILURE"
-                            }
-                        }
-                    )
-                else:
-                    sessionState["returnControlInvocationResults"].append(
-                        {
-                            "functionResult": {
-                                "actionGroup": functionInvocationInput["actionGroup"],
-                                "agentId": functionInvocationInput["agentId"],
-                                "function": functionInvocationInput["function"],
-                                "confirmationState": "DENY",
-                                # "responseState": "FAILURE"
-                            }
-                        }
-                    )
-                break
-            else:
-                print("Please enter 'y' for yes or 'n' for no.")
+        tool_to_invoke: Optional[Callable],
+        include_result: bool,
+        session_id: Optional[str] = None,
+    ) -> ConfirmationRequest:
+        message = (
+            ToolMetadata.of(tool_to_invoke).confirmation_message
+            or f"Do you want to proceed with {functionInvocationInput['function']} with parameters : {json.dumps(parameters, default=str)}?"
+        )
+        return ConfirmationRequest(
+            invocation_id=roc_event["invocationId"],
+            action_group=functionInvocationInput["actionGroup"],
+            function=functionInvocationInput["function"],
+            parameters=parameters,
+            message=message,
+            include_result=include_result,
+            session_id=session_id,
+        )
+
+    @staticmethod
+    async def request_confirmations(
+        provider: ConfirmationProvider,
+        requests: List[ConfirmationRequest],
+        deadline: Optional[Deadline] = None,
+        output_sink: Optional[OutputSink] = None,
+    ) -> List[bool]:
+        """Ask the provider once for the whole batch. Missing answers, provider
+        errors and running out of time all deny."""
+        output_sink = output_sink or ConsoleSink()
+        try:
+            decisions = await asyncio.wait_for(
+                provider.confirm(requests),
+                deadline.timeout() if deadline is not None else None,
+            )
+        except asyncio.TimeoutError:
+            output_sink.write(
+                f"No confirmation before the deadline, denying {len(requests)} invocation(s)\n",
+                TraceColor.invocation_input,
+            )
+            return [False] * len(requests)
+        except Exception as e:
+            output_sink.write(
+                f"Confirmation failed, denying {len(requests)} invocation(s): {e}\n",
+                TraceColor.invocation_input,
+            )
+            return [False] * len(requests)
+
+        decisions = [decision is True for decision in decisions][: len(requests)]
+        return decisions + [False] * (len(requests) - len(decisions))
+
+    @staticmethod
+    def confirmation_result(
+        functionInvocationInput: Dict, confirmed: bool, include_result: bool
+    ) -> Dict:
+        functionResult = {
+            "actionGroup": functionInvocationInput["actionGroup"],
+            "agentId": functionInvocationInput["agentId"],
+            "function": functionInvocationInput["function"],
+            "confirmationState": "CONFIRM" if confirmed else "DENY",
+        }
+        if include_result and not confirmed:
+            functionResult["responseBody"] = {
+                "TEXT": {"body": "Access Denied to this function. Do not try again."}
+            }
+        return functionResult
 
     @staticmethod
     async def invoke_roc_function(
@@ -193,40 +445,115 @@ class ProcessROC:
         parameters: Dict = dict(),
         confirm: str = None,
         tool_to_invoke: Callable = None,
+        deadline: Optional[Deadline] = None,
+        metrics_backend: Optional[MetricsBackend] = None,
+        output_sink: Optional[OutputSink] = None,
     ) -> Dict:
 
+        output_sink = output_sink or ConsoleSink()
         functionResult = dict
+        timeout = None
+        hit = False
+        result_bytes = 0
+        started = time.perf_counter()
 
-        # TODO: responseState
         try:
 
-            if inspect.iscoroutinefunction(tool_to_invoke):
-                result = await tool_to_invoke(**parameters)
-            else:
-                result = tool_to_invoke(**parameters)
-
-            print(
-                colored(
-                    f"Tool output: {result}",
-                    TraceColor.invocation_input,
-                )
+            cache_key = (
+                f"{functionInvocationInput['actionGroup']}/"
+                f"{functionInvocationInput['function']}"
             )
+            metadata = ToolMetadata.of(tool_to_invoke)
+            cached = metadata.cacheable
+            if cached:
+                hit, result = await tool_cache.aget(
+                    cache_key, parameters, scope=metadata.cache_scope
+                )
+            if not hit:
+                timeout = (
+                    metadata.timeout
+                    or tool_executor.config.TOOL_DEFAULT_TIMEOUT
+                )
+                if deadline is not None:
+                    timeout = deadline.timeout(timeout)
+                # The scope makes the deadline visible to the tool via Deadline.current().
+                with deadline.scope() if deadline is not None else nullcontext():
+                    result = await tool_executor.run(
+                        tool_to_invoke, parameters, timeout=timeout
+                    )
+                if cached:
+                    await tool_cache.aset(
+                        cache_key,
+                        parameters,
+                        result,
+                        ttl=metadata.cache_ttl,
+                        scope=metadata.cache_scope,
+                    )
 
+            body, stats = await result_processor.process(result, tool=tool_to_invoke)
+            if output_sink.verbose:
+                # The compacted body, not the raw result, so output stays bounded.
+                output_sink.write(f"Tool output: {body}\n", TraceColor.invocation_input)
+            result_bytes = stats["bytes_before"]
+            outcome = "success"
+            if metrics_backend is not None:
+                for name, value in stats.items():
+                    metrics_backend.record(
+                        f"tool.result_{name}",
+                        value,
+                        {"function": functionInvocationInput["function"]},
+                    )
+
+            functionResult = {
+                "actionGroup": functionInvocationInput["actionGroup"],
+                "agentId": functionInvocationInput["agentId"],
+                "function": functionInvocationInput["function"],
+                "responseBody": {"TEXT": {"body": body}},
+            }
+        except ToolTimeoutError:
+            outcome = "timeout"
+            limit = f"{timeout:.1f} seconds" if timeout is not None else "its time limit"
+            output_sink.write(
+                f"Tool {functionInvocationInput['function']} timed out after {limit}\n",
+                TraceColor.error,
+            )
             functionResult = {
                 "actionGroup": functionInvocationInput["actionGroup"],
                 "agentId": functionInvocationInput["agentId"],
                 "function": functionInvocationInput["function"],
-                "responseBody": {"TEXT": {"body": result}},
+                "responseBody": {
+                    "TEXT": {
+                        "body": json.dumps(
+                            {
+                                "error": "timeout",
+                                "message": f"{functionInvocationInput['function']} did not finish within {limit}. Answer with the information you have.",
+                            }
+                        )
+                    }
+                },
+                "responseState": "FAILURE",
             }
         except Exception as e:
+            outcome = "failure"
             functionResult = {
                 "actionGroup": functionInvocationInput["actionGroup"],
                 "agentId": functionInvocationInput["agentId"],
                 "function": functionInvocationInput["function"],
-                "responseBody": {"TEXT": {"body": e}},
+                "responseBody": {"TEXT": {"body": str(e)}},
                 "responseState": "FAILURE",
             }
 
+        tool_metrics.record_call(
+            function=functionInvocationInput["function"],
+            action_group=functionInvocationInput["actionGroup"],
+            outcome=outcome,
+            seconds=time.perf_counter() - started,
+            argument_bytes=len(json.dumps(parameters, default=str)),
+            result_bytes=result_bytes,
+            cached=hit,
+            backend=metrics_backend,
+        )
+
         if confirm:
             if confirm == "CONFIRM":
                 functionResult["confirmationState"] = confirm
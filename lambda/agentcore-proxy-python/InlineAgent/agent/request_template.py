@@ -0,0 +1,45 @@
+import weakref
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping
+
+
+class RequestTemplate:
+    """Per-agent cache for compiled `invoke_inline_agent` parameters.
+
+    Every agent carries a version that `invalidate` bumps when a field feeding its
+    request changes after construction, and a template is reused while the version
+    is unchanged. Supervisors register with the collaborators they embed (`embed`),
+    so invalidating a collaborator also invalidates the templates of the
+    supervisors above it and of no other agent.
+    """
+
+    @staticmethod
+    def version(owner: object) -> int:
+        return owner.__dict__.get("_template_version", 0)
+
+    @staticmethod
+    def embed(parent: object, child: object):
+        # Weak, so a collaborator does not keep discarded supervisors alive.
+        parents = child.__dict__.setdefault("_template_parents", [])
+        if not any(reference() is parent for reference in parents):
+            parents.append(weakref.ref(parent))
+
+    @staticmethod
+    def invalidate(owner: object):
+        owner.__dict__["_template_version"] = RequestTemplate.version(owner) + 1
+        parents = owner.__dict__.get("_template_parents", [])
+        for reference in list(parents):
+            parent = reference()
+            if parent is None:
+                parents.remove(reference)
+            else:
+                RequestTemplate.invalidate(parent)
+
+    @staticmethod
+    def get(owner: object, build: Callable[[], Dict]) -> Mapping:
+        version = RequestTemplate.version(owner)
+        cached = owner.__dict__.get("_request_template")
+        if cached is None or cached[0] != version:
+            cached = (version, MappingProxyType(build()))
+            owner.__dict__["_request_template"] = cached
+        return cached[1]
@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import json
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from InlineAgent.storage import FileBackend, LocalDirBackend
+from InlineAgent.tools.decorators import ToolMetadata
+
+
+class ToolResultConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    # Opt-in: unset, results are only cut to a tool's own `max_result_size`.
+    TOOL_RESULT_MAX_BYTES: Optional[int] = None
+    TOOL_RESULT_SPILL_DIR: Optional[str] = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgets."""
+    return math.ceil(len(text) / 4)
+
+
+def _project(value: Any, fields: Sequence[str]) -> Any:
+    """Keep only `fields` (dotted paths such as `seller.email`) of a JSON object or
+    of every object in a JSON array."""
+    if isinstance(value, list):
+        return [_project(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    projected: Dict = dict()
+    for path in fields:
+        head, _, rest = path.partition(".")
+        if head not in value:
+            continue
+        if rest:
+            nested = _project(value[head], [rest])
+            if isinstance(projected.get(head), dict) and isinstance(nested, dict):
+                projected[head].update(nested)
+            else:
+                projected[head] = nested
+        else:
+            projected[head] = value[head]
+    return projected
+
+
+def _truncate_bytes(text: str, max_bytes: int) -> str:
+    return text.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+
+
+class ResultProcessor:
+    """Compacts tool results before they are returned to Bedrock.
+
+    Results are serialized to text (JSON for dicts and lists), projected to the
+    tool's `ToolMetadata.result_fields` when it declares them, and cut to the byte
+    budget (its `ToolMetadata.max_result_size`, else `max_bytes`; no cut when both
+    are unset). JSON arrays are cut at an
+    item boundary so the body stays valid JSON; anything else is cut at a UTF-8
+    boundary. A marker tells the model how much was dropped. With a `spill_store`
+    the full result is stored first and the marker carries its key.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        spill_store: Optional[FileBackend] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.spill_store = spill_store
+
+    @classmethod
+    def from_config(cls, config: Optional[ToolResultConfig] = None) -> "ResultProcessor":
+        config = config or ToolResultConfig()
+        return cls(
+            max_bytes=config.TOOL_RESULT_MAX_BYTES,
+            spill_store=(
+                LocalDirBackend(root=config.TOOL_RESULT_SPILL_DIR)
+                if config.TOOL_RESULT_SPILL_DIR
+                else None
+            ),
+        )
+
+    @staticmethod
+    def serialize(result: Any) -> str:
+        if isinstance(result, str):
+            return result
+        if isinstance(result, (dict, list)):
+            return json.dumps(result, default=str)
+        return str(result)
+
+    async def process(
+        self, result: Any, tool: Optional[Callable] = None
+    ) -> Tuple[str, Dict[str, int]]:
+        """Return the body to send and its before/after size estimates."""
+        body = ResultProcessor.serialize(result)
+        original = body
+        stats = {
+            "bytes_before": len(body.encode("utf-8")),
+            "tokens_before": estimate_tokens(body),
+        }
+
+        metadata = ToolMetadata.of(tool)
+        fields = metadata.result_fields
+        if fields:
+            parsed = result if isinstance(result, (dict, list)) else _loads(body)
+            if parsed is not None:
+                body = json.dumps(_project(parsed, fields), default=str)
+
+        max_bytes = metadata.max_result_size or self.max_bytes
+        size = len(body.encode("utf-8"))
+        if max_bytes is not None and size > max_bytes:
+            handle = None
+            if self.spill_store is not None:
+                handle = await self._spill(original)
+            body = ResultProcessor._truncate(body, size, max_bytes, handle)
+
+        stats["bytes_after"] = len(body.encode("utf-8"))
+        stats["tokens_after"] = estimate_tokens(body)
+        return body, stats
+
+    @staticmethod
+    def _truncate(body: str, size: int, max_bytes: int, handle: Optional[str]) -> str:
+        def marker(kept: str) -> str:
+            text = f"[truncated: showing {len(kept.encode('utf-8'))} of {size} bytes"
+            if handle is not None:
+                text += f"; full result stored as {handle}"
+            return text + "]"
+
+        # Leave room for the marker itself.
+        budget = max(0, max_bytes - len(marker("x" * max_bytes).encode("utf-8")) - 1)
+
+        parsed = _loads(body)
+        if isinstance(parsed, list):
+            items = ResultProcessor._fit_items(parsed, budget)
+            kept = json.dumps(items, default=str)
+        else:
+            kept = _truncate_bytes(body, budget)
+        return f"{kept}\n{marker(kept)}"
+
+    @staticmethod
+    def _fit_items(items: List, budget: int) -> List:
+        # Binary search for the longest prefix whose JSON fits in the budget.
+        low, high = 0, len(items)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if len(json.dumps(items[:middle], default=str).encode("utf-8")) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return items[:low]
+
+    async def _spill(self, body: str) -> str:
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"tool-results/{digest}"
+
+        def store():
+            if not self.spill_store.has_blob(digest):
+                self.spill_store.put_blob(digest, data)
+            self.spill_store.link(key, digest)
+
+        await asyncio.get_running_loop().run_in_executor(None, store)
+        return key
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+result_processor = ResultProcessor.from_config()
@@ -0,0 +1,290 @@
+import asyncio
+import inspect
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from botocore.exceptions import (
+    ClientError,
+    ConnectionError as BotocoreConnectionError,
+    ReadTimeoutError,
+)
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from InlineAgent.deadline import Deadline
+
+
+# Error codes are PascalCase on the initial response and camelCase when they
+# arrive inside the event stream, so they are compared lower-cased.
+RETRYABLE_ERROR_CODES = {
+    "throttlingexception",
+    "servicequotaexceededexception",
+    "modelnotreadyexception",
+    "internalserverexception",
+    "serviceunavailableexception",
+    "dependencyfailedexception",
+    "badgatewayexception",
+}
+
+
+class RetryConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    INLINE_AGENT_MAX_ATTEMPTS: int = Field(default=4)
+    INLINE_AGENT_RETRY_BASE_DELAY: float = Field(default=0.5)
+    INLINE_AGENT_RETRY_MAX_DELAY: float = Field(default=20.0)
+    INLINE_AGENT_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5)
+    INLINE_AGENT_CIRCUIT_RESET_SECONDS: float = Field(default=30.0)
+
+
+class InvocationError(Exception):
+    """Raised when `invoke_inline_agent` fails for good.
+
+    `retryable` tells whether the underlying error was transient, `attempts` how
+    many requests were made before giving up.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        request_id: Optional[str] = None,
+        attempts: int = 1,
+        retryable: bool = False,
+    ):
+        super().__init__(message)
+        self.request_id = request_id
+        self.attempts = attempts
+        self.retryable = retryable
+
+
+class CircuitOpenError(InvocationError):
+    """Raised without calling Bedrock while the circuit of a model is open."""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive transient failures and lets a
+    single trial request through once `reset_seconds` have passed."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "half-open":
+                # Let one request probe the model; the rest wait for its outcome.
+                self.opened_at = time.monotonic()
+                return True
+            return state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+_circuit_breakers: Dict[Tuple, CircuitBreaker] = dict()
+_circuit_breakers_lock = threading.Lock()
+
+
+class RetryPolicy:
+    """Retries `invoke_inline_agent` with full-jitter exponential backoff.
+
+    Attempts already made by botocore (`ResponseMetadata.RetryAttempts`) count
+    towards the backoff exponent and a `Retry-After` header sets the minimum delay.
+    Requests are never hedged: every `invoke_inline_agent` request carries a
+    `sessionId`, and a duplicate would run the turn twice on the session.
+
+    The circuit breaker of a model counts transient failures to open a stream and
+    transient failures inside it. A request only counts as a success once its
+    stream has been read to the end; the caller reports that with
+    `breaker(model).record_success()`, so a model that keeps failing mid-stream
+    still opens the circuit.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+    @classmethod
+    def from_config(cls, config: Optional[RetryConfig] = None) -> "RetryPolicy":
+        config = config or RetryConfig()
+        return cls(
+            max_attempts=config.INLINE_AGENT_MAX_ATTEMPTS,
+            base_delay=config.INLINE_AGENT_RETRY_BASE_DELAY,
+            max_delay=config.INLINE_AGENT_RETRY_MAX_DELAY,
+            failure_threshold=config.INLINE_AGENT_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds=config.INLINE_AGENT_CIRCUIT_RESET_SECONDS,
+        )
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        """Circuit breakers are shared process-wide per model and threshold."""
+        key = (model, self.failure_threshold, self.reset_seconds)
+        with _circuit_breakers_lock:
+            if key not in _circuit_breakers:
+                _circuit_breakers[key] = CircuitBreaker(
+                    failure_threshold=self.failure_threshold,
+                    reset_seconds=self.reset_seconds,
+                )
+            return _circuit_breakers[key]
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        if isinstance(error, ClientError):
+            code = error.response.get("Error", {}).get("Code", "")
+            return code.lower() in RETRYABLE_ERROR_CODES
+        return isinstance(
+            error, (BotocoreConnectionError, ReadTimeoutError, asyncio.TimeoutError)
+        )
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        return self.is_retryable(error) and attempt + 1 < self.max_attempts
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        metadata = _response_metadata(error)
+        exponent = attempt + metadata.get("RetryAttempts", 0)
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**exponent))
+
+        retry_after = metadata.get("HTTPHeaders", {}).get("retry-after")
+        try:
+            delay = max(delay, min(self.max_delay, float(retry_after)))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+    async def open_stream(
+        self,
+        transport,
+        request_params: Dict,
+        model: str,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[Dict, AsyncIterator[Dict]]:
+        """Send the request and wait for its first event, retrying transient errors.
+
+        Returns the response and an iterator that replays the first event. No retry
+        is attempted when its backoff would outlast the `deadline`. Success is not
+        recorded on the breaker here; see the class docstring.
+        """
+        breaker = self.breaker(model)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(
+                    f"Circuit open for {model} after {breaker.failures} consecutive failures",
+                    attempts=attempt,
+                    retryable=True,
+                )
+            try:
+                return await _open_first_event(transport, request_params)
+            except Exception as e:
+                if not self.is_retryable(e):
+                    raise InvocationError(
+                        f"invoke_inline_agent failed: {e}",
+                        request_id=_request_id(e),
+                        attempts=attempt + 1,
+                    ) from e
+                breaker.record_failure()
+                delay = self.backoff(attempt, e)
+                if not self.should_retry(e, attempt) or (
+                    deadline is not None and delay >= deadline.remaining()
+                ):
+                    raise InvocationError(
+                        f"invoke_inline_agent failed after {attempt + 1} attempts: {e}",
+                        request_id=_request_id(e),
+                        attempts=attempt + 1,
+                        retryable=True,
+                    ) from e
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    @staticmethod
+    async def close_stream(response: Dict, event_stream: AsyncIterator[Dict]):
+        """Release a stream from `open_stream` that is abandoned before its end."""
+        aclose = getattr(event_stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        await _close_stream(response)
+
+
+async def _open_first_event(
+    transport, request_params: Dict
+) -> Tuple[Dict, AsyncIterator[Dict]]:
+    response = await transport.invoke_inline_agent(**request_params)
+    iterator = response["completion"].__aiter__()
+    try:
+        first_event = await iterator.__anext__()
+    except StopAsyncIteration:
+        return response, _empty()
+    except asyncio.CancelledError:
+        # Cancelled after Bedrock accepted the request: release the connection.
+        await _close_stream(response)
+        raise
+    return response, _replay(first_event, iterator)
+
+
+async def _replay(first_event: Dict, iterator: AsyncIterator[Dict]):
+    yield first_event
+    async for event in iterator:
+        yield event
+
+
+async def _empty():
+    return
+    yield
+
+
+async def _close_stream(response: Dict):
+    close = getattr(response["completion"], "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception:
+        pass
+
+
+def _response_metadata(error: Optional[BaseException]) -> Dict[str, Any]:
+    if isinstance(error, ClientError):
+        return error.response.get("ResponseMetadata", {})
+    return {}
+
+
+def _request_id(error: BaseException) -> Optional[str]:
+    return _response_metadata(error).get("RequestId")
@@ -0,0 +1,217 @@
+import asyncio
+import contextvars
+import inspect
+import logging
+import os
+import pickle
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from InlineAgent.tools.decorators import ExecutionMode, ToolMetadata, tool, unwrap
+
+
+logger = logging.getLogger(__name__)
+
+
+class ToolExecutionConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    TOOL_DEFAULT_EXECUTION_MODE: ExecutionMode = Field(default="thread")
+    TOOL_THREAD_POOL_SIZE: int = Field(default=min(32, (os.cpu_count() or 1) + 4))
+    TOOL_PROCESS_POOL_SIZE: int = Field(default=os.cpu_count() or 1)
+    TOOL_DEFAULT_TIMEOUT: Optional[float] = None
+
+
+class ToolTimeoutError(Exception):
+    """Raised by `ToolExecutor.run` when a tool does not finish within its timeout.
+
+    Distinct from `TimeoutError`, which a tool may raise itself.
+    """
+
+
+def execution_mode(mode: ExecutionMode):
+    """Declare where a tool runs.
+
+    `inline` calls it on the event loop, `thread` in the shared thread pool and
+    `process` in the shared process pool. Process-pool tools and their arguments
+    must be picklable, i.e. the tool is defined at module level.
+    """
+
+    if mode not in ("inline", "thread", "process"):
+        raise ValueError(f"Unknown execution mode: {mode}")
+
+    def decorator(func: Callable) -> Callable:
+        return tool(func, executor=mode)
+
+    return decorator
+
+
+def _call(tool: Callable, parameters: Dict) -> Any:
+    # Runs in a worker thread or process, where there is no event loop to await on.
+    result = tool(**parameters)
+    if inspect.isawaitable(result):
+        return asyncio.run(result)
+    return result
+
+
+class ToolExecutor:
+    """Runs ROC tools inline, in a thread pool or in a process pool.
+
+    Coroutine tools run inline unless they ask otherwise; synchronous tools default
+    to `TOOL_DEFAULT_EXECUTION_MODE` so blocking calls never stall the event loop.
+    Pools are created on first use and reused for the life of the process.
+
+    A timeout cancels coroutine tools, but a thread or process cannot be stopped
+    from outside: a worker that has already started keeps running and holds its
+    pool slot until the tool returns. Its late result is discarded.
+    """
+
+    def __init__(self, config: Optional[ToolExecutionConfig] = None):
+        self.config = config or ToolExecutionConfig()
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_unavailable = False
+        self._lock = threading.Lock()
+
+    def mode_for(self, tool: Callable) -> ExecutionMode:
+        mode = ToolMetadata.of(tool).executor
+        if mode is not None:
+            return mode
+        if inspect.iscoroutinefunction(tool):
+            return "inline"
+        return self.config.TOOL_DEFAULT_EXECUTION_MODE
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.config.TOOL_THREAD_POOL_SIZE,
+                    thread_name_prefix="InlineAgentTool",
+                )
+            return self._thread_pool
+
+    @property
+    def process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """The shared process pool, or None where processes cannot be started
+        (e.g. AWS Lambda has no /dev/shm for multiprocessing's semaphores)."""
+        with self._lock:
+            if self._process_pool is None and not self._process_pool_unavailable:
+                try:
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.config.TOOL_PROCESS_POOL_SIZE
+                    )
+                except (OSError, NotImplementedError) as e:
+                    self._process_pool_unavailable = True
+                    logger.warning(
+                        "Process pool unavailable (%s); process tools run in threads", e
+                    )
+            return self._process_pool
+
+    async def run(
+        self, tool: Callable, parameters: Dict, timeout: Optional[float] = None
+    ) -> Any:
+        """Run `tool` and return its result; raise `ToolTimeoutError` when it takes
+        longer than `timeout` seconds."""
+        mode = self.mode_for(tool)
+
+        if mode == "inline":
+            result = tool(**parameters)
+            if inspect.isawaitable(result):
+                return await ToolExecutor._wait(
+                    asyncio.ensure_future(result), timeout, tool
+                )
+            return result
+
+        if mode == "process":
+            process_pool = self.process_pool
+            # A `tool` wrapper only pickles when it is what its module exports;
+            # otherwise send the function it wraps.
+            target = tool
+            try:
+                if process_pool is not None:
+                    try:
+                        pickle.dumps((target, parameters))
+                    except Exception:
+                        target = unwrap(tool)
+                        if target is tool:
+                            raise
+                        pickle.dumps((target, parameters))
+            except Exception as e:
+                process_pool = None
+                logger.warning(
+                    "%s cannot run in a process pool (%s); using a thread instead",
+                    getattr(tool, "__name__", tool),
+                    e,
+                )
+            if process_pool is not None:
+                try:
+                    return await ToolExecutor._wait_worker(
+                        process_pool.submit(_call, target, parameters), timeout, tool
+                    )
+                except BrokenProcessPool:
+                    # A crashed worker breaks the whole pool; start a new one next time.
+                    with self._lock:
+                        self._process_pool = None
+                    raise
+
+        # Copy the context so the tool still sees e.g. `Deadline.current()`.
+        context = contextvars.copy_context()
+        return await ToolExecutor._wait_worker(
+            self.thread_pool.submit(context.run, _call, tool, parameters), timeout, tool
+        )
+
+    @staticmethod
+    async def _wait_worker(future: Future, timeout: Optional[float], tool: Callable):
+        try:
+            return await ToolExecutor._wait(asyncio.wrap_future(future), timeout, tool)
+        except ToolTimeoutError:
+            # Not started yet: it never will. Started: let it finish unobserved.
+            if not future.cancel():
+                future.add_done_callback(ToolExecutor._discard_late)
+            raise
+
+    @staticmethod
+    async def _wait(future: asyncio.Future, timeout: Optional[float], tool: Callable):
+        # Checked with asyncio.wait rather than wait_for, so that a TimeoutError
+        # raised by the tool itself is not mistaken for running out of time.
+        try:
+            done, _ = await asyncio.wait({future}, timeout=timeout)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        if not done:
+            future.cancel()
+            raise ToolTimeoutError(
+                f"{getattr(tool, '__name__', tool)} did not finish within {timeout} seconds"
+            )
+        return future.result()
+
+    @staticmethod
+    def _discard_late(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(
+                "Abandoned tool call failed after its timeout: %r", future.exception()
+            )
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            thread_pool, self._thread_pool = self._thread_pool, None
+            process_pool, self._process_pool = self._process_pool, None
+        if thread_pool is not None:
+            thread_pool.shutdown(wait=wait)
+        if process_pool is not None:
+            process_pool.shutdown(wait=wait)
+
+
+tool_executor = ToolExecutor()
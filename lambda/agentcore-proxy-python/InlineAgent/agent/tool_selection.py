@@ -0,0 +1,315 @@
+import json
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from InlineAgent.agent.result_processing import estimate_tokens
+from InlineAgent.constants import TOOL_SELECTION_ACTION_GROUP_NAME
+from InlineAgent.types import Executor
+
+
+REQUEST_MORE_TOOLS = "request_more_tools"
+
+_WORDS = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from",
+    "get", "has", "have", "how", "i", "if", "in", "is", "it", "me", "my", "of",
+    "on", "or", "please", "set", "that", "the", "this", "to", "what", "when",
+    "which", "with", "you", "your",
+}
+
+
+class ToolSelectionConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    # Functions sent per request. Unset: selection is off and every tool is sent.
+    TOOL_SELECTION_TOP_K: Optional[int] = None
+    # Catalogs up to this size are always sent whole.
+    TOOL_SELECTION_MIN_TOOLS: int = Field(default=20)
+    # Functions added by each `request_more_tools` call.
+    TOOL_SELECTION_MORE_K: int = Field(default=5)
+    TOOL_SELECTION_MAX_TRACKED_SESSIONS: int = Field(default=1024)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of `text`, splitting snake_case and camelCase names."""
+    tokens = list()
+    for word in _WORDS.findall(text or ""):
+        word = word.lower()
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class ToolIndex:
+    """BM25 index over the functions of `actionGroups` request parameters.
+
+    A function's document is its name (counted twice), its description, its
+    action group's name and description and its parameter names and descriptions.
+    """
+
+    def __init__(self, action_groups: List[Dict], k1: float = 1.2, b: float = 0.75):
+        # Estimated tokens of sending every action group.
+        self.schema_tokens = estimate_tokens(json.dumps(action_groups))
+        self.keys: List[Tuple[str, str]] = list()
+        lengths: List[int] = list()
+        postings: Dict[str, List[Tuple[int, int]]] = dict()
+
+        for action_group in action_groups:
+            group_name = action_group.get("actionGroupName", "")
+            for function in action_group.get("functionSchema", {}).get("functions", []):
+                parts = [
+                    function["name"],
+                    function["name"],
+                    function.get("description", ""),
+                    group_name,
+                    action_group.get("description", ""),
+                ]
+                for name, parameter in (function.get("parameters") or {}).items():
+                    parts += [name, parameter.get("description", "")]
+                terms = Counter(tokenize(" ".join(parts)))
+
+                index = len(self.keys)
+                self.keys.append((group_name, function["name"]))
+                lengths.append(sum(terms.values()))
+                for term, count in terms.items():
+                    postings.setdefault(term, []).append((index, count))
+
+        average_length = sum(lengths) / len(lengths) if lengths else 1.0
+        norms = [k1 * (1 - b + b * length / average_length) for length in lengths]
+        documents = len(self.keys)
+        # Per term: (document, precomputed BM25 weight).
+        self._weights: Dict[str, List[Tuple[int, float]]] = dict()
+        for term, entries in postings.items():
+            idf = math.log(1 + (documents - len(entries) + 0.5) / (len(entries) + 0.5))
+            self._weights[term] = [
+                (index, idf * count * (k1 + 1) / (count + norms[index]))
+                for index, count in entries
+            ]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(
+        self, query: str, k: int, exclude: Iterable[Tuple[str, str]] = ()
+    ) -> List[Tuple[str, str]]:
+        """The `k` best matching (action group, function) keys, best first. Keys
+        without any matching term are left out."""
+        scores: Dict[int, float] = dict()
+        for term in set(tokenize(query)):
+            for index, weight in self._weights.get(term, ()):
+                scores[index] = scores.get(index, 0.0) + weight
+
+        exclude = set(exclude)
+        ranked = sorted(scores, key=lambda index: (-scores[index], index))
+        matches = [self.keys[index] for index in ranked]
+        return [key for key in matches if key not in exclude][:k]
+
+
+class ToolSelection:
+    """The tools offered in one session.
+
+    Starts with the best matches for the first input text and grows with the
+    matches of later inputs and whenever the model calls `request_more_tools`, so
+    a tool offered once stays offered for the rest of the session.
+    `action_groups()` is sent with every request.
+    """
+
+    def __init__(
+        self,
+        action_groups: List[Dict],
+        index: ToolIndex,
+        selected: Iterable[Tuple[str, str]],
+        more_k: int,
+    ):
+        self._action_groups = action_groups
+        self.index = index
+        self.selected: Set[Tuple[str, str]] = set(selected)
+        self.more_k = more_k
+
+    @property
+    def hidden(self) -> int:
+        return len(self.index) - len(self.selected)
+
+    def action_groups(self) -> List[Dict]:
+        action_groups = list()
+        for action_group in self._action_groups:
+            if "functionSchema" not in action_group:
+                action_groups.append(action_group)
+                continue
+            name = action_group.get("actionGroupName", "")
+            functions = [
+                function
+                for function in action_group["functionSchema"].get("functions", [])
+                if (name, function["name"]) in self.selected
+            ]
+            if functions:
+                action_groups.append(
+                    {**action_group, "functionSchema": {"functions": functions}}
+                )
+
+        if self.hidden:
+            action_groups.append(self._request_more_tools_group())
+        return action_groups
+
+    def tokens_saved(self, action_groups: Optional[List[Dict]] = None) -> int:
+        """Estimated schema tokens saved by sending `action_groups` (default: the
+        current selection) instead of every tool."""
+        if action_groups is None:
+            action_groups = self.action_groups()
+        return self.index.schema_tokens - estimate_tokens(json.dumps(action_groups))
+
+    def tool_map(self, tool_map: Optional[Dict[str, Callable]]) -> Dict[str, Callable]:
+        """`tool_map` plus the `request_more_tools` escape hatch."""
+
+        async def request_more_tools(query: str) -> str:
+            added = self.index.search(query, self.more_k, exclude=self.selected)
+            if not added:
+                return (
+                    f"No other tools match '{query}'. "
+                    "Answer with the tools you already have."
+                )
+            self.selected.update(added)
+            return "Now available: " + ", ".join(function for _, function in added)
+
+        request_more_tools.__input_schema__ = {
+            "type": "object",
+            "properties": {"query": {"type": "string"}},
+            "required": ["query"],
+        }
+        return {**(tool_map or {}), REQUEST_MORE_TOOLS: request_more_tools}
+
+    def _request_more_tools_group(self) -> Dict:
+        return {
+            "actionGroupName": TOOL_SELECTION_ACTION_GROUP_NAME,
+            "actionGroupExecutor": {"customControl": Executor.RETURN_CONTROL.value},
+            "functionSchema": {
+                "functions": [
+                    {
+                        "name": REQUEST_MORE_TOOLS,
+                        "description": (
+                            f"{self.hidden} more tools exist than are listed. If none "
+                            "of the listed tools fits the task, call this with a short "
+                            "description of the capability you need; matching tools "
+                            "are listed from your next step on."
+                        ),
+                        "parameters": {
+                            "query": {
+                                "type": "string",
+                                "description": "Capability needed, e.g. 'refund an order'",
+                                "required": True,
+                            }
+                        },
+                        "requireConfirmation": "DISABLED",
+                    }
+                ]
+            },
+        }
+
+
+class ToolSelector:
+    """Sends only the tools relevant to a request when an agent has many.
+
+    Disabled unless `top_k` is set. Catalogs of at most `min_tools` functions are
+    always sent whole. Otherwise the `top_k` functions that best match the input
+    text (BM25 over names and descriptions, padded in catalog order when fewer
+    match) plus `pinned` function names are sent, together with a
+    `request_more_tools` function the model calls to have `more_k` further
+    matches added. Only action groups with a function schema are narrowed; API
+    schema, built-in and user input groups are always sent. Selections are kept
+    for the `max_tracked_sessions` most recent sessions.
+    """
+
+    def __init__(
+        self,
+        top_k: Optional[int] = None,
+        min_tools: int = 20,
+        more_k: int = 5,
+        pinned: Iterable[str] = (),
+        max_tracked_sessions: int = 1024,
+    ):
+        self.top_k = top_k
+        self.min_tools = min_tools
+        self.more_k = more_k
+        self.pinned = set(pinned)
+        self.max_tracked_sessions = max_tracked_sessions
+        self._lock = threading.Lock()
+        # The request template's action group list and its index.
+        self._indexed: Optional[Tuple[List[Dict], ToolIndex]] = None
+        self._sessions: OrderedDict[str, ToolSelection] = OrderedDict()
+
+    @classmethod
+    def from_config(cls, config: Optional[ToolSelectionConfig] = None) -> "ToolSelector":
+        config = config or ToolSelectionConfig()
+        return cls(
+            top_k=config.TOOL_SELECTION_TOP_K,
+            min_tools=config.TOOL_SELECTION_MIN_TOOLS,
+            more_k=config.TOOL_SELECTION_MORE_K,
+            max_tracked_sessions=config.TOOL_SELECTION_MAX_TRACKED_SESSIONS,
+        )
+
+    def index(self, action_groups: List[Dict]) -> ToolIndex:
+        """The index of `action_groups`, rebuilt only when the list object changes
+        (request templates keep it until the agent changes)."""
+        with self._lock:
+            if self._indexed is None or self._indexed[0] is not action_groups:
+                self._indexed = (action_groups, ToolIndex(action_groups))
+            return self._indexed[1]
+
+    def select(
+        self,
+        action_groups: Optional[List[Dict]],
+        query: str,
+        session_id: Optional[str] = None,
+    ) -> Optional[ToolSelection]:
+        """The selection of `session_id` extended with the matches of `query`, or
+        None to send every tool."""
+        if not self.top_k or not action_groups:
+            return None
+        index = self.index(action_groups)
+        if len(index) <= max(self.min_tools, self.top_k):
+            return None
+
+        selected = [key for key in index.keys if key[1] in self.pinned]
+        wanted = len(selected) + self.top_k
+        selected += index.search(query, self.top_k, exclude=selected)
+        for key in index.keys:
+            if len(selected) >= wanted:
+                break
+            if key not in selected:
+                selected.append(key)
+
+        with self._lock:
+            selection = self._sessions.get(session_id)
+            if selection is not None and selection.index is index:
+                selection.selected.update(selected)
+            else:
+                selection = ToolSelection(
+                    action_groups=action_groups,
+                    index=index,
+                    selected=selected,
+                    more_k=self.more_k,
+                )
+            if session_id is not None:
+                self._sessions[session_id] = selection
+                self._sessions.move_to_end(session_id)
+                while len(self._sessions) > self.max_tracked_sessions:
+                    self._sessions.popitem(last=False)
+        return selection
+
+    def end_session(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
@@ -0,0 +1,131 @@
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from botocore.config import Config
+
+
+_STREAM_END = object()
+
+
+class AsyncEventStream:
+    """Async iterator over a synchronous botocore `EventStream`.
+
+    Each blocking read is offloaded to a worker thread so the event loop stays free
+    while waiting for the next event. Synchronous iteration is still supported for
+    callers of `process_response=False`.
+    """
+
+    def __init__(self, event_stream: Iterable, executor: Optional[Executor] = None):
+        self._event_stream = event_stream
+        self._iterator = None
+        self._executor = executor
+
+    def __aiter__(self) -> AsyncIterator[Dict]:
+        return self
+
+    async def __anext__(self) -> Dict:
+        loop = asyncio.get_running_loop()
+        if self._iterator is None:
+            self._iterator = await loop.run_in_executor(
+                self._executor, iter, self._event_stream
+            )
+        event = await loop.run_in_executor(
+            self._executor, next, self._iterator, _STREAM_END
+        )
+        if event is _STREAM_END:
+            raise StopAsyncIteration
+        return event
+
+    def __iter__(self):
+        return iter(self._event_stream)
+
+    def close(self):
+        if hasattr(self._event_stream, "close"):
+            self._event_stream.close()
+
+
+class Transport(ABC):
+    """Sends `invoke_inline_agent` requests without blocking the event loop.
+
+    Implementations return the botocore response dict with `completion` replaced by
+    an object that supports `async for`.
+    """
+
+    @abstractmethod
+    async def invoke_inline_agent(self, **kwargs) -> Dict[str, Any]:
+        pass
+
+    async def close(self):
+        pass
+
+
+class ThreadTransport(Transport):
+    """Runs the synchronous boto3 client in a worker thread."""
+
+    def __init__(self, client, executor: Optional[Executor] = None):
+        self.client = client
+        self.executor = executor
+
+    async def invoke_inline_agent(self, **kwargs) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self.executor, lambda: self.client.invoke_inline_agent(**kwargs)
+        )
+        response["completion"] = AsyncEventStream(
+            event_stream=response["completion"], executor=self.executor
+        )
+        return response
+
+
+class AioBotocoreTransport(Transport):
+    """Native asyncio transport backed by `aiobotocore`.
+
+    The client is created on first use and shared by every invocation that goes
+    through this transport until `close()` is awaited.
+    """
+
+    def __init__(
+        self,
+        profile_name: Optional[str] = None,
+        region_name: Optional[str] = None,
+        config: Optional[Config] = None,
+    ):
+        self.profile_name = profile_name
+        self.region_name = region_name
+        self.config = config
+        self._client = None
+        self._exit_stack = AsyncExitStack()
+        self._lock = asyncio.Lock()
+
+    async def _get_client(self):
+        async with self._lock:
+            if self._client is None:
+                try:
+                    from aiobotocore.session import get_session
+                except ImportError as e:
+                    raise ImportError(
+                        "AioBotocoreTransport requires `aiobotocore`. Install it with `pip install aiobotocore`."
+                    ) from e
+
+                session = get_session()
+                if self.profile_name:
+                    session.set_config_variable("profile", self.profile_name)
+                self._client = await self._exit_stack.enter_async_context(
+                    session.create_client(
+                        "bedrock-agent-runtime",
+                        region_name=self.region_name,
+                        config=self.config,
+                    )
+                )
+        return self._client
+
+    async def invoke_inline_agent(self, **kwargs) -> Dict[str, Any]:
+        client = await self._get_client()
+        return await client.invoke_inline_agent(**kwargs)
+
+    async def close(self):
+        await self._exit_stack.aclose()
+        self._client = None
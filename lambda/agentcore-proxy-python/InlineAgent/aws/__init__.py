@@ -0,0 +1,11 @@
+from .client_pool import ClientPool, ClientPoolConfig, client_pool
+from .identity import IdentityConfig, IdentityResolver, identity_resolver
+
+__all__ = [
+    "ClientPool",
+    "ClientPoolConfig",
+    "client_pool",
+    "IdentityConfig",
+    "IdentityResolver",
+    "identity_resolver",
+]
@@ -0,0 +1,177 @@
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ClientPoolConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    CLIENT_MAX_POOL_CONNECTIONS: int = Field(default=25)
+    CLIENT_TCP_KEEPALIVE: bool = Field(default=True)
+    CLIENT_CONNECT_TIMEOUT: Optional[float] = None
+    CLIENT_READ_TIMEOUT: Optional[float] = None
+
+
+class ClientPool:
+    """Process-wide registry of boto3 sessions and clients.
+
+    Clients are keyed by (profile, region, service, endpoint, botocore config) so
+    that a warm Lambda reuses the same client, endpoint resolution and connection
+    pool across invocations.
+    """
+
+    def __init__(
+        self,
+        max_pool_connections: int = 25,
+        tcp_keepalive: bool = True,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+    ):
+        self._lock = threading.RLock()
+        self._sessions: Dict[Tuple, boto3.Session] = dict()
+        self._session_keys: Dict[int, Tuple] = dict()
+        self._clients: Dict[Tuple, Any] = dict()
+        self.hits = 0
+        self.misses = 0
+        self.configure(
+            max_pool_connections=max_pool_connections,
+            tcp_keepalive=tcp_keepalive,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+
+    @classmethod
+    def from_config(cls, config: ClientPoolConfig = None) -> "ClientPool":
+        config = config or ClientPoolConfig()
+        return cls(
+            max_pool_connections=config.CLIENT_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=config.CLIENT_TCP_KEEPALIVE,
+            connect_timeout=config.CLIENT_CONNECT_TIMEOUT,
+            read_timeout=config.CLIENT_READ_TIMEOUT,
+        )
+
+    def configure(
+        self,
+        max_pool_connections: int = 25,
+        tcp_keepalive: bool = True,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+    ):
+        """Set the base botocore config. Clients created before this call are kept."""
+        options = {
+            "max_pool_connections": max_pool_connections,
+            "tcp_keepalive": tcp_keepalive,
+        }
+        if connect_timeout is not None:
+            options["connect_timeout"] = connect_timeout
+        if read_timeout is not None:
+            options["read_timeout"] = read_timeout
+
+        with self._lock:
+            self.base_config = Config(**options)
+
+    def session(
+        self, profile_name: Optional[str] = None, region_name: Optional[str] = None
+    ) -> boto3.Session:
+        """Return a cached `boto3.Session`. Raises like `boto3.Session` for unknown profiles."""
+        key = (profile_name, region_name)
+        with self._lock:
+            if key not in self._sessions:
+                session = boto3.Session(
+                    profile_name=profile_name, region_name=region_name
+                )
+                self._sessions[key] = session
+                self._session_keys[id(session)] = key
+            return self._sessions[key]
+
+    def client(
+        self,
+        service_name: str,
+        session: Optional[boto3.Session] = None,
+        profile_name: Optional[str] = None,
+        region_name: Optional[str] = None,
+        config: Optional[Config] = None,
+        endpoint_url: Optional[str] = None,
+    ):
+        """Return a shared client for `service_name`.
+
+        Either pass a `session` (preferably one obtained from `session()`) or a
+        `profile_name`/`region_name` pair to resolve one.
+        """
+        with self._lock:
+            if session is None:
+                session = self.session(
+                    profile_name=profile_name, region_name=region_name
+                )
+            session_key = self._key_for_session(session)
+            region_name = region_name or session.region_name
+            merged_config = (
+                self.base_config.merge(config) if config else self.base_config
+            )
+
+            key = (
+                session_key,
+                region_name,
+                service_name,
+                endpoint_url,
+                ClientPool._config_key(merged_config),
+            )
+            if key in self._clients:
+                self.hits += 1
+                return self._clients[key]
+
+            self.misses += 1
+            client = session.client(
+                service_name,
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                config=merged_config,
+            )
+            self._clients[key] = client
+            return client
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "sessions": len(self._sessions),
+                "clients": len(self._clients),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._session_keys.clear()
+            self._clients.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _key_for_session(self, session: boto3.Session) -> Tuple:
+        if id(session) not in self._session_keys:
+            # Foreign session: pin it so its id stays unique for the pool lifetime.
+            key = ("session", id(session))
+            self._sessions[key] = session
+            self._session_keys[id(session)] = key
+        return self._session_keys[id(session)]
+
+    @staticmethod
+    def _config_key(config: Config) -> Tuple[Hashable, ...]:
+        return tuple(
+            sorted(
+                (name, repr(value))
+                for name, value in config._user_provided_options.items()
+            )
+        )
+
+
+client_pool = ClientPool.from_config()
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import boto3
+import requests
+from botocore.exceptions import ProfileNotFound
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from InlineAgent.aws.client_pool import ClientPool, client_pool
+
+
+class IdentityConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    IDENTITY_CACHE_TTL: float = Field(default=3600.0)
+    IDENTITY_IMDS_TIMEOUT: float = Field(default=1.0)
+
+
+class IdentityResolver:
+    """Process-wide account and region lookups.
+
+    Regions come from `AWS_REGION`/`AWS_DEFAULT_REGION`, then from an observed
+    Lambda function ARN, then from the session's configuration and only then from
+    the EC2 instance metadata service, which is never called inside Lambda and at
+    most once per process elsewhere. Account ids come from an observed Lambda
+    function ARN or a single `sts:GetCallerIdentity` call per profile, cached for
+    `ttl` seconds. Missing profiles (the usual case in Lambda) fall back to the
+    default credential chain without retrying the profile on every access.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        imds_timeout: float = 1.0,
+        pool: ClientPool = client_pool,
+    ):
+        self.ttl = ttl
+        self.imds_timeout = imds_timeout
+        self.pool = pool
+        self._lock = threading.RLock()
+        self._accounts: Dict[Optional[str], Tuple[str, float]] = dict()
+        self._missing_profiles: set = set()
+        self._lambda_region: Optional[str] = None
+        self._lambda_account: Optional[str] = None
+        self._imds_region: Optional[str] = None
+        self._imds_checked = False
+        self.sts_calls = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[IdentityConfig] = None) -> "IdentityResolver":
+        config = config or IdentityConfig()
+        return cls(ttl=config.IDENTITY_CACHE_TTL, imds_timeout=config.IDENTITY_IMDS_TIMEOUT)
+
+    @staticmethod
+    def in_lambda() -> bool:
+        return "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+
+    def observe_lambda_context(self, context):
+        """Take region and account from `context.invoked_function_arn`, e.g.
+        `arn:aws:lambda:us-west-2:123456789012:function:name`."""
+        arn = getattr(context, "invoked_function_arn", None)
+        if not isinstance(arn, str):
+            return
+        parts = arn.split(":")
+        if len(parts) >= 5 and parts[2] == "lambda":
+            with self._lock:
+                self._lambda_region = parts[3] or None
+                self._lambda_account = parts[4] or None
+
+    def session(self, profile_name: Optional[str] = "default") -> boto3.Session:
+        with self._lock:
+            if profile_name not in self._missing_profiles:
+                try:
+                    return self.pool.session(profile_name=profile_name)
+                except ProfileNotFound:
+                    self._missing_profiles.add(profile_name)
+        return self.pool.session(region_name=self.region())
+
+    def region(self, session: Optional[boto3.Session] = None) -> Optional[str]:
+        region = (
+            os.environ.get("AWS_REGION")
+            or os.environ.get("AWS_DEFAULT_REGION")
+            or self._lambda_region
+        )
+        if region:
+            return region
+        if session is not None and session.region_name:
+            return session.region_name
+        return self._region_from_imds()
+
+    def account_id(self, session: Optional[boto3.Session] = None) -> str:
+        if self._lambda_account is not None:
+            return self._lambda_account
+
+        session = session or self.session()
+        key = session.profile_name
+        with self._lock:
+            cached = self._accounts.get(key)
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+
+            sts_client = self.pool.client("sts", session=session)
+            account = sts_client.get_caller_identity()["Account"]
+            self.sts_calls += 1
+            self._accounts[key] = (account, time.monotonic() + self.ttl)
+            return account
+
+    def clear(self):
+        with self._lock:
+            self._accounts.clear()
+            self._missing_profiles.clear()
+            self._lambda_region = self._lambda_account = None
+            self._imds_region = None
+            self._imds_checked = False
+
+    def _region_from_imds(self) -> Optional[str]:
+        """Region from the EC2 Instance Metadata Service (IMDSv2)."""
+        if IdentityResolver.in_lambda():
+            return None
+        with self._lock:
+            if self._imds_checked:
+                return self._imds_region
+            self._imds_checked = True
+            try:
+                token_response = requests.put(
+                    "http://169.254.169.254/latest/api/token",
+                    headers={"X-aws-ec2-metadata-token-ttl-seconds": "21600"},
+                    timeout=self.imds_timeout,
+                )
+                if token_response.status_code != 200:
+                    return None
+
+                region_response = requests.get(
+                    "http://169.254.169.254/latest/meta-data/placement/region",
+                    headers={"X-aws-ec2-metadata-token": token_response.text},
+                    timeout=self.imds_timeout,
+                )
+                if region_response.status_code == 200:
+                    self._imds_region = region_response.text
+            except requests.RequestException:
+                pass
+            return self._imds_region
+
+
+identity_resolver = IdentityResolver.from_config()
@@ -0,0 +1,10 @@
+"""python -m InlineAgent.build_bundle module:factory -o agent_bundle.json
+
+See `InlineAgent.agent.bundle`.
+"""
+
+from InlineAgent.agent.bundle import main
+
+
+if __name__ == "__main__":
+    main()
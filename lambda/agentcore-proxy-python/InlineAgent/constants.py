@@ -2,6 +2,7 @@ from enum import Enum
 
 
 USER_INPUT_ACTION_GROUP_NAME = "UserInput"
+TOOL_SELECTION_ACTION_GROUP_NAME = "ToolCatalog"
 
 
 class Level(Enum):
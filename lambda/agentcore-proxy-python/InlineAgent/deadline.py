@@ -0,0 +1,56 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar(
+    "inline_agent_deadline", default=None
+)
+
+
+class Deadline:
+    """Point in time by which an invocation has to be finished.
+
+    `reserve_seconds` is kept back from the budget so the agent still has time to
+    turn a timed-out tool into an answer. ProcessROC makes the deadline of the
+    running tool available through `Deadline.current()`.
+    """
+
+    def __init__(self, seconds: float, reserve_seconds: float = 0.0):
+        self.expires_at = time.monotonic() + seconds - reserve_seconds
+
+    @classmethod
+    def from_lambda_context(cls, context, reserve_seconds: float = 5.0) -> "Deadline":
+        return cls(
+            seconds=context.get_remaining_time_in_millis() / 1000,
+            reserve_seconds=reserve_seconds,
+        )
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, limit: Optional[float] = None) -> float:
+        """Seconds a step may take: what is left, capped at `limit` if given."""
+        if limit is None:
+            return self.remaining()
+        return min(limit, self.remaining())
+
+    @staticmethod
+    def current() -> Optional["Deadline"]:
+        return _current_deadline.get()
+
+    @contextmanager
+    def scope(self) -> Iterator["Deadline"]:
+        token = _current_deadline.set(self)
+        try:
+            yield self
+        finally:
+            _current_deadline.reset(token)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
@@ -5,6 +5,8 @@ from typing import Any, Dict, Optional
 import boto3
 from pydantic import BaseModel, Field, computed_field, model_validator, validate_call
 
+from InlineAgent.aws import client_pool, identity_resolver
+
 
 class KnowledgeBasePlugin(BaseModel):
     name: str
@@ -19,7 +21,7 @@ class KnowledgeBasePlugin(BaseModel):
     @cached_property
     def session(self) -> boto3.Session:
         """Lazy loading of AWS session"""
-        return boto3.Session(profile_name=self.profile)
+        return identity_resolver.session(profile_name=self.profile)
 
     def to_dict(self) -> dict:
         """Convert the KnowledgeBase instance to a dictionary"""
@@ -55,7 +57,7 @@ class KnowledgeBasePlugin(BaseModel):
             Optional[str]: Knowledge base ID if found, None otherwise
         """
         # Create a Bedrock Agent client"
-        bedrock_agent = session.client("bedrock-agent")
+        bedrock_agent = client_pool.client("bedrock-agent", session=session)
 
         # Initialize variables for pagination
         next_token = None
@@ -1,6 +1,26 @@
 from .trace import Trace
 from .agent_instrument import observe
 from .settings_management import ObservabilityConfig
-from .trace_provider import create_tracer_provider
+from .trace_provider import create_meter_provider, create_tracer_provider
+from .metrics import (
+    MetricsBackend,
+    InMemoryMetricsBackend,
+    OtelMetricsBackend,
+    InvocationMetricsCollector,
+    ToolMetrics,
+    tool_metrics,
+)
 
-__all__ = ["Trace", "observe", "ObservabilityConfig", "create_tracer_provider"]
+__all__ = [
+    "Trace",
+    "observe",
+    "ObservabilityConfig",
+    "create_tracer_provider",
+    "create_meter_provider",
+    "MetricsBackend",
+    "InMemoryMetricsBackend",
+    "OtelMetricsBackend",
+    "InvocationMetricsCollector",
+    "ToolMetrics",
+    "tool_metrics",
+]
@@ -1,7 +1,6 @@
 from datetime import datetime, timezone
 import functools
 import logging
-import os
 from opentelemetry import trace as otel_trace
 from termcolor import colored
 from rich.console import Console
@@ -23,6 +22,7 @@ from .utils import json_safe
 
 
 from InlineAgent.constants import TraceColor
+from InlineAgent.storage import FileWriter, default_file_writer
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -37,7 +37,11 @@ output_stream_guardrail_intervene: bool = False
 is_guardrail: bool = False
 
 
-def observe(show_traces: bool = True, save_traces: bool = False):
+def observe(
+    show_traces: bool = True,
+    save_traces: bool = False,
+    file_writer: FileWriter = None,
+):
     def decorator(func):
         @functools.wraps(func)
         def wrapper(
@@ -100,6 +104,8 @@ def observe(show_traces: bool = True, save_traces: bool = False):
             total_input_tokens = 0
             total_output_tokens = 0
             total_llm_calls = 0
+            files_written = list()
+            writer = file_writer or default_file_writer()
             try:
                 response = func(
                     inputText=inputText,
@@ -117,40 +123,20 @@ def observe(show_traces: bool = True, save_traces: bool = False):
                         for idx, this_file in enumerate(files_list):
                             file_bytes = this_file["bytes"]
 
-                            # save bytes to file, given the name of file and the bytes
-
-                            directory_path = os.path.join(os.getcwd(), "output")
-                            if not os.path.exists(directory_path):
-                                try:
-                                    os.makedirs(directory_path, exist_ok=True)
-                                except OSError as e:
-                                    print(f"Error creating directory output: {e}")
-                                    raise
-
-                            if not os.path.exists(
-                                os.path.join(directory_path, str(sessionId))
-                            ):
-                                try:
-                                    os.makedirs(
-                                        os.path.join(directory_path, str(sessionId)),
-                                        exist_ok=True,
-                                    )
-                                except OSError as e:
-                                    print(f"Error creating directory output: {e}")
-                                    raise
-
-                            file_name = os.path.join(
-                                directory_path, str(sessionId), this_file["name"]
+                            # Written on a background thread, the stream loop never waits on disk
+                            files_written.append(
+                                writer.submit(
+                                    session_id=str(sessionId),
+                                    name=this_file["name"],
+                                    data=file_bytes,
+                                )
                             )
-                            with open(file_name, "wb") as f:
-                                f.write(file_bytes)
 
                             if config.PRODUCE_BEDROCK_OTEL_TRACES:
-                                with open(file_name, "rb") as f:
-                                    root_agent_span.set_attribute(
-                                        SpanAttributes.FILES.value + str(idx + 1),
-                                        f.read().decode("utf8", errors="ignore"),
-                                    )
+                                root_agent_span.set_attribute(
+                                    SpanAttributes.FILES.value + str(idx + 1),
+                                    file_bytes.decode("utf8", errors="ignore"),
+                                )
 
                         if show_traces:
                             console = Console()
@@ -373,10 +359,16 @@ def observe(show_traces: bool = True, save_traces: bool = False):
                             else:
                                 agent_answer += data.decode("utf8")
                                 print(
-                                    colored(agent_answer, TraceColor.final_output),
+                                    colored(
+                                        data.decode("utf-8"),
+                                        TraceColor.final_output,
+                                    ),
                                     end="",
                                 )
 
+                if files_written:
+                    writer.flush(files_written)
+
                 time_after_call = datetime.now(timezone.utc)
 
                 if config.PRODUCE_BEDROCK_OTEL_TRACES:
@@ -0,0 +1,313 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from opentelemetry import metrics as otel_metrics
+
+from InlineAgent.types.metrics import InvocationMetrics, StepLatency, ToolStats
+
+
+class MetricsBackend(ABC):
+    """Sink for invocation and tool metrics, e.g. a histogram store for p50/p99."""
+
+    @abstractmethod
+    def record(self, name: str, value: float, attributes: Dict[str, str]):
+        pass
+
+    def increment(self, name: str, value: int, attributes: Dict[str, str]):
+        """Add to a counter; backends without counters keep it as a sample."""
+        self.record(name, value, attributes)
+
+
+class InMemoryMetricsBackend(MetricsBackend):
+    """Keeps every sample in process; good enough for tests and short-lived Lambdas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[Tuple, List[float]] = defaultdict(list)
+
+    def record(self, name: str, value: float, attributes: Dict[str, str]):
+        key = (name, tuple(sorted(attributes.items())))
+        with self._lock:
+            self.samples[key].append(value)
+
+    def values(self, name: str, **attributes) -> List[float]:
+        with self._lock:
+            return [
+                value
+                for (sample_name, sample_attributes), values in self.samples.items()
+                if sample_name == name
+                and attributes.items() <= dict(sample_attributes).items()
+                for value in values
+            ]
+
+    def percentile(self, name: str, percentile: float, **attributes) -> Optional[float]:
+        return _percentile(sorted(self.values(name, **attributes)), percentile)
+
+
+class OtelMetricsBackend(MetricsBackend):
+    """Records histograms through the globally configured OpenTelemetry meter."""
+
+    def __init__(self, meter_name: str = "bedrock-agent-metrics"):
+        self.meter = otel_metrics.get_meter(meter_name)
+        self._histograms: Dict[str, otel_metrics.Histogram] = dict()
+        self._counters: Dict[str, otel_metrics.Counter] = dict()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: float, attributes: Dict[str, str]):
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = self.meter.create_histogram(name)
+        self._histograms[name].record(value, attributes=attributes)
+
+    def increment(self, name: str, value: int, attributes: Dict[str, str]):
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = self.meter.create_counter(name)
+        self._counters[name].add(value, attributes=attributes)
+
+
+class ToolMetrics:
+    """Per-tool call counters and latency samples.
+
+    Always kept in process (`stats()`), and forwarded to `backend` or the backend
+    passed with a call, e.g. an `OtelMetricsBackend` next to the existing traces.
+    Only the last `max_samples` latencies per tool are kept for percentiles.
+    """
+
+    def __init__(
+        self, backend: Optional[MetricsBackend] = None, max_samples: int = 1024
+    ):
+        self.backend = backend
+        self.max_samples = max_samples
+        self._stats: Dict[str, ToolStats] = dict()
+        self._latencies: Dict[str, Deque[float]] = dict()
+        self._lock = threading.Lock()
+
+    def record_call(
+        self,
+        function: str,
+        action_group: str,
+        outcome: str,
+        seconds: float,
+        argument_bytes: int,
+        result_bytes: int,
+        cached: bool = False,
+        backend: Optional[MetricsBackend] = None,
+    ):
+        with self._lock:
+            if function not in self._stats:
+                self._stats[function] = ToolStats(function=function)
+                self._latencies[function] = deque(maxlen=self.max_samples)
+            stats = self._stats[function]
+            stats.calls += 1
+            if outcome == "success":
+                stats.successes += 1
+            elif outcome == "timeout":
+                stats.timeouts += 1
+            else:
+                stats.failures += 1
+            stats.cache_hits += int(cached)
+            stats.argument_bytes += argument_bytes
+            stats.result_bytes += result_bytes
+            self._latencies[function].append(seconds)
+
+        attributes = {
+            "function": function,
+            "action_group": action_group,
+            "outcome": outcome,
+            "cached": str(cached).lower(),
+        }
+        backends = [self.backend] if self.backend is not None else []
+        if backend is not None and backend is not self.backend:
+            backends.append(backend)
+        for target in backends:
+            target.increment("tool.calls", 1, attributes)
+            target.record("tool.latency", seconds, attributes)
+            target.record("tool.argument_bytes", argument_bytes, attributes)
+            target.record("tool.result_bytes", result_bytes, attributes)
+
+    def stats(self) -> Dict[str, ToolStats]:
+        with self._lock:
+            summary = dict()
+            for function, stats in self._stats.items():
+                latencies = sorted(self._latencies[function])
+                summary[function] = stats.model_copy(
+                    update={
+                        "latency_p50": _percentile(latencies, 50),
+                        "latency_p99": _percentile(latencies, 99),
+                        "latency_max": latencies[-1] if latencies else None,
+                    }
+                )
+            return summary
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._latencies.clear()
+
+
+def _percentile(values: List[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    return values[max(0, math.ceil(percentile / 100 * len(values)) - 1)]
+
+
+tool_metrics = ToolMetrics()
+
+
+_STEP_TRACES = (
+    "orchestrationTrace",
+    "routingClassifierTrace",
+    "preProcessingTrace",
+    "postProcessingTrace",
+)
+
+
+class InvocationMetricsCollector:
+    """Builds `InvocationMetrics` from the events of an invocation as they arrive."""
+
+    def __init__(self):
+        self.metrics = InvocationMetrics()
+        self._start = time.perf_counter()
+        # trace_id -> (step, first seen, last seen, model seconds)
+        self._steps: Dict[str, List] = dict()
+        # (trace_id, kind) -> time the matching input was seen
+        self._pending: Dict[Tuple[str, str], float] = dict()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def on_request(self):
+        self.metrics.requests += 1
+
+    def on_event(self):
+        if self.metrics.time_to_first_event is None:
+            self.metrics.time_to_first_event = self.elapsed()
+
+    def on_chunk(self, size: int):
+        if self.metrics.time_to_first_chunk is None:
+            self.metrics.time_to_first_chunk = self.elapsed()
+        self.metrics.bytes_received += size
+
+    def on_file(self, size: int):
+        self.metrics.bytes_received += size
+
+    def on_roc(self, seconds: float):
+        self.metrics.roc_rounds += 1
+        self.metrics.tool_seconds += seconds
+
+    def on_usage(self, input_tokens: int, output_tokens: int, llm_calls: int):
+        self.metrics.input_tokens += input_tokens
+        self.metrics.output_tokens += output_tokens
+        self.metrics.llm_calls += llm_calls
+
+    def on_tool_selection(self, tools_offered: int, tokens_saved: int):
+        self.metrics.tools_offered = tools_offered
+        self.metrics.tool_schema_tokens_saved += tokens_saved
+
+    def on_trace(self, trace: Dict):
+        now = self.elapsed()
+        for step in _STEP_TRACES:
+            if step not in trace:
+                continue
+            for part_name, part in trace[step].items():
+                if not isinstance(part, dict) or "traceId" not in part:
+                    continue
+                trace_id = part["traceId"]
+                if trace_id not in self._steps:
+                    self._steps[trace_id] = [step, now, now, 0.0]
+                self._steps[trace_id][2] = now
+
+                if part_name == "modelInvocationInput":
+                    self._pending[(trace_id, "model")] = now
+                elif part_name == "modelInvocationOutput":
+                    seconds = self._seconds(part, trace_id, "model", now)
+                    self._steps[trace_id][3] += seconds
+                    self.metrics.model_seconds += seconds
+                elif part_name == "invocationInput":
+                    if "knowledgeBaseLookupInput" in part:
+                        self._pending[(trace_id, "knowledge_base")] = now
+                    elif "actionGroupInvocationInput" in part:
+                        self._pending[(trace_id, "tool")] = now
+                elif part_name == "observation":
+                    if "knowledgeBaseLookupOutput" in part:
+                        self.metrics.knowledge_base_seconds += self._seconds(
+                            part["knowledgeBaseLookupOutput"],
+                            trace_id,
+                            "knowledge_base",
+                            now,
+                        )
+                    elif "actionGroupInvocationOutput" in part:
+                        self.metrics.tool_seconds += self._seconds(
+                            part["actionGroupInvocationOutput"], trace_id, "tool", now
+                        )
+
+    def _seconds(self, part: Dict, trace_id: str, kind: str, now: float) -> float:
+        started = self._pending.pop((trace_id, kind), None)
+        total_time_ms = part.get("metadata", {}).get("totalTimeMs")
+        if total_time_ms is not None:
+            return total_time_ms / 1000
+        if started is not None:
+            return now - started
+        return 0.0
+
+    def finish(self) -> InvocationMetrics:
+        self.metrics.duration_seconds = self.elapsed()
+        self.metrics.steps = [
+            StepLatency(
+                trace_id=trace_id,
+                step=step,
+                seconds=last_seen - first_seen,
+                model_seconds=model_seconds,
+            )
+            for trace_id, (step, first_seen, last_seen, model_seconds) in self._steps.items()
+        ]
+        return self.metrics
+
+    @staticmethod
+    def export(metrics: InvocationMetrics, backend: MetricsBackend, agent_name: str):
+        attributes = {"agent_name": agent_name}
+        backend.record("inline_agent.duration", metrics.duration_seconds, attributes)
+        if metrics.time_to_first_event is not None:
+            backend.record(
+                "inline_agent.time_to_first_event",
+                metrics.time_to_first_event,
+                attributes,
+            )
+        if metrics.time_to_first_chunk is not None:
+            backend.record(
+                "inline_agent.time_to_first_chunk",
+                metrics.time_to_first_chunk,
+                attributes,
+            )
+        backend.record("inline_agent.model_time", metrics.model_seconds, attributes)
+        backend.record("inline_agent.tool_time", metrics.tool_seconds, attributes)
+        backend.record(
+            "inline_agent.knowledge_base_time",
+            metrics.knowledge_base_seconds,
+            attributes,
+        )
+        backend.record("inline_agent.bytes_received", metrics.bytes_received, attributes)
+        backend.record("inline_agent.roc_rounds", metrics.roc_rounds, attributes)
+        backend.record("inline_agent.llm_calls", metrics.llm_calls, attributes)
+        backend.record(
+            "inline_agent.tokens",
+            metrics.input_tokens + metrics.output_tokens,
+            attributes,
+        )
+        if metrics.tools_offered is not None:
+            backend.record(
+                "inline_agent.tool_schema_tokens_saved",
+                metrics.tool_schema_tokens_saved,
+                attributes,
+            )
+        for step in metrics.steps:
+            backend.record(
+                "inline_agent.step_latency",
+                step.seconds,
+                {**attributes, "step": step.step},
+            )
@@ -72,6 +72,25 @@ class Trace:
 
         return int(input_tokens), int(output_tokens), int(llm_calls)
 
+    @staticmethod
+    def count_usage(trace: Dict):
+        """Count tokens and LLM calls like `parse_trace`, without printing anything."""
+        for step in ("orchestrationTrace", "routingClassifierTrace"):
+            if step in trace and "modelInvocationOutput" in trace[step]:
+                usage = trace[step]["modelInvocationOutput"]["metadata"]["usage"]
+                return (
+                    int(usage.get("inputTokens", 0)),
+                    int(usage.get("outputTokens", 0)),
+                    1,
+                )
+
+        for step in ("preProcessingTrace", "postProcessingTrace"):
+            if step in trace and "modelInvocationOutput" in trace[step]:
+                usage = trace[step]["modelInvocationOutput"]["metadata"]["usage"]
+                return int(usage["inputTokens"]), int(usage["outputTokens"]), 1
+
+        return 0, 0, 0
+
     @staticmethod
     def add_citation(citations: List, cite=1) -> str:
 
@@ -3,11 +3,14 @@
 import base64
 import logging
 
-from opentelemetry import trace
+from opentelemetry import metrics, trace
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.resources import Resource
 from openinference.semconv.resource import ResourceAttributes
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.trace.export import (
     BatchSpanProcessor,
     ConsoleSpanExporter,
@@ -81,3 +84,45 @@ def create_tracer_provider(config: ObservabilityConfig, timeout: int = 300):
 
     # Set as global tracer provider
     trace.set_tracer_provider(tracer_provider)
+
+
+def create_meter_provider(
+    config: ObservabilityConfig, export_interval_millis: int = 60_000
+):
+    """Create an OpenTelemetry MeterProvider exporting to the same endpoint as traces.
+
+    Tool and invocation histograms recorded through `OtelMetricsBackend` are sent
+    with it.
+    """
+
+    resource = Resource.create(
+        {
+            ResourceAttributes.PROJECT_NAME: config.PROJECT_NAME,
+            "service.name": config.PROJECT_NAME,
+            "deployment.environment": config.ENVIRONMENT,
+        }
+    )
+
+    readers = []
+    if config.API_URL and config.PRODUCE_BEDROCK_OTEL_METRICS:
+        headers = None
+        if config.LANGFUSE_PUBLIC_KEY and config.LANGFUSE_SECRET_KEY:
+            langfuse_auth = base64.b64encode(
+                f"{config.LANGFUSE_PUBLIC_KEY}:{config.LANGFUSE_SECRET_KEY}".encode()
+            ).decode()
+            headers = {"Authorization": f"Basic {langfuse_auth}"}
+
+        readers.append(
+            PeriodicExportingMetricReader(
+                OTLPMetricExporter(
+                    endpoint=f"{config.API_URL}/v1/metrics", headers=headers
+                ),
+                export_interval_millis=export_interval_millis,
+            )
+        )
+    else:
+        logger.warning("Metrics export disabled, metrics are only kept in process")
+
+    meter_provider = MeterProvider(resource=resource, metric_readers=readers)
+    metrics.set_meter_provider(meter_provider)
+    return meter_provider
@@ -0,0 +1,19 @@
+from .file_writer import (
+    FileBackend,
+    FileWriteError,
+    FileWriter,
+    LocalDirBackend,
+    MemoryBackend,
+    S3Backend,
+    default_file_writer,
+)
+
+__all__ = [
+    "FileBackend",
+    "FileWriteError",
+    "FileWriter",
+    "LocalDirBackend",
+    "MemoryBackend",
+    "S3Backend",
+    "default_file_writer",
+]
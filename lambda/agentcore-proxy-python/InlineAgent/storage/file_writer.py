@@ -0,0 +1,302 @@
+import asyncio
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+from typing import Dict, Iterable, List, Optional, Set
+
+from InlineAgent.aws import client_pool
+
+
+logger = logging.getLogger(__name__)
+
+
+class FileWriteError(Exception):
+    """Raised by `FileWriter.flush` when files it waited for could not be
+    written; `errors` holds the underlying exceptions."""
+
+    def __init__(self, errors: List[Exception]):
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} file(s) could not be written: "
+            + "; ".join(str(error) for error in errors)
+        )
+
+
+class FileBackend(ABC):
+    """Content-addressed storage for files produced by code interpreter.
+
+    Blobs are stored once per digest; `link` then publishes a blob under a
+    human-readable key such as `<session_id>/<file name>`.
+    """
+
+    @abstractmethod
+    def has_blob(self, digest: str) -> bool:
+        pass
+
+    @abstractmethod
+    def put_blob(self, digest: str, data: bytes):
+        pass
+
+    @abstractmethod
+    def link(self, key: str, digest: str):
+        pass
+
+
+class LocalDirBackend(FileBackend):
+    """Publishes blobs as copies under `root`.
+
+    With `immutable=True` they are hard links to the blob instead, which saves
+    the copy but shares one inode between every file with the same content, so
+    only use it when published files are never edited in place.
+    """
+
+    def __init__(self, root: str, immutable: bool = False):
+        self.root = root
+        self.immutable = immutable
+        self._objects = os.path.join(root, ".objects")
+        self._created_dirs: Set[str] = set()
+
+    def _ensure_dir(self, path: str):
+        if path not in self._created_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._created_dirs.add(path)
+
+    def has_blob(self, digest: str) -> bool:
+        return os.path.exists(os.path.join(self._objects, digest))
+
+    def put_blob(self, digest: str, data: bytes):
+        self._ensure_dir(self._objects)
+        tmp_path = os.path.join(self._objects, f".{digest}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, os.path.join(self._objects, digest))
+
+    def link(self, key: str, digest: str):
+        path = os.path.join(self.root, key)
+        self._ensure_dir(os.path.dirname(path))
+        # Removed rather than overwritten: it may be a hard link to a blob.
+        if os.path.lexists(path):
+            os.remove(path)
+        if self.immutable:
+            try:
+                os.link(os.path.join(self._objects, digest), path)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(os.path.join(self._objects, digest), path)
+
+
+class MemoryBackend(FileBackend):
+    """Keeps files in memory, e.g. in Lambda where only /tmp is writable."""
+
+    def __init__(self):
+        self.blobs: Dict[str, bytes] = dict()
+        self.keys: Dict[str, str] = dict()
+
+    def has_blob(self, digest: str) -> bool:
+        return digest in self.blobs
+
+    def put_blob(self, digest: str, data: bytes):
+        self.blobs[digest] = data
+
+    def link(self, key: str, digest: str):
+        self.keys[key] = digest
+
+    def get(self, key: str) -> bytes:
+        return self.blobs[self.keys[key]]
+
+
+class S3Backend(FileBackend):
+    """Uploads blobs to S3 (multipart above `part_size`) and links them with a
+    server-side copy. `endpoint_url` allows S3-compatible local stand-ins."""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "output",
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024,
+        client=None,
+    ):
+        if part_size < 5 * 1024 * 1024:
+            raise ValueError("S3 multipart parts must be at least 5 MiB")
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.part_size = part_size
+        self.client = client or client_pool.client(
+            "s3", region_name=region_name, endpoint_url=endpoint_url
+        )
+
+    def _object_key(self, digest: str) -> str:
+        return f"{self.prefix}/.objects/{digest}"
+
+    def has_blob(self, digest: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(digest))
+            return True
+        except self.client.exceptions.ClientError:
+            return False
+
+    def put_blob(self, digest: str, data: bytes):
+        key = self._object_key(digest)
+        if len(data) <= self.part_size:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+            return
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)[
+            "UploadId"
+        ]
+        try:
+            parts = list()
+            for part_number, offset in enumerate(
+                range(0, len(data), self.part_size), start=1
+            ):
+                response = self.client.upload_part(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=data[offset : offset + self.part_size],
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id
+            )
+            raise
+
+    def link(self, key: str, digest: str):
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=f"{self.prefix}/{key}",
+            CopySource={"Bucket": self.bucket, "Key": self._object_key(digest)},
+        )
+
+
+class FileWriter:
+    """Writes files on a background thread so event-stream loops never touch disk.
+
+    `submit` only enqueues; hashing, deduplication and the backend calls run on the
+    writer thread. The queue is bounded, so a stalled backend applies backpressure
+    instead of buffering without limit. Each submission returns a future, so a
+    writer shared by concurrent invocations lets each of them wait for, and see
+    the errors of, only its own files. Write errors are also logged. The digests
+    of the last `max_tracked_blobs` blobs are remembered to skip `has_blob`
+    lookups.
+    """
+
+    def __init__(
+        self,
+        backend: FileBackend,
+        max_queue_size: int = 64,
+        max_tracked_blobs: int = 4096,
+    ):
+        self.backend = backend
+        self.max_tracked_blobs = max_tracked_blobs
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._written: OrderedDict[str, None] = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, session_id: str, name: str, data: bytes) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((f"{session_id}/{name}", data, future))
+        return future
+
+    async def asubmit(self, session_id: str, name: str, data: bytes) -> Future:
+        self._ensure_started()
+        future = Future()
+        item = (f"{session_id}/{name}", data, future)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._queue.put, item
+            )
+        return future
+
+    def flush(self, futures: Optional[Iterable[Future]] = None):
+        """Block until the files of `futures` have been written and raise
+        `FileWriteError` if any of them failed. Without `futures`, wait for every
+        submitted file; errors are then only logged."""
+        if futures is None:
+            self._queue.join()
+            return
+        futures = list(futures)
+        wait(futures)
+        FileWriter._raise_errors(futures)
+
+    async def aflush(self, futures: Optional[Iterable[Future]] = None):
+        if futures is None:
+            await asyncio.get_running_loop().run_in_executor(None, self._queue.join)
+            return
+        futures = list(futures)
+        await asyncio.gather(
+            *(asyncio.wrap_future(future) for future in futures),
+            return_exceptions=True,
+        )
+        FileWriter._raise_errors(futures)
+
+    @staticmethod
+    def _raise_errors(futures: List[Future]):
+        errors = [future.exception() for future in futures if future.exception()]
+        if errors:
+            raise FileWriteError(errors)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="InlineAgentFileWriter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            key, data, future = self._queue.get()
+            try:
+                digest = hashlib.sha256(data).hexdigest()
+                if digest in self._written:
+                    self._written.move_to_end(digest)
+                else:
+                    if not self.backend.has_blob(digest):
+                        self.backend.put_blob(digest, data)
+                    self._written[digest] = None
+                    if len(self._written) > self.max_tracked_blobs:
+                        self._written.popitem(last=False)
+                self.backend.link(key, digest)
+                future.set_result(key)
+            except Exception as e:
+                logger.exception("Error writing file %s", key)
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+
+_default_writers: Dict[str, FileWriter] = dict()
+_default_writers_lock = threading.Lock()
+
+
+def default_file_writer(root: Optional[str] = None) -> FileWriter:
+    """Shared writer for `<cwd>/output`, the directory files have always been saved to."""
+    root = root or os.path.join(os.getcwd(), "output")
+    with _default_writers_lock:
+        if root not in _default_writers:
+            _default_writers[root] = FileWriter(backend=LocalDirBackend(root=root))
+        return _default_writers[root]
@@ -1,3 +1,28 @@
+from .decorators import ExecutionMode, ToolMetadata, tool
 from .mcp import MCPStdio, MCPServer, MCPHttp, MCPHttpStreamable
+from .cache import (
+    CacheBackend,
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    ToolCache,
+    ToolCacheConfig,
+    cacheable,
+    tool_cache,
+)
 
-__all__ = ["MCPStdio", "MCPServer", "MCPHttp", "MCPHttpStreamable"]
+__all__ = [
+    "MCPStdio",
+    "MCPServer",
+    "MCPHttp",
+    "MCPHttpStreamable",
+    "CacheBackend",
+    "DiskCacheBackend",
+    "MemoryCacheBackend",
+    "ToolCache",
+    "ToolCacheConfig",
+    "cacheable",
+    "tool_cache",
+    "ExecutionMode",
+    "ToolMetadata",
+    "tool",
+]
@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from InlineAgent.tools.decorators import tool
+
+
+class ToolCacheConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+    )
+
+    TOOL_CACHE_BACKEND: str = Field(default="memory")
+    TOOL_CACHE_DIR: Optional[str] = None
+    TOOL_CACHE_MAX_ENTRIES: int = Field(default=1024)
+    TOOL_CACHE_TTL: float = Field(default=300.0)
+
+
+def cacheable(ttl: Optional[float] = None, scope: Optional[str] = None):
+    """Mark an idempotent tool so `ProcessROC` may serve repeated calls with the
+    same arguments from the tool cache for `ttl` seconds (default `TOOL_CACHE_TTL`).
+
+    Entries are shared by every caller with the same `scope`; tools whose results
+    depend on who calls them (e.g. MCP tools behind the caller's credentials) need
+    a scope per caller.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        return tool(func, cacheable=True, cache_ttl=ttl, cache_scope=scope)
+
+    # Handle both @cacheable and @cacheable()
+    if callable(ttl):
+        func = ttl
+        ttl = None
+        return decorator(func)
+    return decorator
+
+
+class CacheBackend(ABC):
+    # Backends doing file or network IO are called from a worker thread.
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Tuple[bool, Any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU dict with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCacheBackend(CacheBackend):
+    """One pickle per entry under `directory`, so results survive across processes
+    and warm Lambda containers sharing /tmp. Once there are a tenth more than
+    `max_entries` files, the least recently used are evicted in one batch."""
+
+    blocking = True
+
+    def __init__(self, directory: str, max_entries: int = 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Approximate: other processes may share the directory.
+        self._count: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+        if expires_at < time.time():
+            self._remove(path)
+            return False, None
+        # Touch the file so eviction sees it as recently used.
+        os.utime(path)
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: float):
+        try:
+            data = pickle.dumps((time.time() + ttl, value))
+        except Exception:
+            # Results that cannot be pickled are simply not cached.
+            return
+        path = self._path(key)
+        added = not os.path.exists(path)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._count is None:
+                self._count = len(self._entries())
+            elif added:
+                self._count += 1
+            evict = self._count > self.max_entries + max(1, self.max_entries // 10)
+        if evict:
+            self._evict()
+
+    def _entries(self) -> List[os.DirEntry]:
+        return [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        ]
+
+    def _evict(self):
+        with self._lock:
+            entries = self._entries()
+            if len(entries) > self.max_entries:
+                entries.sort(key=lambda entry: entry.stat().st_mtime)
+                for entry in entries[: len(entries) - self.max_entries]:
+                    self._remove(entry.path)
+            self._count = min(len(entries), self.max_entries)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            self._remove(entry.path)
+        with self._lock:
+            self._count = None
+
+
+class ToolCache:
+    """Result cache for tools marked `cacheable`, keyed by scope, function and
+    canonicalized parameters, with hit/miss counters per function. `aget` and
+    `aset` run blocking backends in a worker thread."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: float = 300.0):
+        self.backend = backend or MemoryCacheBackend()
+        self.ttl = ttl
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def from_config(cls, config: Optional[ToolCacheConfig] = None) -> "ToolCache":
+        config = config or ToolCacheConfig()
+        if config.TOOL_CACHE_BACKEND == "disk":
+            backend = DiskCacheBackend(
+                directory=config.TOOL_CACHE_DIR
+                or os.path.join(os.getcwd(), ".tool_cache"),
+                max_entries=config.TOOL_CACHE_MAX_ENTRIES,
+            )
+        elif config.TOOL_CACHE_BACKEND == "memory":
+            backend = MemoryCacheBackend(max_entries=config.TOOL_CACHE_MAX_ENTRIES)
+        else:
+            raise ValueError(
+                f"Unknown TOOL_CACHE_BACKEND {config.TOOL_CACHE_BACKEND}, use memory or disk"
+            )
+        return cls(backend=backend, ttl=config.TOOL_CACHE_TTL)
+
+    @staticmethod
+    def key(function: str, parameters: Dict, scope: Optional[str] = None) -> str:
+        return json.dumps(
+            [scope, function, parameters],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+
+    def get(
+        self, function: str, parameters: Dict, scope: Optional[str] = None
+    ) -> Tuple[bool, Any]:
+        hit, value = self.backend.get(ToolCache.key(function, parameters, scope))
+        if hit:
+            self.hits[function] += 1
+        else:
+            self.misses[function] += 1
+        return hit, value
+
+    def set(
+        self,
+        function: str,
+        parameters: Dict,
+        value: Any,
+        ttl: Optional[float] = None,
+        scope: Optional[str] = None,
+    ):
+        self.backend.set(
+            ToolCache.key(function, parameters, scope),
+            value,
+            self.ttl if ttl is None else ttl,
+        )
+
+    async def aget(
+        self, function: str, parameters: Dict, scope: Optional[str] = None
+    ) -> Tuple[bool, Any]:
+        if not self.backend.blocking:
+            return self.get(function, parameters, scope)
+        return await asyncio.to_thread(self.get, function, parameters, scope)
+
+    async def aset(
+        self,
+        function: str,
+        parameters: Dict,
+        value: Any,
+        ttl: Optional[float] = None,
+        scope: Optional[str] = None,
+    ):
+        if not self.backend.blocking:
+            return self.set(function, parameters, value, ttl, scope)
+        await asyncio.to_thread(self.set, function, parameters, value, ttl, scope)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            function: {
+                "hits": self.hits[function],
+                "misses": self.misses[function],
+                "hit_rate": self.hits[function]
+                / (self.hits[function] + self.misses[function]),
+            }
+            for function in set(self.hits) | set(self.misses)
+        }
+
+    def clear(self):
+        self.backend.clear()
+        self.hits.clear()
+        self.misses.clear()
+
+
+tool_cache = ToolCache.from_config()
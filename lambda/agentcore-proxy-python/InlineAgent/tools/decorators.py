@@ -0,0 +1,138 @@
+import functools
+import inspect
+from dataclasses import dataclass, replace
+from typing import Callable, List, Literal, Optional, Union
+
+
+ExecutionMode = Literal["inline", "thread", "process"]
+
+
+@dataclass(frozen=True)
+class ToolMetadata:
+    """Execution hints for a tool, read by `ProcessROC` and `create_function_schema`.
+
+    `tool` attaches the hints to a `functools.wraps` wrapper, never to the
+    function itself, so bound methods and builtins can be tools and a function
+    shared by several tools keeps separate hints per tool. Wrappers of coroutine
+    functions are coroutine functions.
+    """
+
+    timeout: Optional[float] = None
+    cacheable: bool = False
+    cache_ttl: Optional[float] = None
+    # Partitions cache entries, e.g. per caller identity.
+    cache_scope: Optional[str] = None
+    parallel_safe: bool = True
+    max_concurrency: Optional[int] = None
+    executor: Optional[ExecutionMode] = None
+    max_result_size: Optional[int] = None
+    result_fields: Optional[List[str]] = None
+    require_confirmation: bool = False
+    confirmation_message: Optional[str] = None
+
+    def __post_init__(self):
+        if self.executor not in (None, "inline", "thread", "process"):
+            raise ValueError(f"Unknown execution mode: {self.executor}")
+        if not self.parallel_safe:
+            object.__setattr__(self, "max_concurrency", 1)
+
+    @staticmethod
+    def of(func: Optional[Callable]) -> "ToolMetadata":
+        return getattr(func, "__tool_metadata__", None) or ToolMetadata()
+
+    def apply(self, func: Callable) -> Callable:
+        """A wrapper of `func` carrying these hints. Wrapping a tool wrapper again
+        wraps its function, so stacked decorators add no call overhead."""
+        target = unwrap(func)
+
+        if inspect.iscoroutinefunction(target):
+
+            async def wrapper(*args, **kwargs):
+                return await target(*args, **kwargs)
+
+        else:
+
+            def wrapper(*args, **kwargs):
+                return target(*args, **kwargs)
+
+        functools.update_wrapper(wrapper, func)
+        wrapper.__wrapped__ = target
+        wrapper.__tool_metadata__ = self
+        return wrapper
+
+
+def unwrap(func: Callable) -> Callable:
+    """The function behind a `tool` wrapper; other callables are returned as is."""
+    return inspect.unwrap(
+        func, stop=lambda f: "__tool_metadata__" not in getattr(f, "__dict__", {})
+    )
+
+
+def tool(
+    func: Optional[Callable] = None,
+    *,
+    timeout: Optional[float] = None,
+    cache: Optional[Union[bool, float]] = None,
+    cacheable: Optional[bool] = None,
+    cache_ttl: Optional[float] = None,
+    cache_scope: Optional[str] = None,
+    parallel_safe: Optional[bool] = None,
+    max_concurrency: Optional[int] = None,
+    executor: Optional[ExecutionMode] = None,
+    max_result_size: Optional[int] = None,
+    result_fields: Optional[List[str]] = None,
+    require_confirmation: Optional[bool] = None,
+    confirmation_message: Optional[str] = None,
+):
+    """Declare how a ROC tool is run.
+
+    Args:
+        timeout: Seconds after which the call is cancelled and answered with FAILURE.
+        cache: True, or a ttl in seconds, to opt the tool into the tool cache;
+            shorthand for `cacheable` and `cache_ttl`.
+        cacheable: Serve repeated calls with equal arguments from the tool cache.
+        cache_ttl: Cache lifetime in seconds, defaults to `TOOL_CACHE_TTL`.
+        cache_scope: Cache entries are only shared between calls with the same
+            scope; use one per caller when results depend on the caller.
+        parallel_safe: False keeps calls of this tool from overlapping each other.
+        max_concurrency: Maximum concurrent calls of this tool within a ROC round.
+        executor: `inline`, `thread` or `process`; see `execution_mode`.
+        max_result_size: Byte budget of the result sent back to Bedrock.
+        result_fields: JSON fields (dotted paths) to keep from the result.
+        require_confirmation: Ask the user before the tool runs.
+        confirmation_message: Text shown when asking for confirmation.
+
+    Usable as `@tool` or `@tool(...)` and stackable with `cacheable`,
+    `execution_mode` and `require_confirmation`; arguments left as None keep what
+    is already set. Returns a wrapper of the function that carries the metadata;
+    the function itself is not modified.
+    """
+    if cache is not None:
+        cacheable = cache is not False
+        if not isinstance(cache, bool):
+            cache_ttl = cache
+
+    overrides = {
+        name: value
+        for name, value in dict(
+            timeout=timeout,
+            cacheable=cacheable,
+            cache_ttl=cache_ttl,
+            cache_scope=cache_scope,
+            parallel_safe=parallel_safe,
+            max_concurrency=max_concurrency,
+            executor=executor,
+            max_result_size=max_result_size,
+            result_fields=result_fields,
+            require_confirmation=require_confirmation,
+            confirmation_message=confirmation_message,
+        ).items()
+        if value is not None
+    }
+
+    def decorator(func: Callable) -> Callable:
+        return replace(ToolMetadata.of(func), **overrides).apply(func)
+
+    if func is not None:
+        return decorator(func)
+    return decorator
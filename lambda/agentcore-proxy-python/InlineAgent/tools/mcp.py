@@ -1,35 +1,56 @@
 from abc import ABC, abstractmethod
+from datetime import timedelta
 from contextlib import AsyncExitStack
 
 from termcolor import colored
 
 from pydantic import validate_call
-from mcp import ClientSession, ListToolsResult, StdioServerParameters
+from mcp import ClientSession, ListToolsResult, StdioServerParameters, Tool
 from mcp.client.stdio import stdio_client
 from mcp.client.sse import sse_client
 from mcp.client.streamable_http import streamablehttp_client
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
+from InlineAgent.deadline import Deadline
+from InlineAgent.tools.cache import cacheable
 from InlineAgent.types.action_group import FunctionDefination
 from InlineAgent.constants import TraceColor
 
 
 class MCPServer(ABC):
 
+    async def list_tools(self, tools: Optional[List[Dict]] = None) -> List[Tool]:
+        """
+        List the server's tools once, or take them from an earlier listing.
+
+        Args:
+            tools: Tools as dumped by `Tool.model_dump`, e.g. from an agent bundle.
+        """
+        if tools is not None:
+            self.tools = [Tool.model_validate(tool) for tool in tools]
+        else:
+            if not self.session:
+                raise RuntimeError("Not connected to MCP server")
+            response: ListToolsResult = await self.session.list_tools()
+            self.tools = response.tools
+        return self.tools
+
     @validate_call
-    async def set_available_tools(self, tools_to_use: set, max_parameters: int = 5) -> List[FunctionDefination]:
+    async def set_available_tools(
+        self, tools_to_use: set, max_parameters: int = 5, tools: Optional[list] = None
+    ) -> List[FunctionDefination]:
         """
         Retrieve a list of available tools from the MCP server.
         
         Args:
             tools_to_use: Set of tool names to use. If empty, all tools are used.
             max_parameters: Maximum number of parameters allowed per tool (default: 5)
+            tools: Tools already listed; the server is asked when None.
         """
         if not self.session:
             raise RuntimeError("Not connected to MCP server")
 
-        tools: ListToolsResult = await self.session.list_tools()
-        tools_list = tools.tools
+        tools_list = tools if tools is not None else await self.list_tools()
 
         function = {}
         for tool in tools_list:
@@ -98,31 +119,65 @@ class MCPServer(ABC):
                 self.function_schema["functions"].append(function)
 
     @validate_call
-    async def set_callable_tool(self, tools_to_use: set) -> Dict[str, Callable]:
+    async def set_callable_tool(
+        self,
+        tools_to_use: set,
+        cacheable_tools: set = set(),
+        tools: Optional[list] = None,
+        cache_scope: Optional[str] = None,
+    ) -> Dict[str, Callable]:
         """
         Get callable function
+
+        Args:
+            tools_to_use: Set of tool names to use. If empty, all tools are used.
+            cacheable_tools: Tool names whose results may be served from the tool cache.
+            tools: Tools already listed; the server is asked when None.
+            cache_scope: Required with `cacheable_tools`, e.g. the caller's identity,
+                so one caller's results are never served to another.
         """
         if not self.session:
             raise RuntimeError("Not connected to MCP server")
+        if cacheable_tools and cache_scope is None:
+            raise ValueError("cache_scope is required when cacheable_tools is given")
 
-        tools = await self.session.list_tools()
-        tools_list = tools.tools
+        tools_list = tools if tools is not None else await self.list_tools()
 
         # Helper factory function to create a callable with the correct tool name
-        def create_callable(tool_name):
+        def create_callable(tool_name, input_schema):
             async def callable(*args, **kwargs):
+                deadline = Deadline.current()
                 response = await self.session.call_tool(
-                    tool_name, arguments=kwargs
+                    tool_name,
+                    arguments=kwargs,
+                    read_timeout_seconds=(
+                        timedelta(seconds=deadline.remaining())
+                        if deadline is not None
+                        else None
+                    ),
                 )
-                return response.content[0].text
+                # Every text part is returned; ProcessROC compacts oversized results.
+                return "\n".join(
+                    content.text
+                    for content in response.content
+                    if getattr(content, "text", None) is not None
+                )
+            # ProcessROC compiles its parameter decoder from this schema.
+            callable.__input_schema__ = input_schema
+            if tool_name in cacheable_tools:
+                callable = cacheable(scope=cache_scope)(callable)
             return callable
 
         for tool in tools_list:
             if len(tools_to_use) != 0:
                 if tool.name in tools_to_use:
-                    self.callable_tools[tool.name] = create_callable(tool.name)
+                    self.callable_tools[tool.name] = create_callable(
+                        tool.name, tool.inputSchema
+                    )
             else:
-                self.callable_tools[tool.name] = create_callable(tool.name)
+                self.callable_tools[tool.name] = create_callable(
+                    tool.name, tool.inputSchema
+                )
 
     async def cleanup(self):
         """Clean up resources"""
@@ -137,7 +192,9 @@ class MCPStdio(MCPServer):
     @classmethod
     @validate_call
     async def create(
-        cls, server_params: StdioServerParameters, tools_to_use: set = set(), max_parameters: int = 5
+        cls, server_params: StdioServerParameters, tools_to_use: set = set(),
+        max_parameters: int = 5,
+        tools: Optional[List[Dict]] = None,
     ):
         # Initialize session and client objects
         self = cls()
@@ -145,6 +202,7 @@ class MCPStdio(MCPServer):
         self.exit_stack = AsyncExitStack()
         self.function_schema = dict()
         self.callable_tools = dict()
+        self.server_id = " ".join([server_params.command, *server_params.args])
 
         stdio_transport = await self.exit_stack.enter_async_context(
             stdio_client(server_params)
@@ -156,9 +214,8 @@ class MCPStdio(MCPServer):
 
         await self.session.initialize()
 
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
+        # Tools listed ahead of time (see AgentBundler) save the list_tools round trip.
+        tools = await self.list_tools(tools)
         print(
             colored(
                 f"\nConnected to server with tools:{[tool.name for tool in tools]}",
@@ -166,8 +223,10 @@ class MCPStdio(MCPServer):
             )
         )
 
-        await self.set_available_tools(tools_to_use=tools_to_use, max_parameters=max_parameters)
-        await self.set_callable_tool(tools_to_use=tools_to_use)
+        await self.set_available_tools(
+            tools_to_use=tools_to_use, max_parameters=max_parameters, tools=tools
+        )
+        await self.set_callable_tool(tools_to_use=tools_to_use, tools=tools)
 
         return self
 
@@ -187,6 +246,7 @@ class MCPHttpStreamable(MCPServer):
         timeout: float = 5,
         tools_to_use: set = set(),
         max_parameters: int = 5,
+        tools: Optional[List[Dict]] = None,
     ):
         # Initialize session and client objects
         self = cls()
@@ -194,6 +254,7 @@ class MCPHttpStreamable(MCPServer):
         self.exit_stack = AsyncExitStack()
         self.function_schema = dict()
         self.callable_tools = dict()
+        self.server_id = url
 
         stdio_transport = await self.exit_stack.enter_async_context(
             streamablehttp_client(
@@ -209,9 +270,8 @@ class MCPHttpStreamable(MCPServer):
 
         await self.session.initialize()
 
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
+        # Tools listed ahead of time (see AgentBundler) save the list_tools round trip.
+        tools = await self.list_tools(tools)
         print(
             colored(
                 f"\nConnected to HTTP Streamable server with tools:{[tool.name for tool in tools]}",
@@ -219,8 +279,10 @@ class MCPHttpStreamable(MCPServer):
             )
         )
 
-        await self.set_available_tools(tools_to_use=tools_to_use, max_parameters=max_parameters)
-        await self.set_callable_tool(tools_to_use=tools_to_use)
+        await self.set_available_tools(
+            tools_to_use=tools_to_use, max_parameters=max_parameters, tools=tools
+        )
+        await self.set_callable_tool(tools_to_use=tools_to_use, tools=tools)
 
         return self
 
@@ -236,6 +298,7 @@ class MCPHttp(MCPServer):
         sse_read_timeout: float = 60 * 5,
         tools_to_use: set = set(),
         max_parameters: int = 5,
+        tools: Optional[List[Dict]] = None,
     ):
 
         # Initialize session and client objects
@@ -244,6 +307,7 @@ class MCPHttp(MCPServer):
         self.exit_stack = AsyncExitStack()
         self.function_schema = dict()
         self.callable_tools = dict()
+        self.server_id = url
 
         stdio_transport = await self.exit_stack.enter_async_context(
             sse_client(
@@ -260,9 +324,8 @@ class MCPHttp(MCPServer):
 
         await self.session.initialize()
 
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
+        # Tools listed ahead of time (see AgentBundler) save the list_tools round trip.
+        tools = await self.list_tools(tools)
         print(
             colored(
                 f"\nConnected to server with tools:{[tool.name for tool in tools]}",
@@ -270,8 +333,10 @@ class MCPHttp(MCPServer):
             )
         )
 
-        await self.set_available_tools(tools_to_use=tools_to_use, max_parameters=max_parameters)
-        await self.set_callable_tool(tools_to_use=tools_to_use)
+        await self.set_available_tools(
+            tools_to_use=tools_to_use, max_parameters=max_parameters, tools=tools
+        )
+        await self.set_callable_tool(tools_to_use=tools_to_use, tools=tools)
 
         return self
 
@@ -291,6 +356,7 @@ class MCPHttpStreamable(MCPServer):
         timeout: float = 5,
         tools_to_use: set = set(),
         max_parameters: int = 5,
+        tools: Optional[List[Dict]] = None,
     ):
         # Initialize session and client objects
         self = cls()
@@ -298,6 +364,7 @@ class MCPHttpStreamable(MCPServer):
         self.exit_stack = AsyncExitStack()
         self.function_schema = dict()
         self.callable_tools = dict()
+        self.server_id = url
 
         stdio_transport = await self.exit_stack.enter_async_context(
             streamablehttp_client(
@@ -313,9 +380,8 @@ class MCPHttpStreamable(MCPServer):
 
         await self.session.initialize()
 
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
+        # Tools listed ahead of time (see AgentBundler) save the list_tools round trip.
+        tools = await self.list_tools(tools)
         print(
             colored(
                 f"\nConnected to HTTP Streamable server with tools:{[tool.name for tool in tools]}",
@@ -323,7 +389,9 @@ class MCPHttpStreamable(MCPServer):
             )
         )
 
-        await self.set_available_tools(tools_to_use=tools_to_use, max_parameters=max_parameters)
-        await self.set_callable_tool(tools_to_use=tools_to_use)
+        await self.set_available_tools(
+            tools_to_use=tools_to_use, max_parameters=max_parameters, tools=tools
+        )
+        await self.set_callable_tool(tools_to_use=tools_to_use, tools=tools)
 
         return self
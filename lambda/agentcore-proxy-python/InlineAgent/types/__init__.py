@@ -2,8 +2,12 @@ from .action_group import Executor, Parameter, FunctionDefination, APISchema, S3
 from .inline_agent import (
     InlineCollaboratorAgentConfig,
     InlineCollaboratorConfigurations,
+    InvocationResult,
 )
+from .bundle import AgentBundle
+from .confirmation import ConfirmationRequest
 from .mcp import MCPConfig
+from .metrics import InvocationMetrics, StepLatency, ToolStats
 
 __all__ = [
     "Executor",
@@ -12,6 +16,12 @@ __all__ = [
     "APISchema",
     "InlineCollaboratorAgentConfig",
     "InlineCollaboratorConfigurations",
+    "InvocationResult",
     "MCPConfig",
     "S3",
+    "InvocationMetrics",
+    "StepLatency",
+    "ToolStats",
+    "ConfirmationRequest",
+    "AgentBundle",
 ]
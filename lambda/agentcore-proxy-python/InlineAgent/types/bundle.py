@@ -0,0 +1,25 @@
+import time
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+BUNDLE_FORMAT_VERSION = 3
+
+
+class AgentBundle(BaseModel):
+    """Everything `InlineAgent` resolves over the network at construction,
+    resolved once at build time (see `AgentBundler`)."""
+
+    format_version: int = BUNDLE_FORMAT_VERSION
+    created_at: float = Field(default_factory=time.time)
+    agent_name: str
+    # Hash of the agent definition and account id the bundle was built from.
+    fingerprint: str
+    region: Optional[str] = None
+    account_id: Optional[str] = None
+    knowledge_bases: List[Dict[str, Any]] = Field(default_factory=list)
+    action_groups: List[Dict[str, Any]] = Field(default_factory=list)
+    # Resolved collaborator configuration by collaborator agent name.
+    collaborators: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    # MCP tool listings by server id (URL or command line).
+    mcp_tools: Dict[str, List[Dict[str, Any]]] = Field(default_factory=dict)
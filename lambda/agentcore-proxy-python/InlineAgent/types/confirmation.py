@@ -0,0 +1,15 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class ConfirmationRequest(BaseModel):
+    """A pending tool invocation waiting for the user's approval."""
+
+    invocation_id: str
+    action_group: str
+    function: str
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+    message: str
+    # False for USER_CONFIRMATION: only the decision is sent back, nothing runs here.
+    include_result: bool = True
+    session_id: Optional[str] = None
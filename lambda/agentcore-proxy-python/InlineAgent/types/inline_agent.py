@@ -1,6 +1,8 @@
 from typing import Literal, Optional
 from pydantic import BaseModel
 
+from .metrics import InvocationMetrics
+
 
 class InlineCollaboratorAgentConfig(BaseModel):
     instruction: str = str()
@@ -12,3 +14,19 @@ class InlineCollaboratorConfigurations(BaseModel):
     collaboratorInstruction: str
     collaboratorName: str
     relayConversationHistory: Literal["TO_COLLABORATOR", "DISABLED"] = "DISABLED"
+
+
+class InvocationResult(BaseModel):
+    session_id: str
+    input_text: str
+    answer: str = str()
+    input_tokens: int = 0
+    output_tokens: int = 0
+    llm_calls: int = 0
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+    metrics: Optional[InvocationMetrics] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
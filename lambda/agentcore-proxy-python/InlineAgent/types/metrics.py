@@ -0,0 +1,54 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class StepLatency(BaseModel):
+    trace_id: str
+    step: str
+    seconds: float
+    model_seconds: float = 0.0
+
+
+class ToolStats(BaseModel):
+    """In-process summary of the calls made to one tool. Latencies are in seconds."""
+
+    function: str
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    cache_hits: int = 0
+    latency_p50: Optional[float] = None
+    latency_p99: Optional[float] = None
+    latency_max: Optional[float] = None
+    argument_bytes: int = 0
+    result_bytes: int = 0
+
+
+class InvocationMetrics(BaseModel):
+    """Client-side performance report of one `InlineAgent` invocation.
+
+    Durations are in seconds. Model, tool and knowledge base times use the
+    `totalTimeMs` reported in trace metadata when Bedrock sends it and fall back to
+    the gap between the matching input and output trace events otherwise. Tool time
+    also includes return-of-control rounds executed locally. With tool selection,
+    `tools_offered` is the number of functions sent in the last request and
+    `tool_schema_tokens_saved` the estimated schema tokens not sent, summed over
+    requests.
+    """
+
+    duration_seconds: float = 0.0
+    time_to_first_event: Optional[float] = None
+    time_to_first_chunk: Optional[float] = None
+    model_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    knowledge_base_seconds: float = 0.0
+    steps: List[StepLatency] = Field(default_factory=list)
+    bytes_received: int = 0
+    requests: int = 0
+    roc_rounds: int = 0
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tools_offered: Optional[int] = None
+    tool_schema_tokens_saved: int = 0
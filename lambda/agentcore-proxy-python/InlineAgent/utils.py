@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
@@ -9,3 +10,5 @@ class AgentAppConfig(BaseSettings):
         case_sensitive=True,
         extra="allow",
     )
+
+    INLINE_AGENT_QUIET: bool = Field(default=False)
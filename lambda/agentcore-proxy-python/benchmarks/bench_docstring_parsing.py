@@ -0,0 +1,121 @@
+"""Benchmark for docstring parsing and function schema compilation.
+
+Generates a few hundred tools with realistic docstrings and annotations, then
+times `ActionGroupBuilder.parse_docstring` and a cold (uncached)
+`ActionGroupBuilder.create_function_schema` over all of them.
+
+    python benchmarks/bench_docstring_parsing.py --tools 300 --style mixed
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import timeit
+from typing import Callable, List, Literal, Optional
+
+# Make `InlineAgent` importable when run from a checkout without PYTHONPATH.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from InlineAgent.action_group import ActionGroupBuilder, schema_cache
+
+
+PARAMETERS = [
+    ("email", "str", "Seller email address used to look up the account"),
+    ("marketplace", "Literal['US', 'UK', 'DE', 'JP']", "Marketplace of the seller"),
+    ("limit", "int", "Maximum number of records to return"),
+    ("include_orders", "bool", "Whether to include the seller's recent orders"),
+    ("order_ids", "list[int]", "Orders to fetch, newest first"),
+    ("since", "Optional[str]", "ISO-8601 date; only records after it are returned"),
+    ("threshold", "float", "Minimum score for a record to be reported"),
+]
+
+DESCRIPTION = (
+    "Look up seller records in the {domain} service.\n\n"
+    "    Results are sorted by recency and truncated to the requested limit. The\n"
+    "    lookup is read-only and safe to retry."
+)
+
+DOMAINS = ["catalog", "orders", "payments", "inventory", "returns", "shipping"]
+
+
+def google(parameters) -> str:
+    lines = [DESCRIPTION, "", "    Parameters:"]
+    for name, annotation, text in parameters:
+        lines.append(f"        {name} ({annotation}): {text}")
+        lines.append("            and a second line of detail for the model.")
+    lines += ["", "    Returns:", "        str: Matching records as JSON", "    "]
+    return "\n".join(lines)
+
+
+def numpy(parameters) -> str:
+    lines = [DESCRIPTION, "", "    Parameters", "    ----------"]
+    for name, annotation, text in parameters:
+        lines.append(f"    {name} : {annotation}")
+        lines.append(f"        {text}")
+    lines += ["", "    Returns", "    -------", "    str", "        Matching records as JSON", "    "]
+    return "\n".join(lines)
+
+
+def rest(parameters) -> str:
+    lines = [DESCRIPTION, ""]
+    for name, annotation, text in parameters:
+        lines.append(f"    :param {name}: {text}")
+        lines.append(f"    :type {name}: {annotation}")
+    lines += ["    :returns: Matching records as JSON", "    :rtype: str", "    "]
+    return "\n".join(lines)
+
+
+STYLES = {"google": google, "numpy": numpy, "rest": rest}
+
+
+def make_tools(count: int, style: str) -> List[Callable]:
+    styles = itertools.cycle(STYLES.values() if style == "mixed" else [STYLES[style]])
+    tools = list()
+    for index in range(count):
+        parameters = PARAMETERS[: 2 + index % (len(PARAMETERS) - 1)]
+        signature = ", ".join(f"{name}: {annotation}" for name, annotation, _ in parameters)
+        namespace = {"Literal": Literal, "Optional": Optional}
+        exec(f"def tool_{index}({signature}):\n    return None", namespace)
+        tool = namespace[f"tool_{index}"]
+        tool.__doc__ = next(styles)(parameters).format(domain=DOMAINS[index % len(DOMAINS)])
+        tools.append(tool)
+    return tools
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tools", type=int, default=300)
+    parser.add_argument("--style", choices=["mixed", *STYLES], default="mixed")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tools = make_tools(args.tools, args.style)
+
+    def parse():
+        for tool in tools:
+            ActionGroupBuilder.parse_docstring(tool.__doc__)
+
+    def compile_schemas():
+        schema_cache.clear()
+        for tool in tools:
+            ActionGroupBuilder.create_function_schema(tool)
+
+    def cached_schemas():
+        for tool in tools:
+            ActionGroupBuilder.create_function_schema(tool)
+
+    for name, function in [
+        ("parse_docstring", parse),
+        ("create_function_schema (cold)", compile_schemas),
+        ("create_function_schema (cached)", cached_schemas),
+    ]:
+        best = min(timeit.repeat(function, number=1, repeat=args.repeat))
+        print(
+            f"{name:32s} {best * 1000:8.2f} ms for {args.tools} tools "
+            f"({best / args.tools * 1e6:.1f} us/tool)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Micro-benchmark for compiled request templates in `InlineAgent`.
+
+Builds a supervisor with a deep tree of inline collaborators and compares
+rebuilding the request parameters on every return-of-control turn against
+reusing the compiled template.
+
+    python benchmarks/bench_invoke_params.py --depth 4 --fanout 3
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+# Make `InlineAgent` importable when run from a checkout without PYTHONPATH.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from InlineAgent.action_group import ActionGroup
+from InlineAgent.agent import InlineAgent
+
+
+def lookup_seller(email: str, include_orders: bool = False) -> str:
+    """Look up a seller by email address.
+
+    Parameters:
+        email (str): Seller email address
+        include_orders (bool): Whether to include the seller's recent orders
+
+    Returns:
+        str: Seller profile as JSON
+    """
+    return email
+
+
+def build_agent(name: str, depth: int, fanout: int) -> InlineAgent:
+    action_groups = [
+        ActionGroup(name=f"{name}-tools", tools=[lookup_seller], test=True)
+    ]
+    if depth == 0:
+        return InlineAgent(
+            foundation_model="anthropic.claude-3-5-sonnet-20241022-v2:0",
+            agent_name=name,
+            instruction=f"You are {name}, answer questions about sellers.",
+            action_groups=action_groups,
+        )
+
+    return InlineAgent(
+        foundation_model="anthropic.claude-3-5-sonnet-20241022-v2:0",
+        agent_name=name,
+        instruction=f"You are {name}, route questions to your collaborators.",
+        action_groups=action_groups,
+        agent_collaboration="SUPERVISOR",
+        collaborators=[
+            build_agent(name=f"{name}-{idx}", depth=depth - 1, fanout=fanout)
+            for idx in range(fanout)
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    agent = build_agent(name="supervisor", depth=args.depth, fanout=args.fanout)
+    session_state = {"sessionAttributes": {"seller": "seller@example.com"}}
+
+    def rebuild():
+        return {
+            "sessionId": "bench",
+            "inputText": "Who is seller@example.com?",
+            "inlineSessionState": session_state,
+            **agent._build_invoke_params(),
+        }
+
+    def cached():
+        return agent._get_request_params(
+            input_text="Who is seller@example.com?",
+            session_id="bench",
+            enable_trace=True,
+            end_session=False,
+            session_state=session_state,
+            streaming_configurations={"streamFinalResponse": False},
+            bedrock_model_configurations={},
+        )
+
+    rebuild_seconds = timeit.timeit(rebuild, number=args.turns)
+    cached_seconds = timeit.timeit(cached, number=args.turns)
+
+    print(f"depth={args.depth} fanout={args.fanout} turns={args.turns}")
+    print(f"rebuild per turn:  {rebuild_seconds / args.turns * 1e6:10.2f} us")
+    print(f"template per turn: {cached_seconds / args.turns * 1e6:10.2f} us")
+    print(f"speedup:           {rebuild_seconds / cached_seconds:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
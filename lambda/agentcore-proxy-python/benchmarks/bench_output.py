@@ -0,0 +1,81 @@
+"""Benchmark for answer rendering in `InlineAgent.invoke`.
+
+Streams a long multi-chunk answer through a stub transport and counts the
+characters written to the output sink. Before output sinks, every chunk re-printed
+the whole accumulated answer, so the printed size grew quadratically.
+
+    python benchmarks/bench_output.py --chunk-size 40
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Make `InlineAgent` importable when run from a checkout without PYTHONPATH.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from InlineAgent.agent import CallbackSink, InlineAgent, NullSink, Transport
+
+
+class ChunkTransport(Transport):
+    def __init__(self, chunks: int, chunk_size: int):
+        self.chunk = b"x" * chunk_size
+        self.chunks = chunks
+
+    async def invoke_inline_agent(self, **kwargs):
+        async def completion():
+            for _ in range(self.chunks):
+                yield {"chunk": {"bytes": self.chunk}}
+
+        return {"completion": completion()}
+
+
+async def run(chunks: int, chunk_size: int):
+    written = [0]
+
+    def count(text: str):
+        written[0] += len(text)
+
+    agent = InlineAgent(
+        foundation_model="anthropic.claude-3-5-sonnet-20241022-v2:0",
+        agent_name="bench",
+        instruction="Benchmark agent.",
+        transport=ChunkTransport(chunks=chunks, chunk_size=chunk_size),
+        output_sink=CallbackSink(callback=count),
+    )
+    start = time.perf_counter()
+    await agent.invoke("Write a long answer.", session_id="bench")
+    sink_seconds = time.perf_counter() - start
+
+    agent.output_sink = NullSink()
+    start = time.perf_counter()
+    await agent.invoke("Write a long answer.", session_id="bench")
+    quiet_seconds = time.perf_counter() - start
+
+    answer_size = chunks * chunk_size
+    # What the old code printed: the full prefix after every chunk.
+    legacy_written = chunk_size * chunks * (chunks + 1) // 2
+    return answer_size, written[0], legacy_written, sink_seconds, quiet_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=40)
+    args = parser.parse_args()
+
+    print(
+        f"{'chunks':>8} {'answer':>10} {'written':>10} {'legacy':>14} {'sink s':>8} {'quiet s':>8}"
+    )
+    for chunks in (250, 500, 1000, 2000, 4000):
+        answer, written, legacy, sink_seconds, quiet_seconds = asyncio.run(
+            run(chunks=chunks, chunk_size=args.chunk_size)
+        )
+        print(
+            f"{chunks:>8} {answer:>10} {written:>10} {legacy:>14} {sink_seconds:>8.3f} {quiet_seconds:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark for ROC tool execution modes.
+
+Runs one returnControl round with several invocations of a CPU-bound tool through
+`ProcessROC.process_roc` in each execution mode. Inline and thread pool runs are
+serialized by the GIL; the process pool spreads the work over the available cores.
+
+    python benchmarks/bench_tool_execution.py --invocations 8 --limit 200000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Make `InlineAgent` importable when run from a checkout without PYTHONPATH.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from InlineAgent.agent import ProcessROC, execution_mode
+
+
+def count_primes(limit: int) -> int:
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b"\x00\x00"
+    for i in range(2, int(limit**0.5) + 1):
+        if sieve[i]:
+            for multiple in range(i * i, limit, i):
+                sieve[multiple] = 0
+    return sum(sieve)
+
+
+# Process-pool tools must be importable by name, so each mode gets its own
+# module-level function.
+@execution_mode("inline")
+def count_primes_inline(limit: int) -> int:
+    return count_primes(limit)
+
+
+@execution_mode("thread")
+def count_primes_thread(limit: int) -> int:
+    return count_primes(limit)
+
+
+@execution_mode("process")
+def count_primes_process(limit: int) -> int:
+    return count_primes(limit)
+
+
+def roc_event(function: str, invocations: int, limit: int):
+    return {
+        "invocationId": "bench",
+        "invocationInputs": [
+            {
+                "functionInvocationInput": {
+                    "actionGroup": "bench",
+                    "actionInvocationType": "RESULT",
+                    "agentId": "bench",
+                    "function": function,
+                    "parameters": [
+                        {"name": "limit", "type": "integer", "value": str(limit)}
+                    ],
+                }
+            }
+            for _ in range(invocations)
+        ],
+    }
+
+
+async def run(tool, invocations: int, limit: int) -> float:
+    start = time.perf_counter()
+    await ProcessROC.process_roc(
+        inlineSessionState={},
+        roc_event=roc_event(tool.__name__, invocations, limit),
+        tool_map={tool.__name__: tool},
+        max_concurrency=invocations,
+        max_concurrency_per_tool=invocations,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invocations", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--limit", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    # Warm the pools so the timings do not include worker start-up.
+    asyncio.run(run(count_primes_process, args.invocations, 10))
+    asyncio.run(run(count_primes_thread, 1, 10))
+
+    inline = asyncio.run(run(count_primes_inline, args.invocations, args.limit))
+    thread = asyncio.run(run(count_primes_thread, args.invocations, args.limit))
+    process = asyncio.run(run(count_primes_process, args.invocations, args.limit))
+
+    print(f"{args.invocations} invocations on {os.cpu_count()} cores")
+    print(f"inline:       {inline:.2f}s")
+    print(f"thread pool:  {thread:.2f}s ({inline / thread:.1f}x)")
+    print(f"process pool: {process:.2f}s ({inline / process:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
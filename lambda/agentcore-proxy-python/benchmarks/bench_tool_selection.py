@@ -0,0 +1,158 @@
+"""Benchmark for relevance-based tool selection.
+
+Builds a catalog shaped like several MCP servers behind one action group per
+marketplace, then for a set of user requests with a known target tool reports
+the function schema tokens sent per request with and without selection, how
+often the target tool is among the tools sent (recall), and the time to index
+the catalog and select tools.
+
+    python benchmarks/bench_tool_selection.py --marketplaces 4 --top-k 8 16
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+# Make `InlineAgent` importable when run from a checkout without PYTHONPATH.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from InlineAgent.agent import ToolIndex, ToolSelector, estimate_tokens
+from InlineAgent.agent.tool_selection import REQUEST_MORE_TOOLS
+
+
+# service -> (thing, [(action, description, request)])
+SERVICES = {
+    "orders": ("order", [
+        ("get_order_status", "Get the fulfilment status of an order", "where is my order"),
+        ("cancel_order", "Cancel an order that has not shipped yet", "please cancel order"),
+        ("list_orders", "List the recent orders of a customer", "show my recent orders"),
+        ("update_order_address", "Change the delivery address of an open order", "change the delivery address for my order"),
+        ("split_order", "Split an order into separate shipments", "split this order into two shipments"),
+    ]),
+    "returns": ("return", [
+        ("create_return", "Open a return request for items of a delivered order", "I want to return an item"),
+        ("refund_order", "Issue a refund for a returned or cancelled order", "refund my money for the order"),
+        ("get_return_label", "Get the prepaid return shipping label", "send me the return label"),
+        ("return_policy", "Explain the return policy for a product category", "what is the return policy for shoes"),
+    ]),
+    "inventory": ("stock", [
+        ("check_stock", "Check the available stock level of a product", "how many units are in stock"),
+        ("reserve_stock", "Reserve units of a product for a pending order", "reserve ten units"),
+        ("release_stock", "Release previously reserved units", "release the reserved units"),
+        ("restock_forecast", "Forecast when a product will be back in stock", "when will it be back in stock"),
+    ]),
+    "shipping": ("shipment", [
+        ("track_shipment", "Track a shipment with its carrier tracking number", "track my package"),
+        ("create_label", "Create a shipping label for an outbound package", "print a shipping label"),
+        ("estimate_delivery", "Estimate the delivery date to a postal code", "when would it arrive in 98101"),
+        ("schedule_pickup", "Schedule a carrier pickup at the warehouse", "book a carrier pickup tomorrow"),
+    ]),
+    "payments": ("payment", [
+        ("charge_card", "Charge a saved card for an invoice", "charge the customer's card"),
+        ("list_payouts", "List the payouts made to a seller's bank account", "show the payouts to my bank account"),
+        ("account_balance", "Get the current balance of a seller account", "what is my account balance"),
+        ("dispute_charge", "Open a chargeback dispute for a payment", "dispute this chargeback"),
+    ]),
+    "catalog": ("listing", [
+        ("create_listing", "Create a product listing with title, price and images", "list a new product for sale"),
+        ("update_price", "Change the price of a product listing", "lower the price of my listing"),
+        ("search_catalog", "Search the product catalog by keyword", "find products matching headphones"),
+        ("listing_quality", "Score the quality of a listing's title and images", "how good is my listing"),
+    ]),
+    "advertising": ("campaign", [
+        ("create_campaign", "Create a sponsored products advertising campaign", "start an ad campaign"),
+        ("campaign_report", "Report clicks, spend and sales of an ad campaign", "how did my ads perform"),
+        ("pause_campaign", "Pause an advertising campaign", "stop my ads"),
+    ]),
+    "support": ("case", [
+        ("open_case", "Open a seller support case", "contact seller support"),
+        ("case_status", "Get the status and replies of a support case", "any update on my support case"),
+        ("account_health", "Report policy violations and account health", "is my account at risk of suspension"),
+    ]),
+}
+
+PARAMETERS = {
+    "id": "Identifier of the {thing}, e.g. as shown in Seller Central",
+    "marketplace": "Marketplace code such as US, UK or DE",
+    "seller_email": "Email address of the seller account making the request",
+}
+
+
+def build_catalog(marketplaces: int):
+    """One action group per marketplace and service, like one MCP server each."""
+    action_groups, queries = list(), list()
+    for marketplace in ["US", "UK", "DE", "JP", "FR", "IT", "ES", "CA"][:marketplaces]:
+        for service, (thing, actions) in SERVICES.items():
+            functions = list()
+            for name, description, request in actions:
+                functions.append(
+                    {
+                        "name": f"{name}_{marketplace.lower()}",
+                        "description": f"{description} in the {marketplace} marketplace.",
+                        "parameters": {
+                            parameter: {
+                                "type": "string",
+                                "description": text.format(thing=thing),
+                                "required": True,
+                            }
+                            for parameter, text in PARAMETERS.items()
+                        },
+                        "requireConfirmation": "DISABLED",
+                    }
+                )
+                queries.append(
+                    (f"{request} in the {marketplace} marketplace", f"{name}_{marketplace.lower()}")
+                )
+            action_groups.append(
+                {
+                    "actionGroupName": f"{service}_{marketplace}",
+                    "description": f"{service.capitalize()} tools",
+                    "actionGroupExecutor": {"customControl": "RETURN_CONTROL"},
+                    "functionSchema": {"functions": functions},
+                }
+            )
+    return action_groups, queries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--marketplaces", type=int, default=4)
+    parser.add_argument("--top-k", type=int, nargs="+", default=[5, 8, 16])
+    args = parser.parse_args()
+
+    action_groups, queries = build_catalog(args.marketplaces)
+    full_tokens = estimate_tokens(json.dumps(action_groups))
+    index_seconds = min(timeit.repeat(lambda: ToolIndex(action_groups), number=1, repeat=5))
+    print(
+        f"{len(queries)} tools, {full_tokens} schema tokens per request without "
+        f"selection; indexed in {index_seconds * 1000:.2f} ms"
+    )
+    print(f"{'top_k':>5} {'tokens/request':>15} {'saved':>7} {'recall':>7} {'select':>10}")
+
+    for top_k in args.top_k:
+        selector = ToolSelector(top_k=top_k, min_tools=0)
+        sent, found = 0, 0
+        for query, target in queries:
+            selection = selector.select(action_groups, query)
+            sent += selection.index.schema_tokens - selection.tokens_saved()
+            found += any(function == target for _, function in selection.selected)
+
+        select_seconds = min(
+            timeit.repeat(
+                lambda: [selector.select(action_groups, query) for query, _ in queries],
+                number=1,
+                repeat=5,
+            )
+        ) / len(queries)
+        average = sent / len(queries)
+        print(
+            f"{top_k:>5} {average:>15.0f} {1 - average / full_tokens:>7.0%} "
+            f"{found / len(queries):>7.0%} {select_seconds * 1e6:>7.0f} us"
+        )
+    print(f"(tokens/request include the {REQUEST_MORE_TOOLS} function)")
+
+
+if __name__ == "__main__":
+    main()
@@ -69,6 +69,12 @@ if ! command -v docker &> /dev/null; then
     exit 1
 fi
 
+# Optionally resolve the agent ahead of time so cold starts skip STS and MCP list_tools
+if [ "${BUILD_AGENT_BUNDLE}" == "1" ]; then
+    print_status "Building agent bundle..."
+    MCP_SERVER_URL=${MCP_SERVER_URL} python3 -m InlineAgent.build_bundle lambda_function_new:build_agent -o agent_bundle.json
+fi
+
 # Build deployment package using Docker with faster build options
 print_status "Building deployment package using Docker (linux/amd64)..."
 DOCKER_BUILDKIT=1 docker build --platform linux/amd64 -f Dockerfile.build -t lambda-builder . --progress=plain
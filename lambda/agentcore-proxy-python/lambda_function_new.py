@@ -6,38 +6,59 @@ import asyncio
 
 from InlineAgent.tools.mcp import MCPHttpStreamable
 from InlineAgent.action_group import ActionGroup
-from InlineAgent.agent import InlineAgent
+from InlineAgent.aws import identity_resolver
+from InlineAgent.agent import AgentBundler, InlineAgent
+from InlineAgent.deadline import Deadline
+from InlineAgent.types import AgentBundle
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 mcp_server_url = os.environ.get('MCP_SERVER_URL', 'https://bwzo9wnhy3.execute-api.us-west-2.amazonaws.com/beta/mcp')
 
-async def process_with_bedrock(input_text: str, auth_header: str = None) -> str:
-    """Process request using Bedrock Inline Agent with MCP"""
+# Resolved ahead of time with `python -m InlineAgent.build_bundle lambda_function_new:build_agent -o agent_bundle.json`.
+# Missing or stale bundles fall back to resolving everything live.
+agent_bundle = AgentBundler.load(
+    os.environ.get('AGENT_BUNDLE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agent_bundle.json'))
+)
+
+async def build_agent(auth_header: str = None, bundle: AgentBundle = None) -> InlineAgent:
+    """Create the MCP client and the agent"""
     # Prepare headers for MCP client
     headers = {}
     if auth_header:
         headers['Authorization'] = auth_header
         logger.info(f"Passing Authorization header to MCP client: {auth_header[:20]}...")
     
-    mcp_client = await MCPHttpStreamable.create(url=mcp_server_url, headers=headers)
+    mcp_client = await MCPHttpStreamable.create(
+        url=mcp_server_url, headers=headers, tools=AgentBundler.mcp_tools(bundle, mcp_server_url)
+    )
     
     try:
         # Create action group and agent
         action_group = ActionGroup(name="MCPGroup", mcp_clients=[mcp_client])
-        agent = InlineAgent(
+        return InlineAgent(
             foundation_model="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
             instruction="You are a helpful AI assistant with MCP tools.",
             agent_name="mcp_agent",
-            action_groups=[action_group]
+            action_groups=[action_group],
+            bundle=bundle,
         )
-        
+    except Exception:
+        await mcp_client.cleanup()
+        raise
+
+async def process_with_bedrock(input_text: str, auth_header: str = None, deadline: Deadline = None) -> str:
+    """Process request using Bedrock Inline Agent with MCP"""
+    agent = await build_agent(auth_header, agent_bundle)
+    
+    try:
         # Process request
-        return await agent.invoke(input_text=input_text)
+        return await agent.invoke(input_text=input_text, deadline=deadline)
         
     finally:
-        await mcp_client.cleanup()
+        for mcp_client in agent.mcp_clients:
+            await mcp_client.cleanup()
 
 def lambda_handler(event, context):
     """Lambda handler with Bedrock Inline Agent integration"""
@@ -65,7 +86,11 @@ def lambda_handler(event, context):
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            response_text = loop.run_until_complete(process_with_bedrock(input_text, auth_header))
+            # Account and region come from the function ARN instead of STS/IMDS
+            identity_resolver.observe_lambda_context(context)
+            # Tools are cancelled before the Lambda itself times out
+            deadline = Deadline.from_lambda_context(context) if context is not None else None
+            response_text = loop.run_until_complete(process_with_bedrock(input_text, auth_header, deadline))
         finally:
             loop.close()
         